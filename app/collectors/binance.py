@@ -3,91 +3,426 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import math
 import threading
-from typing import Dict
+import time
+import urllib.request
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple
 
 import websockets
 
-from app.core.state import PriceData, SharedState
+from app.collectors.recording import FrameRecorder
+from app.collectors.standby import STANDBY_RECONNECT_S, StandbyGroup
+from app.config import BINANCE_REST_URL, BINANCE_WS_URL
+from app.core.latency import PipelineLatency
+from app.core.order_book import OrderBook
+from app.core.price_board import ExchangeBoard
+from app.core.state import SharedState, StreamStats
 
 logger = logging.getLogger(__name__)
 
+DEPTH_SNAPSHOT_LIMIT = 1000
+DEPTH_BUFFER_LIMIT = 2000
+DEPTH_RETRY_S = 5.0
+MAX_STREAMS_PER_CONNECTION = 200
+STATS_INTERVAL_S = 1.0
+LAG_SMOOTHING = 0.1
+
 
 class BinanceCollector:
+    exchange = "binance"
+
     def __init__(
         self,
         symbols_map: Dict[str, str],
         state: SharedState,
         stop_event: threading.Event | None = None,
+        recorder: FrameRecorder | None = None,
+        url: str = BINANCE_WS_URL,
+        latency: PipelineLatency | None = None,
+        book_depth: int = 0,
+        rest_url: str = BINANCE_REST_URL,
+        connections: int = 1,
+        standby: bool = False,
     ) -> None:
         self.symbols_map = symbols_map
         self.state = state
         self.stop_event = stop_event
-        self._reverse_map = {value.upper(): key for key, value in symbols_map.items()}
-        self._last_values: Dict[str, PriceData] = {}
+        self.recorder = recorder
+        self.url = url.rstrip("/")
+        self.latency = latency
+        if latency is not None:
+            self._record_exchange = latency.recorder("exchange", self.exchange)
+            self._record_parse = latency.recorder("parse", self.exchange)
+            self._record_state = latency.recorder("state", self.exchange)
+        self._board = state.board(self.exchange)
+        self._rows = {
+            value.upper(): state.slot(self.exchange, key) for key, value in symbols_map.items()
+        }
+        self.book_depth = book_depth
+        self.rest_url = rest_url.rstrip("/")
+        self._books: Dict[str, OrderBook] = {}
+        if book_depth > 0:
+            self._books = {
+                value.upper(): state.order_book(self.exchange, key)
+                for key, value in symbols_map.items()
+            }
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {}
+        self._pending: Set[str] = set()
+        self._syncing: Set[str] = set()
+        self._sync_tasks: Dict[str, asyncio.Task] = {}
+        self.standby = standby
+        self.duplicates = 0
+        slots = max(self._rows.values(), default=-1) + 1
+        self._book_ids = [0] * slots
+        self._ticker_ms = [0] * slots
+        self.shards: List[List[str]] = []
+        self.stats: Dict[str, StreamStats] = {}
+        self.connections: List[Tuple[str, List[str]]] = []
+        self._groups: Dict[str, StandbyGroup] = {}
+        self._record_gap = latency.recorder("gap", self.exchange) if latency is not None else None
+        self._sockets: Dict[str, Any] = {}
+        self._subscribed: Dict[str, Set[str]] = {}
+        self._request_id = 0
+        self._tasks: List[asyncio.Task] | None = None
+        for shard in self._split(list(self._rows), connections):
+            self._add_shard(shard)
+
+    def _split(self, symbols: List[str], connections: int) -> List[List[str]]:
+        needed = math.ceil(len(symbols) * self._per_symbol() / MAX_STREAMS_PER_CONNECTION)
+        count = max(1, min(max(connections, needed), len(symbols)))
+        return [symbols[index::count] for index in range(count)]
+
+    def _per_symbol(self) -> int:
+        return 3 if self.book_depth > 0 else 2
+
+    def _add_shard(self, shard: List[str]) -> None:
+        index = len(self.shards)
+        self.shards.append(shard)
+        names = [f"{self.exchange}#{index}"]
+        if self.standby:
+            names.append(f"{self.exchange}#{index}b")
+        shard_stats = {name: StreamStats(streams=len(self._streams(shard))) for name in names}
+        group = StandbyGroup(shard_stats, self._record_gap)
+        for name in names:
+            self.stats[name] = shard_stats[name]
+            self.connections.append((name, shard))
+            self._groups[name] = group
+            if self._tasks is not None:
+                self._tasks.append(asyncio.create_task(self._run_connection(name, shard)))
 
     async def run(self) -> None:
+        tasks = self._tasks = [
+            asyncio.create_task(self._run_connection(name, shard))
+            for name, shard in self.connections
+        ]
+        tasks.append(asyncio.create_task(self._stats_loop()))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            self._tasks = None
+
+    async def update_symbols(self, symbols_map: Dict[str, str]) -> None:
+        wanted = {key: value.upper() for key, value in symbols_map.items()}
+        for key, value in self.symbols_map.items():
+            symbol = value.upper()
+            if wanted.get(key) == symbol:
+                continue
+            self._reset_books([symbol])
+            self._books.pop(symbol, None)
+            self._rows.pop(symbol, None)
+            for shard in self.shards:
+                if symbol in shard:
+                    shard.remove(symbol)
+            self.state.remove_quote(self.exchange, key)
+        per_symbol = self._per_symbol()
+        for key, symbol in wanted.items():
+            if symbol in self._rows:
+                continue
+            row = self._rows[symbol] = self.state.slot(self.exchange, key)
+            if self.book_depth > 0:
+                self._books[symbol] = self.state.order_book(self.exchange, key)
+            missing = row + 1 - len(self._book_ids)
+            if missing > 0:
+                self._book_ids.extend([0] * missing)
+                self._ticker_ms.extend([0] * missing)
+            self._book_ids[row] = 0
+            self._ticker_ms[row] = 0
+            shard = min(self.shards, key=len)
+            if (len(shard) + 1) * per_symbol <= MAX_STREAMS_PER_CONNECTION:
+                shard.append(symbol)
+            else:
+                self._add_shard([symbol])
+        self.symbols_map = dict(symbols_map)
+        for name, shard in self.connections:
+            self.stats[name].streams = len(self._streams(shard))
+            await self._sync_subscriptions(name, shard)
+
+    async def _sync_subscriptions(self, name: str, symbols: List[str]) -> None:
+        websocket = self._sockets.get(name)
+        if websocket is None:
+            return
+        subscribed = self._subscribed[name]
+        wanted = set(symbols)
+        changes = [
+            ("UNSUBSCRIBE", sorted(subscribed - wanted)),
+            ("SUBSCRIBE", sorted(wanted - subscribed)),
+        ]
+        self._subscribed[name] = wanted
+        for method, changed in changes:
+            if not changed:
+                continue
+            self._request_id += 1
+            request = {"method": method, "params": self._streams(changed), "id": self._request_id}
+            try:
+                await websocket.send(json.dumps(request))
+            except websockets.ConnectionClosed:
+                return
+            logger.info("Binance %s %s %s", name, method.lower(), ", ".join(changed))
+
+    async def _run_connection(self, name: str, symbols: List[str]) -> None:
+        stats = self.stats[name]
+        group = self._groups[name]
         backoff = 1
+        established = False
         while not self._is_stopped():
-            stream_url = self._build_stream_url()
+            if not symbols:
+                await asyncio.sleep(STATS_INTERVAL_S)
+                continue
             try:
-                self.state.set_status("binance", False, "connecting")
+                self._set_connected(name, False, "connecting")
+                subscribed = set(symbols)
                 async with websockets.connect(
-                    stream_url, ping_interval=20, ping_timeout=20
+                    self._build_stream_url(symbols), ping_interval=20, ping_timeout=20
                 ) as websocket:
-                    self.state.set_status("binance", True, "connected")
+                    if not group.live:
+                        self._reset_books(symbols)
+                    self._set_connected(name, True, "connected")
                     backoff = 1
+                    established = True
+                    self._sockets[name] = websocket
+                    self._subscribed[name] = subscribed
+                    await self._sync_subscriptions(name, symbols)
                     async for message in websocket:
                         if self._is_stopped():
                             break
-                        self._handle_message(message)
+                        if self.recorder is not None:
+                            self.recorder.record(self.exchange, message)
+                        duplicates = self.duplicates
+                        event_ms = self._handle_message(message)
+                        stats.messages += 1
+                        if self.duplicates != duplicates:
+                            stats.duplicates += 1
+                        if event_ms is not None:
+                            self._observe_lag(stats, time.time_ns() // 1_000_000 - event_ms)
+                        if self._pending:
+                            self._start_syncs()
             except Exception as exc:  # noqa: BLE001
-                logger.warning("Binance websocket error: %s", exc)
-                self.state.set_status("binance", False, str(exc))
-                await asyncio.sleep(backoff)
-                backoff = min(backoff * 2, 30)
+                logger.warning("Binance websocket %s error: %s", name, exc)
+                stats.reconnects += 1
+                self._set_connected(name, False, str(exc))
+                if self.standby and established:
+                    await asyncio.sleep(STANDBY_RECONNECT_S)
+                else:
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 30)
+                established = False
+            finally:
+                self._sockets.pop(name, None)
+
+    def _observe_lag(self, stats: StreamStats, lag_ms: float) -> None:
+        if stats.lag_ms is None:
+            stats.lag_ms = lag_ms
+        else:
+            stats.lag_ms += (lag_ms - stats.lag_ms) * LAG_SMOOTHING
+        if stats.max_lag_ms is None or lag_ms > stats.max_lag_ms:
+            stats.max_lag_ms = lag_ms
 
-    def _build_stream_url(self) -> str:
+    def _set_connected(self, name: str, connected: bool, message: str) -> None:
+        stats = self.stats[name]
+        stats.connected = connected
+        stats.last_message = message
+        if connected:
+            self._groups[name].up(name)
+        else:
+            self._groups[name].down(name)
+        self.state.set_stream_stats(name, stats)
+        if len(self.stats) == 1:
+            self.state.set_status(self.exchange, connected, message)
+            return
+        up = sum(1 for item in self.stats.values() if item.connected)
+        self.state.set_status(
+            self.exchange, up > 0, f"{name}: {message} ({up}/{len(self.stats)} connected)"
+        )
+
+    async def _stats_loop(self) -> None:
+        counted = {name: stats.messages for name, stats in self.stats.items()}
+        measured = time.monotonic()
+        while not self._is_stopped():
+            await asyncio.sleep(STATS_INTERVAL_S)
+            now = time.monotonic()
+            elapsed = now - measured
+            measured = now
+            for name, stats in list(self.stats.items()):
+                stats.rate = (stats.messages - counted.get(name, stats.messages)) / elapsed
+                counted[name] = stats.messages
+                self.state.set_stream_stats(name, stats)
+                stats.max_lag_ms = None
+
+    def _streams(self, symbols: Iterable[str]) -> List[str]:
         streams = []
-        for symbol in self.symbols_map.values():
+        for symbol in symbols:
             stream_symbol = symbol.lower()
             streams.append(f"{stream_symbol}@bookTicker")
             streams.append(f"{stream_symbol}@miniTicker")
-        stream_path = "/".join(streams)
-        return f"wss://stream.binance.com:9443/stream?streams={stream_path}"
+            if self.book_depth > 0:
+                streams.append(f"{stream_symbol}@depth@100ms")
+        return streams
+
+    def _build_stream_url(self, symbols: Iterable[str] | None = None) -> str:
+        stream_path = "/".join(self._streams(self._rows if symbols is None else symbols))
+        return f"{self.url}/stream?streams={stream_path}"
 
-    def _handle_message(self, message: str) -> None:
+    def _handle_message(self, message: str) -> int | None:
+        started = time.perf_counter_ns() if self.latency is not None else 0
         payload = json.loads(message)
         data = payload.get("data", {})
         event_type = data.get("e")
         symbol = data.get("s")
         if not symbol:
-            return
-        symbol_std = self._reverse_map.get(symbol.upper())
-        if not symbol_std:
-            return
-        if event_type == "bookTicker":
+            return None
+        row = self._rows.get(symbol.upper())
+        if row is None:
+            return None
+        event_ms = data.get("E")
+        if self.latency is not None and event_ms is not None:
+            self._record_exchange(time.time_ns() - int(event_ms) * 1_000_000)
+        if event_type == "depthUpdate":
+            self._handle_depth(symbol.upper(), data)
+        elif event_type == "bookTicker":
+            if self.standby and self._is_duplicate(self._book_ids, row, data.get("u")):
+                return event_ms
             bid = float(data.get("b", 0))
             ask = float(data.get("a", 0))
-            last_data = self._last_values.get(symbol_std, PriceData(bid=bid, ask=ask))
-            last = last_data.last
-            volume = last_data.volume_24h
-            price = PriceData(bid=bid, ask=ask, last=last, volume_24h=volume)
-            self._last_values[symbol_std] = price
-            self.state.update_price("binance", symbol_std, price)
+            self._publish(self.state.update_book, row, bid, ask, started)
         elif event_type == "24hrMiniTicker":
+            if self.standby and self._is_duplicate(self._ticker_ms, row, event_ms):
+                return event_ms
             last = float(data.get("c", 0))
             volume = float(data.get("v", 0))
-            last_data = self._last_values.get(symbol_std, PriceData(bid=0, ask=0))
-            price = PriceData(
-                bid=last_data.bid,
-                ask=last_data.ask,
-                last=last,
-                volume_24h=volume,
-            )
-            self._last_values[symbol_std] = price
-            if price.bid and price.ask:
-                self.state.update_price("binance", symbol_std, price)
+            self._publish(self.state.update_ticker, row, last, volume, started)
+        return event_ms
+
+    def _is_duplicate(self, seen: List[int], row: int, sequence: int | None) -> bool:
+        if sequence is None:
+            return False
+        if sequence <= seen[row]:
+            self.duplicates += 1
+            return True
+        seen[row] = sequence
+        return False
+
+    def _publish(
+        self,
+        update: Callable[[ExchangeBoard, int, float, float], None],
+        row: int,
+        first: float,
+        second: float,
+        started: int,
+    ) -> None:
+        if self.latency is None:
+            update(self._board, row, first, second)
+            return
+        parsed = time.perf_counter_ns()
+        update(self._board, row, first, second)
+        self._record_state(time.perf_counter_ns() - parsed)
+        self._record_parse(parsed - started)
+
+    def _handle_depth(self, symbol: str, data: Dict[str, Any]) -> None:
+        book = self._books.get(symbol)
+        if book is None:
+            return
+        if not book.ready:
+            buffer = self._buffers.setdefault(symbol, [])
+            if len(buffer) < DEPTH_BUFFER_LIMIT:
+                buffer.append(data)
+            if symbol not in self._syncing:
+                self._pending.add(symbol)
+            return
+        if data["u"] <= book.update_id:
+            return
+        if data["U"] > book.update_id + 1:
+            logger.warning("Binance depth gap for %s, resyncing", symbol)
+            book.clear()
+            self._buffers[symbol] = [data]
+            self._pending.add(symbol)
+            return
+        self._apply_depth(book, data)
+
+    def _apply_depth(self, book: OrderBook, data: Dict[str, Any]) -> None:
+        book.apply_many(book.bids, data["b"])
+        book.apply_many(book.asks, data["a"])
+        book.update_id = data["u"]
+
+    def _apply_snapshot(self, symbol: str, snapshot: Dict[str, Any]) -> bool:
+        book = self._books[symbol]
+        buffered = self._buffers.pop(symbol, [])
+        book.clear()
+        book.apply_many(book.bids, snapshot["bids"])
+        book.apply_many(book.asks, snapshot["asks"])
+        book.update_id = int(snapshot["lastUpdateId"])
+        for data in buffered:
+            if data["u"] <= book.update_id:
+                continue
+            if data["U"] > book.update_id + 1:
+                logger.warning("Binance depth snapshot for %s is stale, resyncing", symbol)
+                book.clear()
+                self._pending.add(symbol)
+                return False
+            self._apply_depth(book, data)
+        book.ready = True
+        return True
+
+    def _start_syncs(self) -> None:
+        for symbol in self._pending - self._syncing:
+            self._syncing.add(symbol)
+            self._sync_tasks[symbol] = asyncio.create_task(self._sync_book(symbol))
+        self._pending.clear()
+
+    async def _sync_book(self, symbol: str) -> None:
+        try:
+            snapshot = await asyncio.to_thread(self._fetch_snapshot, symbol)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Binance depth snapshot for %s failed: %s", symbol, exc)
+            await asyncio.sleep(DEPTH_RETRY_S)
+            self._sync_tasks.pop(symbol, None)
+            self._syncing.discard(symbol)
+            self._pending.add(symbol)
+            return
+        self._sync_tasks.pop(symbol, None)
+        self._syncing.discard(symbol)
+        self._apply_snapshot(symbol, snapshot)
+
+    def _fetch_snapshot(self, symbol: str) -> Dict[str, Any]:
+        limit = max(DEPTH_SNAPSHOT_LIMIT, self.book_depth)
+        url = f"{self.rest_url}/api/v3/depth?symbol={symbol}&limit={limit}"
+        with urllib.request.urlopen(url, timeout=10) as response:
+            return json.loads(response.read())
+
+    def _reset_books(self, symbols: Iterable[str]) -> None:
+        for symbol in symbols:
+            book = self._books.get(symbol)
+            if book is None:
+                continue
+            task = self._sync_tasks.pop(symbol, None)
+            if task is not None:
+                task.cancel()
+            self._syncing.discard(symbol)
+            self._pending.discard(symbol)
+            self._buffers.pop(symbol, None)
+            book.clear()
 
     def _is_stopped(self) -> bool:
         return bool(self.stop_event and self.stop_event.is_set())
@@ -4,59 +4,247 @@ import asyncio
 import json
 import logging
 import threading
-from typing import Dict
+import time
+from typing import Any, Dict, List, Set, Tuple
 
 import websockets
 from websockets import WebSocketClientProtocol
 
-from app.core.state import PriceData, SharedState
+from app.collectors.recording import FrameRecorder
+from app.collectors.standby import STANDBY_RECONNECT_S, StandbyGroup
+from app.config import KRAKEN_WS_URL
+from app.core.latency import PipelineLatency
+from app.core.order_book import OrderBook
+from app.core.price_board import NAN
+from app.core.state import SharedState, StreamStats
 
 logger = logging.getLogger(__name__)
 
+BOOK_DEPTHS = (10, 25, 100, 500, 1000)
+STATS_INTERVAL_S = 1.0
+FAILOVER_STALE_S = 3.0
+
+
+def subscription_depth(book_depth: int) -> int:
+    return next((depth for depth in BOOK_DEPTHS if depth >= book_depth), BOOK_DEPTHS[-1])
+
 
 class KrakenCollector:
+    exchange = "kraken"
+
     def __init__(
         self,
         symbols_map: Dict[str, str],
         state: SharedState,
         stop_event: threading.Event | None = None,
+        recorder: FrameRecorder | None = None,
+        url: str = KRAKEN_WS_URL,
+        latency: PipelineLatency | None = None,
+        book_depth: int = 0,
+        standby: bool = False,
     ) -> None:
         self.symbols_map = symbols_map
         self.state = state
         self.stop_event = stop_event
-        self._reverse_map = {value: key for key, value in symbols_map.items()}
+        self.recorder = recorder
+        self.url = url
+        self.latency = latency
+        if latency is not None:
+            self._record_parse = latency.recorder("parse", self.exchange)
+            self._record_state = latency.recorder("state", self.exchange)
+        self._board = state.board(self.exchange)
+        self._rows = {value: state.slot(self.exchange, key) for key, value in symbols_map.items()}
+        self.book_depth = subscription_depth(book_depth) if book_depth > 0 else 0
+        self._books: Dict[str, OrderBook] = {}
+        if book_depth > 0:
+            self._books = {
+                value: state.order_book(self.exchange, key, self.book_depth)
+                for key, value in symbols_map.items()
+            }
+        self._resubscribe: Set[str] = set()
+        self.standby = standby
+        self.duplicates = 0
+        names = [f"{self.exchange}#0", f"{self.exchange}#0b"] if standby else [f"{self.exchange}#0"]
+        self.stats = {name: StreamStats(streams=len(symbols_map)) for name in names}
+        self.group = StandbyGroup(
+            self.stats, latency.recorder("gap", self.exchange) if latency is not None else None
+        )
+        self._active: str | None = None
+        self._last_seen: Dict[str, float] = {}
+        self._quotes: Dict[int, Tuple[float, float, float, float]] = {}
+        self._sockets: Dict[str, WebSocketClientProtocol] = {}
 
     async def run(self) -> None:
+        tasks = [asyncio.create_task(self._run_connection(name)) for name in self.stats]
+        if self.standby:
+            tasks.append(asyncio.create_task(self._stats_loop()))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _run_connection(self, name: str) -> None:
+        stats = self.stats[name]
         backoff = 1
+        established = False
         while not self._is_stopped():
             try:
-                self.state.set_status("kraken", False, "connecting")
+                self._set_connected(name, False, "connecting")
                 async with websockets.connect(
-                    "wss://ws.kraken.com", ping_interval=20, ping_timeout=20
+                    self.url, ping_interval=20, ping_timeout=20
                 ) as websocket:
-                    self.state.set_status("kraken", True, "connected")
+                    if not self.group.live:
+                        self._active = None
+                        self._reset_books()
+                    self._set_connected(name, True, "connected")
                     backoff = 1
+                    established = True
+                    self._sockets[name] = websocket
                     await self._subscribe(websocket)
                     async for message in websocket:
                         if self._is_stopped():
                             break
+                        stats.messages += 1
+                        if self.standby:
+                            self._last_seen[name] = time.monotonic()
+                        if not self._accept(name):
+                            stats.duplicates += 1
+                            continue
+                        if self.recorder is not None:
+                            self.recorder.record(self.exchange, message)
+                        duplicates = self.duplicates
                         self._handle_message(message)
+                        if self.duplicates != duplicates:
+                            stats.duplicates += 1
+                        if self._resubscribe and self._active == name:
+                            await self._resubscribe_books(websocket)
             except Exception as exc:  # noqa: BLE001
-                logger.warning("Kraken websocket error: %s", exc)
-                self.state.set_status("kraken", False, str(exc))
-                await asyncio.sleep(backoff)
-                backoff = min(backoff * 2, 30)
+                logger.warning("Kraken websocket %s error: %s", name, exc)
+                stats.reconnects += 1
+                self._set_connected(name, False, str(exc))
+                if self.standby and established:
+                    await asyncio.sleep(STANDBY_RECONNECT_S)
+                else:
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 30)
+                established = False
+            finally:
+                self._sockets.pop(name, None)
+
+    def _accept(self, name: str) -> bool:
+        active = self._active
+        if active == name:
+            return True
+        if active is not None and active in self.group.live:
+            if time.monotonic() - self._last_seen.get(active, 0.0) < FAILOVER_STALE_S:
+                return False
+            self.stats[active].failovers += 1
+        self._active = name
+        if active is not None and self._books:
+            logger.info("Kraken failover %s -> %s, resubscribing books", active, name)
+            self._reset_books()
+            self._resubscribe.update(self._books)
+        return True
+
+    def _set_connected(self, name: str, connected: bool, message: str) -> None:
+        stats = self.stats[name]
+        stats.connected = connected
+        stats.last_message = message
+        if connected:
+            self.group.up(name)
+        else:
+            self.group.down(name)
+        if len(self.stats) == 1:
+            self.state.set_status(self.exchange, connected, message)
+            return
+        self.state.set_stream_stats(name, stats)
+        up = len(self.group.live)
+        self.state.set_status(
+            self.exchange, up > 0, f"{name}: {message} ({up}/{len(self.stats)} connected)"
+        )
+
+    async def _stats_loop(self) -> None:
+        counted = {name: stats.messages for name, stats in self.stats.items()}
+        measured = time.monotonic()
+        while not self._is_stopped():
+            await asyncio.sleep(STATS_INTERVAL_S)
+            now = time.monotonic()
+            elapsed = now - measured
+            measured = now
+            for name, stats in self.stats.items():
+                stats.rate = (stats.messages - counted[name]) / elapsed
+                counted[name] = stats.messages
+                self.state.set_stream_stats(name, stats)
+
+    async def update_symbols(self, symbols_map: Dict[str, str]) -> None:
+        removed = [
+            (key, pair) for key, pair in self.symbols_map.items() if symbols_map.get(key) != pair
+        ]
+        added = [
+            (key, pair) for key, pair in symbols_map.items() if self.symbols_map.get(key) != pair
+        ]
+        self.symbols_map = dict(symbols_map)
+        for key, pair in removed:
+            row = self._rows.pop(pair, None)
+            if row is not None:
+                self._quotes.pop(row, None)
+            book = self._books.pop(pair, None)
+            if book is not None:
+                book.clear()
+            self._resubscribe.discard(pair)
+            self.state.remove_quote(self.exchange, key)
+        for key, pair in added:
+            self._rows[pair] = self.state.slot(self.exchange, key)
+            if self.book_depth > 0:
+                self._books[pair] = self.state.order_book(self.exchange, key, self.book_depth)
+        for stats in self.stats.values():
+            stats.streams = len(self.symbols_map)
+        for websocket in list(self._sockets.values()):
+            try:
+                if removed:
+                    await self._send_subscription(
+                        websocket, "unsubscribe", [pair for _, pair in removed]
+                    )
+                if added:
+                    await self._send_subscription(
+                        websocket, "subscribe", [pair for _, pair in added]
+                    )
+            except websockets.ConnectionClosed:
+                continue
+        if removed or added:
+            logger.info("Kraken subscriptions updated (+%d -%d pairs)", len(added), len(removed))
 
     async def _subscribe(self, websocket: WebSocketClientProtocol) -> None:
-        pairs = list(self.symbols_map.values())
+        await self._send_subscription(websocket, "subscribe", list(self.symbols_map.values()))
+
+    async def _send_subscription(
+        self, websocket: WebSocketClientProtocol, event: str, pairs: List[str]
+    ) -> None:
         payload = {
-            "event": "subscribe",
+            "event": event,
             "pair": pairs,
             "subscription": {"name": "ticker"},
         }
         await websocket.send(json.dumps(payload))
+        if self.book_depth > 0:
+            await websocket.send(json.dumps(self._book_request(event, pairs)))
+
+    def _book_request(self, event: str, pairs: List[str]) -> Dict[str, Any]:
+        return {
+            "event": event,
+            "pair": pairs,
+            "subscription": {"name": "book", "depth": self.book_depth},
+        }
+
+    async def _resubscribe_books(self, websocket: WebSocketClientProtocol) -> None:
+        pairs = sorted(self._resubscribe)
+        self._resubscribe.clear()
+        await websocket.send(json.dumps(self._book_request("unsubscribe", pairs)))
+        await websocket.send(json.dumps(self._book_request("subscribe", pairs)))
 
     def _handle_message(self, message: str) -> None:
+        started = time.perf_counter_ns() if self.latency is not None else 0
         payload = json.loads(message)
         if isinstance(payload, dict):
             return
@@ -64,15 +252,57 @@ class KrakenCollector:
             return
         data = payload[1]
         pair = payload[-1]
-        symbol_std = self._reverse_map.get(pair)
-        if not symbol_std:
+        if str(payload[-2]).startswith("book"):
+            self._handle_book(pair, payload[1:-2])
+            return
+        row = self._rows.get(pair)
+        if row is None:
             return
         bid = float(data.get("b", [0])[0])
         ask = float(data.get("a", [0])[0])
         last = float(data.get("c", [0])[0])
-        volume = float(data.get("v", [0])[1]) if data.get("v") else None
-        price = PriceData(bid=bid, ask=ask, last=last, volume_24h=volume)
-        self.state.update_price("kraken", symbol_std, price)
+        volume = float(data.get("v", [0])[1]) if data.get("v") else NAN
+        if self.standby:
+            quote = (bid, ask, last, volume)
+            if self._quotes.get(row) == quote:
+                self.duplicates += 1
+                return
+            self._quotes[row] = quote
+        if self.latency is None:
+            self.state.update_quote(self._board, row, bid, ask, last, volume)
+            return
+        parsed = time.perf_counter_ns()
+        self.state.update_quote(self._board, row, bid, ask, last, volume)
+        self._record_state(time.perf_counter_ns() - parsed)
+        self._record_parse(parsed - started)
+
+    def _handle_book(self, pair: str, parts: List[Dict[str, Any]]) -> None:
+        book = self._books.get(pair)
+        if book is None:
+            return
+        checksum = None
+        for part in parts:
+            if "as" in part or "bs" in part:
+                book.clear()
+                book.apply_many(book.asks, part.get("as", []))
+                book.apply_many(book.bids, part.get("bs", []))
+                book.ready = True
+                continue
+            if not book.ready:
+                return
+            book.apply_many(book.asks, part.get("a", []))
+            book.apply_many(book.bids, part.get("b", []))
+            checksum = part.get("c", checksum)
+        book.truncate()
+        if checksum is not None and int(checksum) != book.kraken_checksum():
+            logger.warning("Kraken book checksum mismatch for %s, resubscribing", pair)
+            book.clear()
+            self._resubscribe.add(pair)
+
+    def _reset_books(self) -> None:
+        self._resubscribe.clear()
+        for book in self._books.values():
+            book.clear()
 
     def _is_stopped(self) -> bool:
         return bool(self.stop_event and self.stop_event.is_set())
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+import zlib
+from dataclasses import dataclass
+from contextlib import suppress
+from typing import Any, Callable, Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+MessageFactory = Callable[[int], str | None]
+
+
+@dataclass
+class MockExchangeStats:
+    connections: int = 0
+    disconnects: int = 0
+    binance_sent: int = 0
+    kraken_sent: int = 0
+    lagging_batches: int = 0
+
+
+def _unit(sequence: int, salt: int) -> float:
+    return ((sequence * 2654435761 + salt * 40503) & 0xFFFFFFFF) / 2**32
+
+
+def _symbol_key(symbol: str) -> int:
+    return zlib.crc32(symbol.upper().replace("/", "").replace("XBT", "BTC").encode())
+
+
+class _PriceFeed:
+    def __init__(self, salt: int, spike_ratio: float) -> None:
+        self.salt = salt
+        self.spike_ratio = spike_ratio
+        self._keys: Dict[str, int] = {}
+
+    def quote(self, symbol: str, sequence: int) -> tuple[float, float]:
+        key = self._keys.get(symbol)
+        if key is None:
+            key = self._keys[symbol] = _symbol_key(symbol)
+        drift = 4e-3 * math.sin(sequence * 1e-4 + key % 1000)
+        noise = 4e-4 * (_unit(sequence, self.salt) - 0.5)
+        mid = 100.0 * (1 + key % 50) * (1 + drift + noise)
+        if _unit(sequence, self.salt + 1) < self.spike_ratio:
+            mid *= 1.01
+        return mid * 0.99995, mid * 1.00005
+
+
+class MockExchangeServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        rate: float = 1000.0,
+        disconnect_every_s: float | None = None,
+        miniticker_ratio: float = 0.1,
+        spike_ratio: float = 0.0005,
+        batch_interval_s: float = 0.005,
+        seed: int = 0,
+        reuse_port: bool = False,
+        random_disconnects: bool = False,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.disconnect_every_s = disconnect_every_s or None
+        self.miniticker_ratio = miniticker_ratio
+        self.spike_ratio = spike_ratio
+        self.batch_interval_s = batch_interval_s
+        self.seed = seed
+        self.reuse_port = reuse_port
+        self.random_disconnects = random_disconnects
+        self.stats = MockExchangeStats()
+        self._server: Any = None
+        self._rng = random.Random(seed)
+        self._began = 0.0
+        self._began_ms = 0
+
+    @property
+    def binance_url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    @property
+    def kraken_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/kraken"
+
+    async def start(self) -> None:
+        self._server = await websockets.serve(
+            self._handle,
+            self.host,
+            self.port,
+            compression=None,
+            max_size=None,
+            reuse_port=self.reuse_port or None,
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._began = asyncio.get_running_loop().time()
+        self._began_ms = time.time_ns() // 1_000_000
+        logger.info("Mock exchange listening on %s:%d", self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, websocket: Any) -> None:
+        self.stats.connections += 1
+        path = websocket.request.path
+        try:
+            if path.startswith("/stream"):
+                await self._serve_binance(websocket, path)
+            else:
+                await self._serve_kraken(websocket)
+        except websockets.ConnectionClosed:
+            pass
+
+    async def _serve_binance(self, websocket: Any, path: str) -> None:
+        streams = parse_qs(urlsplit(path).query).get("streams", [""])[0].split("/")
+        symbols = sorted({stream.split("@")[0].upper() for stream in streams if stream})
+        feed = _PriceFeed(self.seed, self.spike_ratio)
+        miniticker_ratio = self.miniticker_ratio
+        began_ms = self._began_ms
+        rate = self.rate
+
+        def make(sequence: int) -> str | None:
+            if not symbols:
+                return None
+            symbol = symbols[sequence % len(symbols)]
+            bid, ask = feed.quote(symbol, sequence)
+            sent_ns = time.time_ns()
+            if _unit(sequence, self.seed + 2) < miniticker_ratio:
+                event_ms = began_ms + int(sequence * 1000 / rate)
+                return (
+                    f'{{"stream":"{symbol.lower()}@miniTicker","data":{{"e":"24hrMiniTicker",'
+                    f'"E":{event_ms},"s":"{symbol}","c":"{bid:.5f}","o":"{bid:.5f}",'
+                    f'"h":"{ask:.5f}","l":"{bid:.5f}","v":"{1000 + sequence % 997}.0",'
+                    f'"q":"0","T":{sent_ns}}}}}'
+                )
+            return (
+                f'{{"stream":"{symbol.lower()}@bookTicker","data":{{"e":"bookTicker",'
+                f'"u":{sequence},"s":"{symbol}","b":"{bid:.5f}","B":"1.00000",'
+                f'"a":"{ask:.5f}","A":"1.00000","T":{sent_ns}}}}}'
+            )
+
+        reader = asyncio.create_task(self._read_binance_requests(websocket, symbols))
+        try:
+            await self._pump(websocket, make, "binance_sent")
+        finally:
+            reader.cancel()
+            with suppress(asyncio.CancelledError, websockets.ConnectionClosed):
+                await reader
+
+    async def _read_binance_requests(self, websocket: Any, symbols: List[str]) -> None:
+        async for message in websocket:
+            request = json.loads(message)
+            changed = {param.split("@")[0].upper() for param in request.get("params", [])}
+            if request.get("method") == "SUBSCRIBE":
+                symbols.extend(sorted(changed - set(symbols)))
+            elif request.get("method") == "UNSUBSCRIBE":
+                symbols[:] = [symbol for symbol in symbols if symbol not in changed]
+            await websocket.send(json.dumps({"result": None, "id": request.get("id")}))
+
+    async def _serve_kraken(self, websocket: Any) -> None:
+        await websocket.send(
+            json.dumps({"event": "systemStatus", "status": "online", "version": "1.9.0"})
+        )
+        pairs: List[str] = []
+        await self._kraken_request(websocket, pairs, await websocket.recv())
+        feed = _PriceFeed(self.seed + 3, self.spike_ratio)
+
+        def make(sequence: int) -> str | None:
+            if not pairs:
+                return None
+            index = sequence % len(pairs)
+            bid, ask = feed.quote(pairs[index], sequence)
+            return (
+                f'[{index + 1},{{"a":["{ask:.5f}",0,"1.000"],"b":["{bid:.5f}",0,"1.000"],'
+                f'"c":["{bid:.5f}","0.01"],"v":["{sequence % 997}.0","{1000 + sequence % 997}.0"],'
+                f'"T":{time.time_ns()}}},"ticker","{pairs[index]}"]'
+            )
+
+        reader = asyncio.create_task(self._read_kraken_requests(websocket, pairs))
+        try:
+            await self._pump(websocket, make, "kraken_sent")
+        finally:
+            reader.cancel()
+            with suppress(asyncio.CancelledError, websockets.ConnectionClosed):
+                await reader
+
+    async def _read_kraken_requests(self, websocket: Any, pairs: List[str]) -> None:
+        async for message in websocket:
+            await self._kraken_request(websocket, pairs, message)
+
+    async def _kraken_request(self, websocket: Any, pairs: List[str], message: str) -> None:
+        request = json.loads(message)
+        if request.get("subscription", {}).get("name") != "ticker":
+            return
+        event = request.get("event")
+        requested = list(request.get("pair", []))
+        if event == "subscribe":
+            pairs.extend(pair for pair in requested if pair not in pairs)
+        elif event == "unsubscribe":
+            pairs[:] = [pair for pair in pairs if pair not in requested]
+        else:
+            return
+        for pair in requested:
+            await websocket.send(
+                json.dumps(
+                    {
+                        "channelName": "ticker",
+                        "event": "subscriptionStatus",
+                        "pair": pair,
+                        "status": f"{event}d",
+                        "subscription": {"name": "ticker"},
+                    }
+                )
+            )
+
+    async def _pump(self, websocket: Any, make: MessageFactory, counter: str) -> None:
+        loop = asyncio.get_running_loop()
+        began = self._began
+        disconnect_at = None
+        if self.disconnect_every_s:
+            delay = self.disconnect_every_s
+            if self.random_disconnects:
+                delay = self._rng.expovariate(1 / delay)
+            disconnect_at = loop.time() + delay
+        max_burst = max(1, int(self.rate * self.batch_interval_s * 4))
+        sent = int((loop.time() - began) * self.rate)
+        while True:
+            now = loop.time()
+            if disconnect_at is not None and now >= disconnect_at:
+                self.stats.disconnects += 1
+                await websocket.close(1012, "mock restart")
+                return
+            due = int((now - began) * self.rate)
+            if due - sent > max_burst:
+                self.stats.lagging_batches += 1
+                due = sent + max_burst
+            batch = due - sent
+            for sequence in range(sent, due):
+                message = make(sequence)
+                if message is not None:
+                    await websocket.send(message)
+            sent = due
+            setattr(self.stats, counter, getattr(self.stats, counter) + batch)
+            await asyncio.sleep(self.batch_interval_s)
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import queue
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from app.collectors.binance import BinanceCollector
+from app.collectors.kraken import KrakenCollector
+from app.config import BINANCE_REST_URL
+from app.core.price_board import NAN, ExchangeBoard
+from app.core.shared_board import SharedPriceBoard, SlotKey
+from app.core.state import SharedState, StreamStats
+from app.logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+BOARD_POLL_S = 0.001
+STOP_POLL_S = 0.2
+EVENT_QUEUE_SIZE = 10_000
+JOIN_TIMEOUT_S = 5.0
+
+
+@dataclass
+class WorkerSpec:
+    exchange: str
+    symbols_map: Dict[str, str]
+    url: str
+    connections: int = 1
+    rest_url: str = BINANCE_REST_URL
+    standby: bool = False
+
+
+class ShardState(SharedState):
+    def __init__(self, board: SharedPriceBoard, events: Any, worker: int) -> None:
+        super().__init__()
+        self.shared = board
+        self.events = events
+        self.worker = worker
+
+    def slot(self, exchange: str, symbol_std: str) -> int:
+        return self.shared.index[(exchange, symbol_std)]
+
+    def update_book(self, board: ExchangeBoard, row: int, bid: float, ask: float) -> None:
+        self.shared.write_book(row, bid, ask)
+
+    def update_quote(
+        self,
+        board: ExchangeBoard,
+        row: int,
+        bid: float,
+        ask: float,
+        last: float = NAN,
+        volume: float = NAN,
+    ) -> None:
+        self.shared.write_quote(row, bid, ask, last, volume)
+
+    def update_ticker(self, board: ExchangeBoard, row: int, last: float, volume: float) -> None:
+        self.shared.write_ticker(row, last, volume)
+
+    def set_status(self, exchange: str, connected: bool, message: str | None = None) -> None:
+        self._emit(("status", self.worker, exchange, connected, message))
+
+    def set_stream_stats(self, name: str, stats: StreamStats) -> None:
+        self._emit(("stream", self.worker, name, replace(stats)))
+
+    def _emit(self, event: Tuple[Any, ...]) -> None:
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            pass
+
+
+def run_worker(
+    spec: WorkerSpec,
+    worker: int,
+    board_name: str,
+    keys: List[SlotKey],
+    events: Any,
+    stop_event: Any,
+) -> None:
+    setup_logging()
+    events.cancel_join_thread()
+    board = SharedPriceBoard.attach(board_name, keys)
+    try:
+        asyncio.run(_serve(spec, ShardState(board, events, worker), stop_event))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        board.close()
+
+
+async def _serve(spec: WorkerSpec, state: ShardState, stop_event: Any) -> None:
+    if spec.exchange == "binance":
+        collector: Any = BinanceCollector(
+            spec.symbols_map,
+            state,
+            stop_event,
+            url=spec.url,
+            rest_url=spec.rest_url,
+            connections=spec.connections,
+            standby=spec.standby,
+        )
+    else:
+        collector = KrakenCollector(
+            spec.symbols_map, state, stop_event, url=spec.url, standby=spec.standby
+        )
+    task = asyncio.create_task(collector.run())
+    while not stop_event.is_set() and not task.done():
+        await asyncio.sleep(STOP_POLL_S)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+def split_specs(
+    exchange: str,
+    symbols_map: Dict[str, str],
+    processes: int,
+    url: str,
+    connections: int = 1,
+    rest_url: str = BINANCE_REST_URL,
+    standby: bool = False,
+) -> List[WorkerSpec]:
+    items = list(symbols_map.items())
+    count = max(1, min(processes, len(items)))
+    return [
+        WorkerSpec(exchange, dict(items[index::count]), url, connections, rest_url, standby)
+        for index in range(count)
+    ]
+
+
+class CollectorPool:
+    def __init__(self, specs: List[WorkerSpec], state: SharedState) -> None:
+        self.specs = specs
+        self.state = state
+        keys = [(spec.exchange, symbol) for spec in specs for symbol in spec.symbols_map]
+        self.board = SharedPriceBoard.create(keys)
+        self._targets = [
+            (state.board(exchange), state.slot(exchange, symbol)) for exchange, symbol in keys
+        ]
+        self._seen = np.zeros(len(keys), dtype=np.int64)
+        self._status: Dict[Tuple[str, int], Tuple[bool, str | None]] = {}
+        context = multiprocessing.get_context("spawn")
+        self.events = context.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self.stop_event = context.Event()
+        self.processes = [
+            context.Process(
+                target=run_worker,
+                args=(spec, worker, self.board.name, keys, self.events, self.stop_event),
+                name=f"collector-{spec.exchange}-{worker}",
+                daemon=True,
+            )
+            for worker, spec in enumerate(specs)
+        ]
+
+    def start(self) -> None:
+        for process in self.processes:
+            process.start()
+        logger.info("Started %d collector processes", len(self.processes))
+
+    async def run(self) -> None:
+        while True:
+            self.sync()
+            self.drain_events()
+            await asyncio.sleep(BOARD_POLL_S)
+
+    def sync(self) -> int:
+        slots, values = self.board.changes(self._seen)
+        published = 0
+        targets = self._targets
+        for slot, (bid, ask, last, volume) in zip(slots.tolist(), values.tolist()):
+            if bid != bid:
+                continue
+            board, row = targets[slot]
+            self.state.update_quote(board, row, bid, ask, last, volume)
+            published += 1
+        return published
+
+    def drain_events(self) -> None:
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                return
+            if event[0] == "stream":
+                _, worker, name, stats = event
+                self.state.set_stream_stats(f"p{worker}:{name}", stats)
+                continue
+            _, worker, exchange, connected, message = event
+            self._status[(exchange, worker)] = (connected, message)
+            workers = [item for key, item in self._status.items() if key[0] == exchange]
+            up = sum(1 for item in workers if item[0])
+            total = sum(1 for spec in self.specs if spec.exchange == exchange)
+            if total > 1:
+                message = f"p{worker}: {message} ({up}/{total} processes connected)"
+            self.state.set_status(exchange, up > 0, message)
+
+    def writes(self) -> int:
+        return self.board.writes()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(JOIN_TIMEOUT_S)
+            if process.is_alive():
+                logger.warning("Collector process %s did not stop, terminating", process.name)
+                process.terminate()
+                process.join(JOIN_TIMEOUT_S)
+        self.events.close()
+        self.events.join_thread()
+        self.board.close()
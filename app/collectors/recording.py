@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Callable, Iterable, Iterator, List, Mapping, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "frames-"
+SEGMENT_SUFFIX = ".log.gz"
+
+Frame = Tuple[int, str, str]
+FrameHandler = Callable[[str], None]
+
+
+def list_segments(directory: str | Path) -> List[Path]:
+    root = Path(directory)
+    if not root.is_dir():
+        return []
+    return sorted(root.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"))
+
+
+def read_frames(paths: Iterable[str | Path]) -> Iterator[Frame]:
+    for path in paths:
+        try:
+            with gzip.open(path, "rt", encoding="utf-8", newline="\n") as handle:
+                for line in handle:
+                    if not line.endswith("\n"):
+                        break
+                    recv_ns, exchange, frame = line[:-1].split("\t", 2)
+                    yield int(recv_ns), exchange, frame
+        except (EOFError, gzip.BadGzipFile) as exc:
+            logger.warning("Truncated frame segment %s: %s", path, exc)
+
+
+class FrameRecorder:
+    def __init__(
+        self,
+        directory: str | Path,
+        segment_bytes: int = 64 * 1024 * 1024,
+        segment_seconds: float = 3600.0,
+        flush_interval_s: float = 1.0,
+        compresslevel: int = 6,
+    ) -> None:
+        self.directory = Path(directory)
+        self.segment_bytes = max(1, segment_bytes)
+        self.segment_seconds = segment_seconds
+        self.flush_interval_s = flush_interval_s
+        self.compresslevel = compresslevel
+        self.frames = 0
+        self.segments = 0
+        self._lock = threading.Lock()
+        self._handle: IO[str] | None = None
+        self._opened_at = 0.0
+        self._flushed_at = 0.0
+        self._segment_size = 0
+
+    def record(self, exchange: str, frame: str | bytes, recv_ns: int | None = None) -> None:
+        if recv_ns is None:
+            recv_ns = time.time_ns()
+        if isinstance(frame, bytes):
+            frame = frame.decode("utf-8")
+        line = f"{recv_ns}\t{exchange}\t{frame.replace(chr(10), ' ')}\n"
+        with self._lock:
+            now = time.monotonic()
+            if (
+                self._handle is None
+                or self._segment_size >= self.segment_bytes
+                or now - self._opened_at >= self.segment_seconds
+            ):
+                self._rotate(now)
+            self._handle.write(line)
+            self._segment_size += len(line)
+            self.frames += 1
+            if now - self._flushed_at >= self.flush_interval_s:
+                self._handle.flush()
+                self._flushed_at = now
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_segment()
+
+    def _rotate(self, now: float) -> None:
+        self._close_segment()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        path = self.directory / f"{SEGMENT_PREFIX}{stamp}{SEGMENT_SUFFIX}"
+        self._handle = gzip.open(
+            path, "at", compresslevel=self.compresslevel, encoding="utf-8", newline="\n"
+        )
+        self._opened_at = now
+        self._flushed_at = now
+        self._segment_size = 0
+        self.segments += 1
+        logger.info("Recording websocket frames to %s", path)
+
+    def _close_segment(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+@dataclass
+class ReplayStats:
+    frames: int = 0
+    skipped: int = 0
+    failed: int = 0
+    elapsed_s: float = 0.0
+    recorded_span_s: float = 0.0
+
+
+class FrameReplayer:
+    def __init__(
+        self,
+        frames: Iterable[Frame],
+        speed: float | None = 1.0,
+        yield_every: int = 500,
+    ) -> None:
+        self.frames = frames
+        self.speed = speed if speed and speed > 0 else None
+        self.yield_every = max(1, yield_every)
+
+    @classmethod
+    def from_directory(cls, directory: str | Path, speed: float | None = 1.0) -> FrameReplayer:
+        return cls(read_frames(list_segments(directory)), speed=speed)
+
+    async def run(
+        self,
+        handlers: Mapping[str, FrameHandler],
+        stop_event: threading.Event | None = None,
+    ) -> ReplayStats:
+        stats = ReplayStats()
+        began = time.monotonic()
+        first_ns: int | None = None
+        recv_ns = 0
+        for index, (recv_ns, exchange, frame) in enumerate(self.frames):
+            if stop_event is not None and stop_event.is_set():
+                break
+            if first_ns is None:
+                first_ns = recv_ns
+            delay = 0.0
+            if self.speed is not None:
+                due = began + (recv_ns - first_ns) / 1e9 / self.speed
+                delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif index % self.yield_every == 0:
+                await asyncio.sleep(0)
+            handler = handlers.get(exchange)
+            if handler is None:
+                stats.skipped += 1
+                continue
+            try:
+                handler(frame)
+            except Exception:  # noqa: BLE001
+                stats.failed += 1
+                logger.exception("Replayed %s frame failed", exchange)
+                continue
+            stats.frames += 1
+        stats.elapsed_s = time.monotonic() - began
+        if first_ns is not None:
+            stats.recorded_span_s = (recv_ns - first_ns) / 1e9
+        return stats
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, Set
+
+from app.core.latency import Recorder
+from app.core.state import StreamStats
+
+STANDBY_RECONNECT_S = 0.1
+
+
+class StandbyGroup:
+    def __init__(self, stats: Dict[str, StreamStats], record_gap: Recorder | None = None) -> None:
+        self.stats = stats
+        self.record_gap = record_gap
+        self.live: Set[str] = set()
+        self._gap_started: int | None = None
+        self._gap_owner: str | None = None
+
+    def up(self, name: str) -> None:
+        self.live.add(name)
+        if self._gap_started is None or self._gap_owner is None:
+            return
+        gap_ns = time.perf_counter_ns() - self._gap_started
+        self.stats[self._gap_owner].gap_ms += gap_ns / 1e6
+        if self.record_gap is not None:
+            self.record_gap(gap_ns)
+        self._gap_started = None
+        self._gap_owner = None
+
+    def down(self, name: str) -> None:
+        if name not in self.live:
+            return
+        self.live.discard(name)
+        stats = self.stats[name]
+        if self.live:
+            stats.failovers += 1
+            return
+        stats.gaps += 1
+        self._gap_started = time.perf_counter_ns()
+        self._gap_owner = name
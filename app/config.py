@@ -7,27 +7,85 @@ from typing import Any, Dict, List
 
 DEFAULT_SETTINGS_PATH = Path("app/data/settings.json")
 DEFAULT_DB_PATH = Path("app/data/app.db")
+DEFAULT_RECORDING_DIR = Path("app/data/recordings")
+BINANCE_WS_URL = "wss://stream.binance.com:9443"
+BINANCE_REST_URL = "https://api.binance.com"
+KRAKEN_WS_URL = "wss://ws.kraken.com"
+EVALUATION_MODES = ("snapshot", "tick")
+ENGINE_MODES = ("pairwise", "matrix")
+SNAPSHOT_STORAGE_MODES = ("full", "delta")
+COLLECTOR_MODES = ("embedded", "daemon")
 
 
 @dataclass
 class Settings:
     watchlist: List[str] = field(default_factory=lambda: ["BTC/USDT", "ETH/USDT"])
     snapshot_interval_s: int = 1
+    evaluation_mode: str = "snapshot"
+    engine_mode: str = "pairwise"
+    snapshot_storage: str = "full"
     binance_fee: float = 0.001
     kraken_fee: float = 0.0026
     min_net_pct: float = 0.2
     db_path: str = str(DEFAULT_DB_PATH)
     mapping_overrides: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    writer_queue_size: int = 10_000
+    writer_flush_size: int = 500
+    writer_flush_interval_s: float = 0.5
+    rollup_interval_s: int = 60
+    raw_retention_days: float = 0
+    archive_enabled: bool = False
+    record_frames: bool = False
+    recording_dir: str = str(DEFAULT_RECORDING_DIR)
+    recording_segment_mb: int = 64
+    binance_ws_url: str = BINANCE_WS_URL
+    kraken_ws_url: str = KRAKEN_WS_URL
+    metrics_path: str = ""
+    book_depth: int = 0
+    depth_notional: float = 1000.0
+    binance_rest_url: str = BINANCE_REST_URL
+    binance_connections: int = 1
+    collector_processes: int = 0
+    hot_standby: bool = False
+    api_host: str = "127.0.0.1"
+    api_port: int = 8765
+    collector_mode: str = "embedded"
+    graph_cycles: bool = False
 
     def to_dict(self) -> Dict[str, Any]:
         return {
             "watchlist": self.watchlist,
             "snapshot_interval_s": self.snapshot_interval_s,
+            "evaluation_mode": self.evaluation_mode,
+            "engine_mode": self.engine_mode,
+            "snapshot_storage": self.snapshot_storage,
             "binance_fee": self.binance_fee,
             "kraken_fee": self.kraken_fee,
             "min_net_pct": self.min_net_pct,
             "db_path": self.db_path,
             "mapping_overrides": self.mapping_overrides,
+            "writer_queue_size": self.writer_queue_size,
+            "writer_flush_size": self.writer_flush_size,
+            "writer_flush_interval_s": self.writer_flush_interval_s,
+            "rollup_interval_s": self.rollup_interval_s,
+            "raw_retention_days": self.raw_retention_days,
+            "archive_enabled": self.archive_enabled,
+            "record_frames": self.record_frames,
+            "recording_dir": self.recording_dir,
+            "recording_segment_mb": self.recording_segment_mb,
+            "binance_ws_url": self.binance_ws_url,
+            "kraken_ws_url": self.kraken_ws_url,
+            "metrics_path": self.metrics_path,
+            "book_depth": self.book_depth,
+            "depth_notional": self.depth_notional,
+            "binance_rest_url": self.binance_rest_url,
+            "binance_connections": self.binance_connections,
+            "collector_processes": self.collector_processes,
+            "hot_standby": self.hot_standby,
+            "api_host": self.api_host,
+            "api_port": self.api_port,
+            "collector_mode": self.collector_mode,
+            "graph_cycles": self.graph_cycles,
         }
 
 
@@ -42,11 +100,36 @@ def load_settings(path: Path | None = None) -> Settings:
     return Settings(
         watchlist=data.get("watchlist", ["BTC/USDT", "ETH/USDT"]),
         snapshot_interval_s=int(data.get("snapshot_interval_s", 1)),
+        evaluation_mode=str(data.get("evaluation_mode", "snapshot")),
+        engine_mode=str(data.get("engine_mode", "pairwise")),
+        snapshot_storage=str(data.get("snapshot_storage", "full")),
         binance_fee=float(data.get("binance_fee", 0.001)),
         kraken_fee=float(data.get("kraken_fee", 0.0026)),
         min_net_pct=float(data.get("min_net_pct", 0.2)),
         db_path=str(data.get("db_path", DEFAULT_DB_PATH)),
         mapping_overrides=data.get("mapping_overrides", {}),
+        writer_queue_size=int(data.get("writer_queue_size", 10_000)),
+        writer_flush_size=int(data.get("writer_flush_size", 500)),
+        writer_flush_interval_s=float(data.get("writer_flush_interval_s", 0.5)),
+        rollup_interval_s=int(data.get("rollup_interval_s", 60)),
+        raw_retention_days=float(data.get("raw_retention_days", 0)),
+        archive_enabled=bool(data.get("archive_enabled", False)),
+        record_frames=bool(data.get("record_frames", False)),
+        recording_dir=str(data.get("recording_dir", DEFAULT_RECORDING_DIR)),
+        recording_segment_mb=int(data.get("recording_segment_mb", 64)),
+        binance_ws_url=str(data.get("binance_ws_url", BINANCE_WS_URL)),
+        kraken_ws_url=str(data.get("kraken_ws_url", KRAKEN_WS_URL)),
+        metrics_path=str(data.get("metrics_path", "")),
+        book_depth=int(data.get("book_depth", 0)),
+        depth_notional=float(data.get("depth_notional", 1000.0)),
+        binance_rest_url=str(data.get("binance_rest_url", BINANCE_REST_URL)),
+        binance_connections=int(data.get("binance_connections", 1)),
+        collector_processes=int(data.get("collector_processes", 0)),
+        hot_standby=bool(data.get("hot_standby", False)),
+        api_host=str(data.get("api_host", "127.0.0.1")),
+        api_port=int(data.get("api_port", 8765)),
+        collector_mode=str(data.get("collector_mode", "embedded")),
+        graph_cycles=bool(data.get("graph_cycles", False)),
     )
 
 
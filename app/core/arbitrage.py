@@ -2,9 +2,9 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Dict, Tuple
+from typing import Dict, Iterable, Iterator, List, Tuple
 
-from app.storage.models import ArbitrageMetric
+from app.storage.models import ArbitrageMetric, MetricRow
 
 
 @dataclass
@@ -13,6 +13,8 @@ class ArbitrageResult:
     direction: str
     raw_spread: float
     net_pct: float
+    exec_qty: float | None = None
+    vwap_net_pct: float | None = None
 
 
 @dataclass
@@ -22,6 +24,64 @@ class EventState:
     max_net_pct: float
     sum_net_pct: float
     samples: int
+    max_exec_qty: float | None = None
+    max_vwap_net_pct: float | None = None
+
+    def observe_depth(self, result: ArbitrageResult) -> None:
+        if result.exec_qty is not None:
+            self.max_exec_qty = max(self.max_exec_qty or 0.0, result.exec_qty)
+        if result.vwap_net_pct is not None:
+            self.max_vwap_net_pct = (
+                result.vwap_net_pct
+                if self.max_vwap_net_pct is None
+                else max(self.max_vwap_net_pct, result.vwap_net_pct)
+            )
+
+
+def depth_fill(
+    bids: Iterable[Tuple[float, float]],
+    asks: Iterable[Tuple[float, float]],
+    sell_fee: float,
+    buy_fee: float,
+    notional: float,
+) -> Tuple[float, float | None]:
+    bid_levels: Iterator[Tuple[float, float]] = iter(bids)
+    ask_levels: Iterator[Tuple[float, float]] = iter(asks)
+    bid = next(bid_levels, None)
+    ask = next(ask_levels, None)
+    if bid is None or ask is None:
+        return 0.0, None
+    (bid_price, bid_left), (ask_price, ask_left) = bid, ask
+    budget = notional
+    executable = proceeds = cost = 0.0
+    profitable = True
+    while True:
+        affordable = budget / ask_price
+        quantity = min(bid_left, ask_left, affordable)
+        proceeds += quantity * bid_price
+        cost += quantity * ask_price
+        profitable = profitable and bid_price * (1 - sell_fee) > ask_price * (1 + buy_fee)
+        if profitable:
+            executable += quantity
+        if quantity >= affordable:
+            break
+        budget -= quantity * ask_price
+        bid_left -= quantity
+        ask_left -= quantity
+        if bid_left <= 0:
+            bid = next(bid_levels, None)
+            if bid is None:
+                break
+            bid_price, bid_left = bid
+        if ask_left <= 0:
+            ask = next(ask_levels, None)
+            if ask is None:
+                break
+            ask_price, ask_left = ask
+    if not cost:
+        return 0.0, None
+    net = proceeds * (1 - sell_fee) - cost * (1 + buy_fee)
+    return executable, net / cost * 100
 
 
 class ArbitrageEngine:
@@ -46,6 +106,24 @@ class ArbitrageEngine:
         direction = f"{sell_exchange}_sell/{buy_exchange}_buy"
         return ArbitrageResult(symbol_std, direction, raw_spread, net_pct)
 
+    def compute_depth(
+        self,
+        result: ArbitrageResult,
+        sell_exchange: str,
+        bids: Iterable[Tuple[float, float]],
+        buy_exchange: str,
+        asks: Iterable[Tuple[float, float]],
+        notional: float,
+    ) -> ArbitrageResult:
+        result.exec_qty, result.vwap_net_pct = depth_fill(
+            bids,
+            asks,
+            self.fee_map.get(sell_exchange, 0.0),
+            self.fee_map.get(buy_exchange, 0.0),
+            notional,
+        )
+        return result
+
     def update_event_state(
         self,
         result: ArbitrageResult,
@@ -63,11 +141,13 @@ class ArbitrageEngine:
                     sum_net_pct=result.net_pct,
                     samples=1,
                 )
+                state.observe_depth(result)
                 self.events[key] = state
                 return "start", state
             state.max_net_pct = max(state.max_net_pct, result.net_pct)
             state.sum_net_pct += result.net_pct
             state.samples += 1
+            state.observe_depth(result)
             return "update", state
         if state is None:
             return "none", None
@@ -75,6 +155,18 @@ class ArbitrageEngine:
         state.samples += 1
         return "close", state
 
+    def open_events(self) -> Dict[Tuple[str, str], EventState]:
+        return dict(self.events)
+
+    def reconfigure(self, fee_map: Dict[str, float], threshold_pct: float) -> None:
+        self.fee_map = dict(fee_map)
+        self.threshold_pct = threshold_pct
+
+    def drop_events(self, symbols: Iterable[str]) -> List[EventState]:
+        dropped = set(symbols)
+        keys = [key for key in self.events if key[0] in dropped]
+        return [self.events.pop(key) for key in keys]
+
     def finalize_event(self, symbol_std: str, direction: str) -> EventState | None:
         return self.events.pop((symbol_std, direction), None)
 
@@ -86,4 +178,18 @@ class ArbitrageEngine:
             direction=result.direction,
             raw_spread=result.raw_spread,
             net_pct=result.net_pct,
+            exec_qty=result.exec_qty,
+            vwap_net_pct=result.vwap_net_pct,
+        )
+
+    @staticmethod
+    def to_metric_row(result: ArbitrageResult, timestamp: datetime) -> MetricRow:
+        return (
+            timestamp,
+            result.symbol_std,
+            result.direction,
+            result.raw_spread,
+            result.net_pct,
+            result.exec_qty,
+            result.vwap_net_pct,
         )
@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Sequence, Set, Tuple
+
+from app.core.arbitrage import EventState
+from app.core.spread_matrix import Transition
+from app.core.state import Prices
+
+INF = math.inf
+RELAX_EPS = 1e-12
+RESCAN_EVERY = 256
+MAX_CYCLE_LEGS = 3
+QUOTE_PRIORITY = ("USDT", "USD", "USDC", "EUR", "BTC", "ETH")
+
+Node = Tuple[str, str]
+
+
+@dataclass
+class Cycle:
+    nodes: Tuple[Node, ...]
+    edges: Tuple[int, ...]
+    symbols: Tuple[str, ...]
+
+
+class GraphArbitrageEngine:
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        fee_map: Dict[str, float],
+        threshold_pct: float,
+        rescan_every: int = RESCAN_EVERY,
+        max_legs: int = MAX_CYCLE_LEGS,
+    ) -> None:
+        self.threshold_pct = threshold_pct
+        self.rescan_every = rescan_every
+        self.max_legs = max_legs
+        self.events: Dict[Tuple[str, str], EventState] = {}
+        self.cycles: Dict[Tuple[str, str], Cycle] = {}
+        self._edge_cycles: Dict[int, Set[Tuple[str, str]]] = {}
+        self.relaxations = 0
+        self._steps = 0
+        self._build(symbols, fee_map)
+
+    def _build(self, symbols: Sequence[str], fee_map: Dict[str, float]) -> None:
+        self.symbols = list(symbols)
+        self.fee_map = dict(fee_map)
+        self.nodes: List[Node] = []
+        self._node_index: Dict[Node, int] = {}
+        self.tail: List[int] = []
+        self.head: List[int] = []
+        self.weight: List[float] = []
+        self.edge_symbol: List[str | None] = []
+        self.out: List[List[int]] = []
+        self.into: List[List[int]] = []
+        self._between: Dict[Tuple[int, int], int] = {}
+        self._quote_edges: Dict[Tuple[str, str], Tuple[int, int, float]] = {}
+        for symbol in self.symbols:
+            base, quote = symbol.split("/")
+            for exchange, fee in self.fee_map.items():
+                buy = self._add_edge((exchange, quote), (exchange, base), symbol)
+                sell = self._add_edge((exchange, base), (exchange, quote), symbol)
+                self._quote_edges[(exchange, symbol)] = (buy, sell, -math.log1p(-fee))
+        assets: Dict[str, List[str]] = {}
+        for exchange, asset in list(self.nodes):
+            assets.setdefault(asset, []).append(exchange)
+        for asset, exchanges in assets.items():
+            for source in exchanges:
+                for target in exchanges:
+                    if source != target:
+                        edge = self._add_edge((source, asset), (target, asset), None)
+                        self.weight[edge] = 0.0
+        size = len(self.nodes)
+        self.dist = [0.0] * size
+        self.pred = [-1] * size
+        self._dirty: Dict[int, float] = {}
+        self._rescan = True
+
+    def _node(self, key: Node) -> int:
+        index = self._node_index.get(key)
+        if index is None:
+            index = self._node_index[key] = len(self.nodes)
+            self.nodes.append(key)
+            self.out.append([])
+            self.into.append([])
+        return index
+
+    def _add_edge(self, source: Node, target: Node, symbol: str | None) -> int:
+        u = self._node(source)
+        v = self._node(target)
+        edge = len(self.tail)
+        self.tail.append(u)
+        self.head.append(v)
+        self.weight.append(INF)
+        self.edge_symbol.append(symbol)
+        self.out[u].append(edge)
+        self.into[v].append(edge)
+        self._between[(u, v)] = edge
+        return edge
+
+    def update_quote(self, symbol_std: str, exchange: str, bid: float, ask: float) -> None:
+        edges = self._quote_edges.get((exchange, symbol_std))
+        if edges is None:
+            return
+        buy, sell, fee_cost = edges
+        self._set_weight(buy, math.log(ask) + fee_cost if ask > 0 else INF)
+        self._set_weight(sell, -math.log(bid) + fee_cost if bid > 0 else INF)
+
+    def _set_weight(self, edge: int, weight: float) -> None:
+        if weight != weight:
+            weight = INF
+        current = self.weight[edge]
+        if weight == current:
+            return
+        self._dirty.setdefault(edge, current)
+        self.weight[edge] = weight
+
+    def load_prices(self, prices: Prices, symbols: Iterable[str] | None = None) -> None:
+        for symbol in self.symbols if symbols is None else symbols:
+            for exchange in self.fee_map:
+                data = prices.get(exchange, {}).get(symbol)
+                if data is None:
+                    self.update_quote(symbol, exchange, math.nan, math.nan)
+                else:
+                    self.update_quote(symbol, exchange, data.bid, data.ask)
+
+    def step(self, timestamp: datetime) -> List[Transition]:
+        dirty = self._dirty
+        self._dirty = {}
+        self._steps += 1
+        if self.rescan_every and self._steps % self.rescan_every == 0:
+            self._rescan = True
+        if self._rescan:
+            self._rescan = False
+            found = self._search(range(len(self.nodes)), reset=True)
+        else:
+            found = self._search(self._touched(dirty))
+        candidates: Dict[Tuple[str, str], Cycle] = {}
+        for cycle_nodes in found:
+            for nodes in self._split(cycle_nodes):
+                cycle = self._describe(nodes)
+                if 3 <= len(cycle.symbols) <= self.max_legs:
+                    candidates[self._label(cycle)] = cycle
+        for edge in dirty:
+            for key in self._edge_cycles.get(edge, ()):
+                candidates.setdefault(key, self.cycles[key])
+        transitions: List[Transition] = []
+        for key, cycle in candidates.items():
+            net_pct = self.net_pct(cycle)
+            state = self.events.get(key)
+            if not math.isfinite(net_pct):
+                if state is not None:
+                    self._forget(key)
+                    transitions.append(Transition("close", key[0], key[1], state))
+                continue
+            if net_pct >= self.threshold_pct:
+                if state is None:
+                    state = EventState(None, timestamp, net_pct, net_pct, 1)
+                    self._track(key, cycle, state)
+                    transitions.append(Transition("start", key[0], key[1], state))
+                    continue
+                state.max_net_pct = max(state.max_net_pct, net_pct)
+            elif state is None:
+                continue
+            state.sum_net_pct += net_pct
+            state.samples += 1
+            if net_pct < self.threshold_pct:
+                self._forget(key)
+                transitions.append(Transition("close", key[0], key[1], state))
+        return transitions
+
+    def _track(self, key: Tuple[str, str], cycle: Cycle, state: EventState) -> None:
+        self.events[key] = state
+        self.cycles[key] = cycle
+        for edge in cycle.edges:
+            self._edge_cycles.setdefault(edge, set()).add(key)
+
+    def _forget(self, key: Tuple[str, str]) -> EventState:
+        for edge in self.cycles.pop(key).edges:
+            keys = self._edge_cycles[edge]
+            keys.discard(key)
+            if not keys:
+                del self._edge_cycles[edge]
+        return self.events.pop(key)
+
+    def _touched(self, dirty: Dict[int, float]) -> List[int]:
+        sources = []
+        for edge, previous in dirty.items():
+            v = self.head[edge]
+            if self.weight[edge] > previous and self.pred[v] == edge:
+                sources.extend(self._detach(v))
+            sources.append(self.tail[edge])
+        return sources
+
+    def _detach(self, root: int) -> List[int]:
+        subtree = [root]
+        for node in subtree:
+            for edge in self.out[node]:
+                child = self.head[edge]
+                if self.pred[child] == edge:
+                    subtree.append(child)
+        for node in subtree:
+            self.dist[node] = 0.0
+            self.pred[node] = -1
+        return [self.tail[edge] for node in subtree for edge in self.into[node]]
+
+    def _search(self, sources: Iterable[int], reset: bool = False) -> List[List[int]]:
+        dist, pred, head, weight, out = self.dist, self.pred, self.head, self.weight, self.out
+        if reset:
+            for node in range(len(dist)):
+                dist[node] = 0.0
+                pred[node] = -1
+        queue: Deque[int] = deque()
+        queued = [False] * len(dist)
+        for node in sources:
+            if not queued[node]:
+                queued[node] = True
+                queue.append(node)
+        found: List[List[int]] = []
+        budget = len(dist) * len(self.tail)
+        while queue:
+            budget -= 1
+            if budget < 0:
+                self._rescan = True
+                break
+            u = queue.popleft()
+            queued[u] = False
+            du = dist[u]
+            for edge in out[u]:
+                v = head[edge]
+                candidate = du + weight[edge]
+                if candidate >= dist[v] - RELAX_EPS:
+                    continue
+                self.relaxations += 1
+                cycle = self._cycle_through(u, v)
+                if cycle is not None:
+                    found.append(cycle)
+                    continue
+                dist[v] = candidate
+                pred[v] = edge
+                if not queued[v]:
+                    queued[v] = True
+                    queue.append(v)
+        return found
+
+    def _cycle_through(self, u: int, v: int) -> List[int] | None:
+        path = [u]
+        node = u
+        for _ in range(len(self.nodes)):
+            if node == v:
+                path.reverse()
+                return path
+            edge = self.pred[node]
+            if edge < 0:
+                return None
+            node = self.tail[edge]
+            path.append(node)
+        return None
+
+    def _split(self, nodes: List[int]) -> List[List[int]]:
+        size = len(nodes)
+        for i in range(size):
+            asset = self.nodes[nodes[i]][1]
+            for j in range(i + 2, size):
+                if (i == 0 and j == size - 1) or self.nodes[nodes[j]][1] != asset:
+                    continue
+                inner = nodes[i:j]
+                outer = nodes[j:] + nodes[:i]
+                return [
+                    part
+                    for half in (inner, outer)
+                    if self._weight(half) < 0
+                    for part in self._split(half)
+                ]
+        return [nodes]
+
+    def _weight(self, nodes: Sequence[int]) -> float:
+        total = 0.0
+        for index, node in enumerate(nodes):
+            edge = self._between.get((node, nodes[(index + 1) % len(nodes)]))
+            if edge is None:
+                return INF
+            total += self.weight[edge]
+        return total
+
+    def _describe(self, nodes: List[int]) -> Cycle:
+        size = len(nodes)
+        starts = [
+            index
+            for index in range(size)
+            if self.nodes[nodes[index]][0] == self.nodes[nodes[(index + 1) % size]][0]
+        ]
+        start = min(starts, key=lambda index: _node_rank(self.nodes[nodes[index]]))
+        rotated = nodes[start:] + nodes[:start]
+        edges = tuple(
+            self._between[(node, rotated[(index + 1) % size])] for index, node in enumerate(rotated)
+        )
+        symbols = tuple(self.edge_symbol[edge] for edge in edges if self.edge_symbol[edge])
+        return Cycle(tuple(self.nodes[node] for node in rotated), edges, symbols)
+
+    def _label(self, cycle: Cycle) -> Tuple[str, str]:
+        assets = [cycle.nodes[0][1]]
+        exchanges = []
+        size = len(cycle.nodes)
+        for index, (exchange, asset) in enumerate(cycle.nodes):
+            following = cycle.nodes[(index + 1) % size]
+            if following[0] == exchange:
+                assets.append(following[1])
+                exchanges.append(exchange)
+        return ">".join(assets), ">".join(exchanges)
+
+    def net_pct(self, cycle: Cycle) -> float:
+        total = sum(self.weight[edge] for edge in cycle.edges)
+        if total == INF:
+            return -INF
+        return math.expm1(-total) * 100
+
+    def reconfigure(
+        self, symbols: Sequence[str], fee_map: Dict[str, float], threshold_pct: float
+    ) -> List[EventState]:
+        weights = {
+            key: (self.weight[buy], self.weight[sell], fee_cost)
+            for key, (buy, sell, fee_cost) in self._quote_edges.items()
+        }
+        self._build(symbols, fee_map)
+        for key, (buy_weight, sell_weight, fee_cost) in weights.items():
+            edges = self._quote_edges.get(key)
+            if edges is None:
+                continue
+            buy, sell, new_cost = edges
+            self.weight[buy] = buy_weight - fee_cost + new_cost
+            self.weight[sell] = sell_weight - fee_cost + new_cost
+        self._dirty = dict(enumerate(self.weight))
+        self.threshold_pct = threshold_pct
+        cycles, events = self.cycles, self.events
+        self.cycles, self.events, self._edge_cycles = {}, {}, {}
+        dropped = []
+        for key, cycle in cycles.items():
+            indices = [self._node_index.get(node) for node in cycle.nodes]
+            if None not in indices and self._weight(indices) < INF:
+                self._track(key, self._describe(indices), events[key])
+            else:
+                dropped.append(events[key])
+        return dropped
+
+    def drop_events(self, symbols: Iterable[str]) -> List[EventState]:
+        dropped = set(symbols)
+        keys = [key for key, cycle in self.cycles.items() if dropped.intersection(cycle.symbols)]
+        return [self._forget(key) for key in keys]
+
+    def open_events(self) -> Dict[Tuple[str, str], EventState]:
+        return dict(self.events)
+
+
+def _node_rank(node: Node) -> Tuple[int, str, str]:
+    exchange, asset = node
+    priority = QUOTE_PRIORITY.index(asset) if asset in QUOTE_PRIORITY else len(QUOTE_PRIORITY)
+    return priority, asset, exchange
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import os
+import threading
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+SUB_BUCKET_BITS = 3
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+BUCKET_COUNT = 64 * SUB_BUCKETS
+MAX_TRACKABLE_NS = (1 << 53) - 1
+STAGES = ("exchange", "parse", "state", "evaluate", "queue", "commit", "event_write", "gap")
+QUANTILES = (0.5, 0.99)
+
+Recorder = Callable[[int], None]
+
+
+def _bucket_indices(values: np.ndarray) -> np.ndarray:
+    _, bit_length = np.frexp(values.astype(np.float64))
+    shift = np.maximum(bit_length - SUB_BUCKET_BITS - 1, 0)
+    scaled = ((shift + 1) << SUB_BUCKET_BITS) + (values >> shift) - SUB_BUCKETS
+    return np.where(values < SUB_BUCKETS, values, scaled)
+
+
+def _bucket_upper(index: int) -> int:
+    if index < SUB_BUCKETS:
+        return index
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    sub_bucket = (index & (SUB_BUCKETS - 1)) + SUB_BUCKETS
+    return ((sub_bucket + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts = np.zeros(BUCKET_COUNT, dtype=np.int64)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record_many(self, values_ns: np.ndarray) -> None:
+        if not len(values_ns):
+            return
+        values = np.clip(values_ns.astype(np.int64), 0, MAX_TRACKABLE_NS)
+        self.counts += np.bincount(_bucket_indices(values), minlength=BUCKET_COUNT)
+        self.count += len(values)
+        self.total += int(values.sum())
+        self.max = max(self.max, int(values.max()))
+
+    def record(self, value_ns: int) -> None:
+        self.record_many(np.array([value_ns], dtype=np.int64))
+
+    def percentile(self, quantile: float) -> int:
+        if not self.count:
+            return 0
+        rank = max(1, int(np.ceil(quantile * self.count)))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(_bucket_upper(index), self.max)
+
+    def clear(self) -> None:
+        self.counts[:] = 0
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def copy(self) -> LatencyHistogram:
+        clone = LatencyHistogram()
+        clone.counts = self.counts.copy()
+        clone.count = self.count
+        clone.total = self.total
+        clone.max = self.max
+        return clone
+
+
+@dataclass
+class StageSummary:
+    stage: str
+    source: str
+    count: int
+    p50_ns: int
+    p99_ns: int
+    max_ns: int
+
+
+class PipelineLatency:
+    def __init__(self) -> None:
+        self._pending: Dict[Tuple[str, str], array] = {}
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._offsets: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def recorder(self, stage: str, source: str) -> Recorder:
+        key = (stage, source)
+        pending = self._pending.get(key)
+        if pending is None:
+            with self._lock:
+                self._histograms.setdefault(key, LatencyHistogram())
+                pending = self._pending.setdefault(key, array("q"))
+        return pending.append
+
+    def observe(self, stage: str, source: str, value_ns: int) -> None:
+        self.recorder(stage, source)(value_ns)
+
+    def flush(self) -> None:
+        with self._lock:
+            for (stage, source), pending in self._pending.items():
+                size = len(pending)
+                if not size:
+                    continue
+                values = np.frombuffer(pending[:size], dtype=np.int64)
+                del pending[:size]
+                if stage == "exchange":
+                    lowest = int(values.min())
+                    current = self._offsets.get(source)
+                    if current is None or lowest < current:
+                        self._offsets[source] = lowest
+                self._histograms[(stage, source)].record_many(values)
+
+    def clock_offsets(self) -> Dict[str, int]:
+        self.flush()
+        with self._lock:
+            return dict(self._offsets)
+
+    def summary(self) -> List[StageSummary]:
+        return [
+            StageSummary(
+                stage,
+                source,
+                histogram.count,
+                histogram.percentile(0.5),
+                histogram.percentile(0.99),
+                histogram.max,
+            )
+            for stage, source, histogram in self._snapshot()
+        ]
+
+    def reset(self) -> None:
+        with self._lock:
+            for pending in self._pending.values():
+                del pending[:]
+            for histogram in self._histograms.values():
+                histogram.clear()
+            self._offsets.clear()
+
+    def render_prometheus(self) -> str:
+        name = "arbitrage_stage_latency_seconds"
+        max_name = "arbitrage_stage_latency_max_seconds"
+        offset_name = "arbitrage_clock_offset_seconds"
+        lines = [
+            f"# HELP {name} Tick pipeline stage latency.",
+            f"# TYPE {name} summary",
+        ]
+        maxima = []
+        for stage, source, histogram in self._snapshot():
+            labels = f'stage="{stage}",source="{source}"'
+            for quantile in QUANTILES:
+                value = histogram.percentile(quantile) / 1e9
+                lines.append(f'{name}{{{labels},quantile="{quantile}"}} {value:.9f}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.total / 1e9:.9f}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+            maxima.append(f"{max_name}{{{labels}}} {histogram.max / 1e9:.9f}")
+        lines += [
+            f"# HELP {max_name} Largest observed stage latency.",
+            f"# TYPE {max_name} gauge",
+            *maxima,
+            f"# HELP {offset_name} Minimum (local receive - exchange event) time.",
+            f"# TYPE {offset_name} gauge",
+        ]
+        for source, offset_ns in sorted(self.clock_offsets().items()):
+            lines.append(f'{offset_name}{{source="{source}"}} {offset_ns / 1e9:.6f}')
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str | Path) -> None:
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_text(self.render_prometheus(), encoding="utf-8")
+        os.replace(tmp, target)
+
+    def _snapshot(self) -> List[Tuple[str, str, LatencyHistogram]]:
+        self.flush()
+        with self._lock:
+            items = [(stage, source, h.copy()) for (stage, source), h in self._histograms.items()]
+        order = {stage: index for index, stage in enumerate(STAGES)}
+        items.sort(key=lambda item: (order.get(item[0], len(order)), item[1]))
+        return items
+
+
+LATENCY = PipelineLatency()
@@ -0,0 +1,410 @@
+from __future__ import annotations
+
+import asyncio
+import http.client
+import json
+import logging
+import threading
+import time
+from contextlib import suppress
+from dataclasses import asdict, astuple, dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from app.core.latency import StageSummary
+from app.core.price_board import PriceData
+from app.core.state import ConnectionStatus, Prices, StreamStats, TickSubscription
+from app.storage.models import MetricRow
+from app.storage.writer import WriterStats
+
+if TYPE_CHECKING:
+    from app.core.scheduler import MonitoringService
+
+logger = logging.getLogger(__name__)
+
+STATUS_INTERVAL_S = 1.0
+CLIENT_TIMEOUT_S = 2.0
+MAX_REQUEST_BYTES = 8192
+JSON_CONTENT_TYPE = "application/json"
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+@dataclass
+class OpenEvent:
+    symbol_std: str
+    direction: str
+    start_ts: datetime
+    max_net_pct: float
+    avg_net_pct: float
+    samples: int
+    max_exec_qty: float | None = None
+    max_vwap_net_pct: float | None = None
+
+
+@dataclass
+class LiveSnapshot:
+    version: int = 0
+    running: bool = False
+    prices: Dict[str, Dict[str, PriceData]] = field(default_factory=dict)
+    status: Dict[str, ConnectionStatus] = field(default_factory=dict)
+    streams: Dict[str, StreamStats] = field(default_factory=dict)
+    writer: WriterStats | None = None
+    latency: List[StageSummary] = field(default_factory=list)
+    clock_offsets: Dict[str, int] = field(default_factory=dict)
+    events: List[OpenEvent] = field(default_factory=list)
+    metrics: List[MetricRow] = field(default_factory=list)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _dumps(payload: Dict[str, Any]) -> bytes:
+    return json.dumps(payload, separators=(",", ":"), default=_json_default).encode()
+
+
+def encode_quotes(
+    prices: Prices, pairs: Iterable[Tuple[str, str]] | None = None
+) -> Dict[str, Dict[str, List[float | None]]]:
+    if pairs is None:
+        pairs = [(exchange, symbol) for exchange, quotes in prices.items() for symbol in quotes]
+    quotes: Dict[str, Dict[str, List[float | None]]] = {}
+    for exchange, symbol_std in pairs:
+        data = prices.get(exchange, {}).get(symbol_std)
+        if data is None:
+            continue
+        quotes.setdefault(exchange, {})[symbol_std] = [
+            data.bid,
+            data.ask,
+            data.last,
+            data.volume_24h,
+        ]
+    return quotes
+
+
+def decode_quotes(
+    quotes: Dict[str, Dict[str, List[float | None]]]
+) -> Dict[str, Dict[str, PriceData]]:
+    return {
+        exchange: {symbol: PriceData(*values) for symbol, values in rows.items()}
+        for exchange, rows in quotes.items()
+    }
+
+
+def quotes_section(service: MonitoringService) -> Dict[str, Any]:
+    view = service.state.snapshot()
+    return {"version": view.version, "quotes": encode_quotes(view.prices)}
+
+
+def status_section(service: MonitoringService) -> Dict[str, Any]:
+    writer = service.writer
+    latency = service.latency
+    return {
+        "running": bool(service.thread and service.thread.is_alive()),
+        "status": {name: asdict(item) for name, item in service.state.get_status().items()},
+        "streams": {
+            name: asdict(item) for name, item in service.state.get_stream_stats().items()
+        },
+        "writer": asdict(writer.stats()) if writer is not None else None,
+        "latency": [asdict(row) for row in latency.summary()] if latency is not None else [],
+        "clock_offsets": latency.clock_offsets() if latency is not None else {},
+    }
+
+
+def open_events(service: MonitoringService) -> List[OpenEvent]:
+    engines = [engine for engine in (service.engine, service.graph) if engine is not None]
+    return [
+        OpenEvent(
+            symbol_std,
+            direction,
+            state.start_ts,
+            state.max_net_pct,
+            state.sum_net_pct / state.samples if state.samples else state.max_net_pct,
+            state.samples,
+            state.max_exec_qty,
+            state.max_vwap_net_pct,
+        )
+        for engine in engines
+        for (symbol_std, direction), state in sorted(engine.open_events().items())
+    ]
+
+
+def events_section(service: MonitoringService) -> Dict[str, Any]:
+    return {"events": [astuple(event) for event in open_events(service)]}
+
+
+def metrics_section(service: MonitoringService, limit: int | None = None) -> Dict[str, Any]:
+    rows = list(service.recent_metrics.copy())
+    if limit is not None:
+        rows = rows[-limit:] if limit > 0 else []
+    return {"metrics_total": service.metrics_total, "metrics": rows}
+
+
+def local_snapshot(service: MonitoringService) -> LiveSnapshot:
+    view = service.state.snapshot()
+    writer = service.writer
+    latency = service.latency
+    return LiveSnapshot(
+        version=view.version,
+        running=bool(service.thread and service.thread.is_alive()),
+        prices={exchange: dict(quotes.items()) for exchange, quotes in view.prices.items()},
+        status=service.state.get_status(),
+        streams=service.state.get_stream_stats(),
+        writer=writer.stats() if writer is not None else None,
+        latency=latency.summary() if latency is not None else [],
+        clock_offsets=latency.clock_offsets() if latency is not None else {},
+        events=open_events(service),
+        metrics=list(service.recent_metrics.copy()),
+    )
+
+
+def snapshot_payload(service: MonitoringService) -> Dict[str, Any]:
+    return {
+        **quotes_section(service),
+        **status_section(service),
+        **events_section(service),
+        **metrics_section(service),
+    }
+
+
+def snapshot_from_payload(payload: Dict[str, Any]) -> LiveSnapshot:
+    writer = payload.get("writer")
+    return LiveSnapshot(
+        version=int(payload.get("version", 0)),
+        running=bool(payload.get("running", False)),
+        prices=decode_quotes(payload.get("quotes", {})),
+        status={
+            name: ConnectionStatus(**item) for name, item in payload.get("status", {}).items()
+        },
+        streams={name: StreamStats(**item) for name, item in payload.get("streams", {}).items()},
+        writer=WriterStats(**writer) if writer is not None else None,
+        latency=[StageSummary(**row) for row in payload.get("latency", [])],
+        clock_offsets=dict(payload.get("clock_offsets", {})),
+        events=[
+            OpenEvent(row[0], row[1], datetime.fromisoformat(row[2]), *row[3:])
+            for row in payload.get("events", [])
+        ],
+        metrics=[
+            (datetime.fromisoformat(row[0]), *row[1:]) for row in payload.get("metrics", [])
+        ],
+    )
+
+
+def _sse(event: str, payload: Dict[str, Any]) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + _dumps(payload) + b"\n\n"
+
+
+def _query_number(query: Dict[str, List[str]], name: str) -> float | None:
+    values = query.get(name)
+    return float(values[0]) if values else None
+
+
+class LiveApiServer:
+    def __init__(self, service: MonitoringService, host: str, port: int) -> None:
+        self.service = service
+        self.host = host
+        self.port = port
+        self.server: asyncio.Server | None = None
+        self._clients: Set[asyncio.Task] = set()
+
+    async def run(self) -> None:
+        try:
+            self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        except OSError as exc:
+            logger.warning(
+                "Live API disabled, cannot listen on %s:%d: %s", self.host, self.port, exc
+            )
+            return
+        sockets = self.server.sockets
+        if sockets:
+            self.port = sockets[0].getsockname()[1]
+        logger.info("Live API listening on http://%s:%d", self.host, self.port)
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            for task in list(self._clients):
+                task.cancel()
+            await asyncio.gather(*self._clients, return_exceptions=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        if task is not None:
+            self._clients.add(task)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                if len(head) > MAX_REQUEST_BYTES:
+                    break
+                method, target, _ = head.split(b"\r\n", 1)[0].decode("latin-1").split(" ", 2)
+                url = urlsplit(target)
+                query = parse_qs(url.query)
+                if method != "GET":
+                    await self._respond(writer, 405, {"error": "only GET is supported"})
+                elif url.path == "/stream":
+                    await self._stream(writer, query)
+                    break
+                else:
+                    await self._route(writer, url.path, query)
+                if b"connection: close" in head.lower():
+                    break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        except ValueError:
+            with suppress(ConnectionError):
+                await self._respond(writer, 400, {"error": "malformed request"})
+        finally:
+            if task is not None:
+                self._clients.discard(task)
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _route(
+        self, writer: asyncio.StreamWriter, path: str, query: Dict[str, List[str]]
+    ) -> None:
+        service = self.service
+        if path == "/snapshot":
+            payload = snapshot_payload(service)
+        elif path == "/quotes":
+            payload = quotes_section(service)
+        elif path == "/status":
+            payload = status_section(service)
+        elif path == "/events":
+            payload = events_section(service)
+        elif path == "/metrics":
+            limit = _query_number(query, "limit")
+            payload = metrics_section(service, None if limit is None else int(limit))
+        else:
+            await self._respond(writer, 404, {"error": f"unknown path {path}"})
+            return
+        await self._respond(writer, 200, payload)
+
+    async def _respond(
+        self, writer: asyncio.StreamWriter, code: int, payload: Dict[str, Any]
+    ) -> None:
+        body = _dumps(payload)
+        writer.write(
+            f"HTTP/1.1 {code} {REASONS[code]}\r\n"
+            f"Content-Type: {JSON_CONTENT_TYPE}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Cache-Control: no-store\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+
+    async def _stream(self, writer: asyncio.StreamWriter, query: Dict[str, List[str]]) -> None:
+        interval_ms = _query_number(query, "interval_ms")
+        interval = max(0.0, interval_ms / 1000) if interval_ms else 0.0
+        service = self.service
+        state = service.state
+        subscription = TickSubscription()
+        state.subscribe(subscription)
+        try:
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/event-stream\r\n"
+                b"Cache-Control: no-store\r\n"
+                b"Connection: close\r\n\r\n"
+            )
+            payload = snapshot_payload(service)
+            version = payload["version"]
+            metrics_seen = payload["metrics_total"]
+            writer.write(_sse("snapshot", payload))
+            await writer.drain()
+            status_at = time.monotonic()
+            while True:
+                remaining = STATUS_INTERVAL_S - (time.monotonic() - status_at)
+                if remaining > 0 and state.version == version:
+                    with suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(subscription.wait(), remaining)
+                if state.version != version:
+                    view = state.snapshot()
+                    changed = state.changed_since(version)
+                    version = view.version
+                    quotes = encode_quotes(view.prices, changed)
+                    writer.write(_sse("quotes", {"version": version, "quotes": quotes}))
+                if time.monotonic() - status_at >= STATUS_INTERVAL_S:
+                    status_at = time.monotonic()
+                    metrics = metrics_section(service, service.metrics_total - metrics_seen)
+                    metrics_seen = metrics["metrics_total"]
+                    writer.write(
+                        _sse(
+                            "status",
+                            {**status_section(service), **events_section(service), **metrics},
+                        )
+                    )
+                await writer.drain()
+                if interval:
+                    await asyncio.sleep(interval)
+        finally:
+            state.unsubscribe(subscription)
+
+
+class LiveClient:
+    def __init__(self, host: str, port: int, timeout: float = CLIENT_TIMEOUT_S) -> None:
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._connection: http.client.HTTPConnection | None = None
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Dict[str, Any]:
+        with self._lock:
+            for attempt in range(2):
+                if self._connection is None:
+                    self._connection = http.client.HTTPConnection(
+                        self.host, self.port, timeout=self.timeout
+                    )
+                try:
+                    self._connection.request("GET", path)
+                    response = self._connection.getresponse()
+                    body = response.read()
+                except (OSError, http.client.HTTPException):
+                    self._close()
+                    if attempt:
+                        raise
+                    continue
+                payload = json.loads(body)
+                if response.status != 200:
+                    raise ValueError(payload.get("error", f"HTTP {response.status}"))
+                return payload
+        raise ConnectionError(f"Live API unreachable at {self.host}:{self.port}")
+
+    def snapshot(self) -> LiveSnapshot:
+        return snapshot_from_payload(self.get("/snapshot"))
+
+    def quotes(self) -> Tuple[int, Dict[str, Dict[str, PriceData]]]:
+        payload = self.get("/quotes")
+        return payload["version"], decode_quotes(payload["quotes"])
+
+    def stream(self, interval_ms: int = 0) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=None)
+        try:
+            path = f"/stream?interval_ms={interval_ms}" if interval_ms else "/stream"
+            connection.request("GET", path)
+            response = connection.getresponse()
+            event = "message"
+            while True:
+                line = response.readline()
+                if not line:
+                    return
+                if line.startswith(b"event: "):
+                    event = line[7:].strip().decode()
+                elif line.startswith(b"data: "):
+                    yield event, json.loads(line[6:])
+                    event = "message"
+        finally:
+            connection.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import zlib
+from itertools import islice
+from operator import neg
+from typing import Iterable, Iterator, Sequence, Tuple
+
+from sortedcontainers import SortedDict
+
+KRAKEN_CHECKSUM_LEVELS = 10
+
+
+class OrderBook:
+    def __init__(self, depth: int | None = None) -> None:
+        self.depth = depth
+        self.bids: SortedDict = SortedDict(neg)
+        self.asks: SortedDict = SortedDict()
+        self.ready = False
+        self.update_id = 0
+
+    def clear(self) -> None:
+        self.bids.clear()
+        self.asks.clear()
+        self.ready = False
+        self.update_id = 0
+
+    def apply(self, levels: SortedDict, price: str, quantity: str) -> None:
+        size = float(quantity)
+        if size:
+            levels[float(price)] = (size, price, quantity)
+        else:
+            levels.pop(float(price), None)
+
+    def apply_many(self, levels: SortedDict, updates: Iterable[Sequence[str]]) -> None:
+        for update in updates:
+            self.apply(levels, update[0], update[1])
+
+    def truncate(self) -> None:
+        if not self.depth:
+            return
+        for levels in (self.bids, self.asks):
+            while len(levels) > self.depth:
+                levels.popitem()
+
+    def best_bid(self) -> Tuple[float, float] | None:
+        if not self.bids:
+            return None
+        price, level = self.bids.peekitem(0)
+        return price, level[0]
+
+    def best_ask(self) -> Tuple[float, float] | None:
+        if not self.asks:
+            return None
+        price, level = self.asks.peekitem(0)
+        return price, level[0]
+
+    def walk(self, levels: SortedDict, depth: int | None = None) -> Iterator[Tuple[float, float]]:
+        for price, level in islice(levels.items(), depth):
+            yield price, level[0]
+
+    def kraken_checksum(self) -> int:
+        parts = []
+        for levels in (self.asks, self.bids):
+            for _, price, quantity in islice(levels.values(), KRAKEN_CHECKSUM_LEVELS):
+                parts.append(price.replace(".", "").lstrip("0"))
+                parts.append(quantity.replace(".", "").lstrip("0"))
+        return zlib.crc32("".join(parts).encode())
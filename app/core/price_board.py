@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import math
+import time
+from array import array
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+NAN = math.nan
+INITIAL_CAPACITY = 64
+
+
+@dataclass(slots=True)
+class PriceData:
+    bid: float
+    ask: float
+    last: float | None = None
+    volume_24h: float | None = None
+
+
+def _column(typecode: str, capacity: int, fill: float | int) -> array:
+    return array(typecode, [fill]) * capacity
+
+
+def _optional(value: float) -> float | None:
+    return None if value != value else value
+
+
+class ExchangeBoard:
+    def __init__(self, exchange: str, capacity: int = INITIAL_CAPACITY) -> None:
+        self.exchange = exchange
+        self.index: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self.version = 0
+        self.sequence = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        size = len(self.symbols)
+        columns = {
+            "bid": _column("d", capacity, NAN),
+            "ask": _column("d", capacity, NAN),
+            "last": _column("d", capacity, NAN),
+            "volume": _column("d", capacity, NAN),
+            "updated_ns": _column("q", capacity, 0),
+            "versions": _column("q", capacity, 0),
+        }
+        for name, column in columns.items():
+            if size:
+                column[:size] = getattr(self, name)[:size]
+            setattr(self, name, column)
+        self.capacity = capacity
+
+    def slot(self, symbol_std: str) -> int:
+        row = self.index.get(symbol_std)
+        if row is not None:
+            return row
+        row = len(self.symbols)
+        if row == self.capacity:
+            self.sequence += 1
+            self._allocate(self.capacity * 2)
+            self.sequence += 1
+        self.symbols.append(symbol_std)
+        self.index[symbol_std] = row
+        return row
+
+    def set_book(self, row: int, bid: float, ask: float, version: int) -> None:
+        self.sequence += 1
+        self.bid[row] = bid
+        self.ask[row] = ask
+        self.updated_ns[row] = time.time_ns()
+        self.versions[row] = version
+        self.version = version
+        self.sequence += 1
+
+    def set_quote(
+        self,
+        row: int,
+        bid: float,
+        ask: float,
+        last: float,
+        volume: float,
+        version: int,
+    ) -> None:
+        self.sequence += 1
+        self.bid[row] = bid
+        self.ask[row] = ask
+        self.last[row] = last
+        self.volume[row] = volume
+        self.updated_ns[row] = time.time_ns()
+        self.versions[row] = version
+        self.version = version
+        self.sequence += 1
+
+    def set_ticker(self, row: int, last: float, volume: float, version: int) -> bool:
+        self.sequence += 1
+        self.last[row] = last
+        self.volume[row] = volume
+        published = self.versions[row] > 0
+        if published:
+            self.updated_ns[row] = time.time_ns()
+            self.versions[row] = version
+            self.version = version
+        self.sequence += 1
+        return published
+
+    def clear(self, row: int, version: int) -> None:
+        self.sequence += 1
+        self.bid[row] = NAN
+        self.ask[row] = NAN
+        self.last[row] = NAN
+        self.volume[row] = NAN
+        self.updated_ns[row] = 0
+        self.versions[row] = 0
+        self.version = version
+        self.sequence += 1
+
+    def changed_since(self, version: int) -> List[str]:
+        while True:
+            sequence = self.sequence
+            if sequence & 1:
+                time.sleep(0)
+                continue
+            if self.version <= version:
+                return []
+            column = self.versions
+            size = min(len(self.symbols), len(column))
+            rows = np.flatnonzero(np.frombuffer(column, np.int64, size) > version).tolist()
+            if self.sequence == sequence:
+                return [self.symbols[row] for row in rows]
+
+    def view(self) -> BoardView:
+        while True:
+            sequence = self.sequence
+            if sequence & 1:
+                time.sleep(0)
+                continue
+            size = len(self.symbols)
+            view = BoardView(
+                self.index,
+                self.symbols[:size],
+                self.bid[:size],
+                self.ask[:size],
+                self.last[:size],
+                self.volume[:size],
+                self.updated_ns[:size],
+                self.versions[:size],
+                self.version,
+            )
+            if self.sequence == sequence:
+                return view
+
+
+class BoardView(Mapping):
+    __slots__ = (
+        "_index",
+        "symbols",
+        "bid",
+        "ask",
+        "last",
+        "volume",
+        "updated_ns",
+        "versions",
+        "version",
+    )
+
+    def __init__(
+        self,
+        index: Dict[str, int],
+        symbols: List[str],
+        bid: array,
+        ask: array,
+        last: array,
+        volume: array,
+        updated_ns: array,
+        versions: array,
+        version: int,
+    ) -> None:
+        self._index = index
+        self.symbols = symbols
+        self.bid = bid
+        self.ask = ask
+        self.last = last
+        self.volume = volume
+        self.updated_ns = updated_ns
+        self.versions = versions
+        self.version = version
+
+    def row(self, symbol_std: str) -> int | None:
+        row = self._index.get(symbol_std)
+        if row is None or row >= len(self.versions) or not self.versions[row]:
+            return None
+        return row
+
+    def get(self, symbol_std: str, default: PriceData | None = None) -> PriceData | None:
+        row = self.row(symbol_std)
+        if row is None:
+            return default
+        return PriceData(
+            self.bid[row],
+            self.ask[row],
+            _optional(self.last[row]),
+            _optional(self.volume[row]),
+        )
+
+    def __getitem__(self, symbol_std: str) -> PriceData:
+        price = self.get(symbol_std)
+        if price is None:
+            raise KeyError(symbol_std)
+        return price
+
+    def __contains__(self, symbol_std: object) -> bool:
+        return isinstance(symbol_std, str) and self.row(symbol_std) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        versions = self.versions
+        return (symbol for row, symbol in enumerate(self.symbols) if versions[row])
+
+    def __len__(self) -> int:
+        return len(self.versions) - self.versions.count(0)
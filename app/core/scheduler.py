@@ -3,32 +3,74 @@ from __future__ import annotations
 import asyncio
 import logging
 import threading
-from datetime import datetime, timezone
-from typing import List
+import time
+from collections import deque
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Deque, Dict, FrozenSet, Iterable, List, Tuple
 
 from app.collectors.binance import BinanceCollector
 from app.collectors.kraken import KrakenCollector
-from app.config import Settings
-from app.core.arbitrage import ArbitrageEngine
-from app.core.state import STATE, PriceData
-from app.core.symbol_mapping import SymbolMapping
+from app.collectors.processes import CollectorPool, split_specs
+from app.collectors.recording import FrameRecorder, FrameReplayer, ReplayStats
+from app.config import Settings, load_settings
+from app.core.arbitrage import ArbitrageEngine, ArbitrageResult, EventState
+from app.core.graph_arbitrage import GraphArbitrageEngine
+from app.core.latency import LATENCY, PipelineLatency
+from app.core.live_api import LiveApiServer
+from app.core.settings_diff import SettingsChange, diff_settings, exchange_map, live_settings
+from app.core.spread_matrix import SpreadMatrixEngine
+from app.core.state import STATE, PriceData, Prices, SharedState, TickSubscription
 from app.logging_config import setup_logging
-from app.storage.db import Base, get_engine
-from app.storage.models import ArbitrageMetric, Snapshot
-from app.storage.repository import Repository
+from app.storage.archive import ParquetArchive
+from app.storage.db import init_db
+from app.storage.models import MetricRow, SnapshotRow
+from app.storage.repository import SNAPSHOT_KEYFRAME_S, Repository
+from app.storage.rollup import RollupJob
+from app.storage.writer import PersistenceWriter
 
 logger = logging.getLogger(__name__)
 
+LATENCY_FLUSH_S = 1.0
+METRICS_EXPORT_S = 5.0
+RECENT_METRICS = 1000
+SETTINGS_POLL_S = 1.0
+
 
 class MonitoringService:
-    def __init__(self, settings: Settings) -> None:
+    def __init__(
+        self,
+        settings: Settings,
+        state: SharedState = STATE,
+        replay: FrameReplayer | None = None,
+        latency: PipelineLatency | None = LATENCY,
+        settings_path: Path | None = None,
+    ) -> None:
         self.settings = settings
+        self.settings_path = settings_path
+        self.watch: FrozenSet[str] = frozenset(settings.watchlist)
+        self.state = state
+        self.replay = replay
+        self.latency = latency
+        self.replay_stats: ReplayStats | None = None
         self.stop_event = threading.Event()
         self.thread: threading.Thread | None = None
+        self.writer: PersistenceWriter | None = None
+        self.pool: CollectorPool | None = None
+        self.engine: ArbitrageEngine | SpreadMatrixEngine | None = None
+        self.graph: GraphArbitrageEngine | None = None
+        self.api: LiveApiServer | None = None
+        self.recent_metrics: Deque[MetricRow] = deque(maxlen=RECENT_METRICS)
+        self.metrics_total = 0
+        self.collectors: List[Any] = []
+        self.loop: asyncio.AbstractEventLoop | None = None
 
     def start(self) -> None:
         if self.thread and self.thread.is_alive():
             return
+        if self.settings_path is not None:
+            self._set_settings(load_settings(self.settings_path))
         self.stop_event.clear()
         self.thread = threading.Thread(target=self._run_thread, daemon=True)
         self.thread.start()
@@ -36,7 +78,86 @@ class MonitoringService:
     def stop(self) -> None:
         self.stop_event.set()
         if self.thread:
-            self.thread.join(timeout=5)
+            self.thread.join(timeout=15)
+
+    def apply_settings(self, settings: Settings) -> SettingsChange:
+        loop = self.loop
+        if loop is None or not (self.thread and self.thread.is_alive()):
+            change = diff_settings(self.settings, settings)
+            self._set_settings(settings)
+            return change
+        future = asyncio.run_coroutine_threadsafe(self._apply_settings(settings), loop)
+        return future.result(timeout=15)
+
+    def _set_settings(self, settings: Settings) -> None:
+        self.settings = settings
+        self.watch = frozenset(settings.watchlist)
+
+    async def _apply_settings(self, settings: Settings) -> SettingsChange:
+        current = self.settings
+        change = diff_settings(current, settings)
+        updated = live_settings(current, settings)
+        if change.symbols_changed and self.pool is not None:
+            logger.warning("Watchlist changes need a restart when collector processes are used")
+            updated = replace(
+                updated,
+                watchlist=current.watchlist,
+                mapping_overrides=current.mapping_overrides,
+            )
+            change.restart_fields.extend(["watchlist", "mapping_overrides"])
+            change.added.clear()
+            change.removed.clear()
+        if change.restart_fields:
+            logger.warning(
+                "Settings changed that need a restart: %s", ", ".join(change.restart_fields)
+            )
+        engine = self.engine
+        graph = self.graph
+        removed = set(current.watchlist) - set(updated.watchlist)
+        dropped = []
+        if removed:
+            for item in (engine, graph):
+                if item is not None:
+                    dropped.extend(item.drop_events(removed))
+        fee_map = self._fee_map(updated)
+        if isinstance(engine, SpreadMatrixEngine):
+            engine.reconfigure(updated.watchlist, fee_map, updated.min_net_pct)
+        elif engine is not None:
+            engine.reconfigure(fee_map, updated.min_net_pct)
+        if graph is not None:
+            dropped.extend(graph.reconfigure(updated.watchlist, fee_map, updated.min_net_pct))
+        if dropped and self.writer is not None:
+            now = datetime.now(timezone.utc)
+            for state in dropped:
+                self._record_close(self.writer, now, state)
+        self._set_settings(updated)
+        if change.symbols_changed:
+            symbols_map = exchange_map(updated)
+            for collector in self.collectors:
+                await collector.update_symbols(symbols_map[collector.exchange])
+        if not change.empty:
+            logger.info(
+                "Settings applied live (added=%s removed=%s engine=%s)",
+                {exchange: sorted(pairs) for exchange, pairs in change.added.items() if pairs},
+                {exchange: sorted(pairs) for exchange, pairs in change.removed.items() if pairs},
+                change.engine_changed,
+            )
+        return change
+
+    async def _settings_watch_loop(self, path: Path) -> None:
+        modified = _modified_ns(path)
+        while not self.stop_event.is_set():
+            await asyncio.sleep(SETTINGS_POLL_S)
+            current = _modified_ns(path)
+            if current is None or current == modified:
+                continue
+            modified = current
+            try:
+                settings = load_settings(path)
+            except (OSError, ValueError):
+                logger.exception("Settings reload from %s failed", path)
+                continue
+            await self._apply_settings(settings)
 
     def _run_thread(self) -> None:
         asyncio.run(self._run())
@@ -44,28 +165,64 @@ class MonitoringService:
     async def _run(self) -> None:
         setup_logging()
         logger.info("Monitoring service starting")
-        engine = get_engine(self.settings.db_path)
-        Base.metadata.create_all(engine)
+        self.loop = asyncio.get_running_loop()
+        init_db(self.settings.db_path)
         repository = Repository(self.settings.db_path)
-
-        mapping = SymbolMapping(self.settings.mapping_overrides)
-        exchange_map = mapping.as_exchange_map(self.settings.watchlist)
-
-        binance = BinanceCollector(exchange_map["binance"], STATE, self.stop_event)
-        kraken = KrakenCollector(exchange_map["kraken"], STATE, self.stop_event)
-        arbitrage_engine = ArbitrageEngine(
-            fee_map={
-                "binance": self.settings.binance_fee,
-                "kraken": self.settings.kraken_fee,
-            },
-            threshold_pct=self.settings.min_net_pct,
+        writer = PersistenceWriter(
+            repository,
+            max_queue=self.settings.writer_queue_size,
+            flush_size=self.settings.writer_flush_size,
+            flush_interval_s=self.settings.writer_flush_interval_s,
+            latency=self.latency,
         )
+        writer.start()
+        self.writer = writer
 
-        tasks = [
-            asyncio.create_task(binance.run()),
-            asyncio.create_task(kraken.run()),
-            asyncio.create_task(self._snapshot_loop(repository, arbitrage_engine)),
-        ]
+        symbols_map = exchange_map(self.settings)
+
+        arbitrage_engine = self.engine = self._build_engine()
+        self.graph = self._build_graph() if self.settings.graph_cycles else None
+
+        tick_driven = self.settings.evaluation_mode == "tick"
+        subscription: TickSubscription | None = None
+        if tick_driven:
+            subscription = TickSubscription()
+            self.state.subscribe(subscription)
+
+        recorder = None
+        pool = None
+        if self.replay is None and self.settings.collector_processes > 0:
+            pool = self.pool = self._build_pool(symbols_map)
+            pool.start()
+            tasks = [asyncio.create_task(pool.run())]
+        else:
+            recorder = self._build_recorder()
+            collectors = self.collectors = self._build_collectors(symbols_map, recorder)
+            if self.replay is not None:
+                tasks = [asyncio.create_task(self._replay_loop(self.replay, collectors))]
+            else:
+                tasks = [asyncio.create_task(c.run()) for c in collectors]
+        tasks.append(
+            asyncio.create_task(
+                self._snapshot_loop(writer, arbitrage_engine, update_events=not tick_driven)
+            )
+        )
+        if subscription is not None:
+            tasks.append(
+                asyncio.create_task(self._tick_loop(subscription, writer, arbitrage_engine))
+            )
+        rollup_job = RollupJob(repository, raw_retention_days=self.settings.raw_retention_days)
+        archive = repository.archive if self.settings.archive_enabled else None
+        tasks.append(
+            asyncio.create_task(self._maintenance_loop(rollup_job, repository, archive))
+        )
+        if self.latency is not None:
+            tasks.append(asyncio.create_task(self._metrics_loop(self.latency)))
+        if self.settings.api_port > 0:
+            self.api = LiveApiServer(self, self.settings.api_host, self.settings.api_port)
+            tasks.append(asyncio.create_task(self.api.run()))
+        if self.settings_path is not None:
+            tasks.append(asyncio.create_task(self._settings_watch_loop(self.settings_path)))
 
         try:
             while not self.stop_event.is_set():
@@ -74,58 +231,284 @@ class MonitoringService:
             for task in tasks:
                 task.cancel()
             await asyncio.gather(*tasks, return_exceptions=True)
-            logger.info("Monitoring service stopped")
+            self.loop = None
+            self.collectors = []
+            if subscription is not None:
+                self.state.unsubscribe(subscription)
+            if recorder is not None:
+                recorder.close()
+            if pool is not None:
+                await asyncio.to_thread(pool.stop)
+                self.pool = None
+            await asyncio.to_thread(writer.stop)
+            stats = writer.stats()
+            logger.info(
+                "Monitoring service stopped (rows written=%d dropped=%d failed=%d)",
+                stats.written,
+                stats.dropped,
+                stats.failed,
+            )
+
+    def _fee_map(self, settings: Settings) -> Dict[str, float]:
+        return {
+            "binance": settings.binance_fee,
+            "kraken": settings.kraken_fee,
+        }
+
+    def _build_engine(self) -> ArbitrageEngine | SpreadMatrixEngine:
+        fee_map = self._fee_map(self.settings)
+        if self.settings.engine_mode == "matrix":
+            return SpreadMatrixEngine(self.settings.watchlist, fee_map, self.settings.min_net_pct)
+        return ArbitrageEngine(fee_map=fee_map, threshold_pct=self.settings.min_net_pct)
+
+    def _build_graph(self) -> GraphArbitrageEngine:
+        return GraphArbitrageEngine(
+            self.settings.watchlist, self._fee_map(self.settings), self.settings.min_net_pct
+        )
+
+    def _build_recorder(self) -> FrameRecorder | None:
+        if not self.settings.record_frames or self.replay is not None:
+            return None
+        return FrameRecorder(
+            self.settings.recording_dir,
+            segment_bytes=self.settings.recording_segment_mb * 1024 * 1024,
+        )
+
+    def _build_collectors(
+        self,
+        exchange_map: dict[str, dict[str, str]],
+        recorder: FrameRecorder | None = None,
+    ) -> List[Any]:
+        return [
+            BinanceCollector(
+                exchange_map["binance"],
+                self.state,
+                self.stop_event,
+                recorder,
+                url=self.settings.binance_ws_url,
+                latency=self.latency,
+                book_depth=self.settings.book_depth,
+                rest_url=self.settings.binance_rest_url,
+                connections=self.settings.binance_connections,
+                standby=self.settings.hot_standby,
+            ),
+            KrakenCollector(
+                exchange_map["kraken"],
+                self.state,
+                self.stop_event,
+                recorder,
+                url=self.settings.kraken_ws_url,
+                latency=self.latency,
+                book_depth=self.settings.book_depth,
+                standby=self.settings.hot_standby,
+            ),
+        ]
+
+    def _build_pool(self, exchange_map: dict[str, dict[str, str]]) -> CollectorPool:
+        processes = self.settings.collector_processes
+        specs = split_specs(
+            "binance",
+            exchange_map["binance"],
+            processes,
+            self.settings.binance_ws_url,
+            self.settings.binance_connections,
+            self.settings.binance_rest_url,
+            self.settings.hot_standby,
+        )
+        specs += split_specs(
+            "kraken",
+            exchange_map["kraken"],
+            processes,
+            self.settings.kraken_ws_url,
+            standby=self.settings.hot_standby,
+        )
+        if self.settings.book_depth > 0 or self.settings.record_frames:
+            logger.warning("Order books and frame recording are disabled with collector processes")
+        return CollectorPool(specs, self.state)
+
+    async def _replay_loop(self, replay: FrameReplayer, collectors: List[Any]) -> None:
+        for collector in collectors:
+            self.state.set_status(collector.exchange, True, "replay")
+        handlers = {collector.exchange: collector._handle_message for collector in collectors}
+        stats = await replay.run(handlers, self.stop_event)
+        logger.info(
+            "Replay finished (frames=%d skipped=%d failed=%d elapsed=%.2fs span=%.2fs)",
+            stats.frames,
+            stats.skipped,
+            stats.failed,
+            stats.elapsed_s,
+            stats.recorded_span_s,
+        )
+        for collector in collectors:
+            self.state.set_status(collector.exchange, False, "replay finished")
+        self.replay_stats = stats
 
     async def _snapshot_loop(
         self,
-        repository: Repository,
-        arbitrage_engine: ArbitrageEngine,
+        writer: PersistenceWriter,
+        arbitrage_engine: ArbitrageEngine | SpreadMatrixEngine,
+        update_events: bool = True,
     ) -> None:
         interval = max(1, int(self.settings.snapshot_interval_s))
+        delta = self.settings.snapshot_storage == "delta"
+        version = 0
+        keyframe = -1
+        written: Dict[Tuple[str, str], Tuple[Any, ...]] = {}
         while not self.stop_event.is_set():
             now = datetime.now(timezone.utc).replace(microsecond=0)
-            prices = STATE.get_prices()
-            snapshots: list[Snapshot] = []
-            for exchange, symbols in prices.items():
-                for symbol_std, data in symbols.items():
-                    snapshots.append(self._build_snapshot(now, exchange, symbol_std, data))
+            view = self.state.snapshot()
+            changed = self.state.changed_since(version)
+            version = view.version
+            prices = view.prices
+            window = int(now.timestamp()) // SNAPSHOT_KEYFRAME_S
+            full = not delta or window != keyframe
+            keyframe = window
+            pairs: Iterable[Tuple[str, str]] = (
+                [(exchange, symbol) for exchange, quotes in prices.items() for symbol in quotes]
+                if full
+                else sorted(changed)
+            )
+            snapshots: list[SnapshotRow] = []
+            for key in pairs:
+                data = prices.get(key[0], {}).get(key[1])
+                if data is None:
+                    continue
+                if delta:
+                    values = (data.bid, data.ask, data.last, data.volume_24h)
+                    if not full and written.get(key) == values:
+                        continue
+                    written[key] = values
+                snapshots.append(self._snapshot_row(now, key[0], key[1], data))
             if snapshots:
-                repository.add_snapshots(snapshots)
-            metrics = self._process_arbitrage(now, prices, arbitrage_engine, repository)
-            if metrics:
-                repository.add_metrics(metrics)
+                writer.add_snapshots(snapshots)
+            symbols = self.settings.watchlist
+            if delta:
+                dirty = {symbol_std for _, symbol_std in changed}
+                symbols = [symbol for symbol in symbols if symbol in dirty]
+            if symbols:
+                started = time.perf_counter_ns()
+                metrics = self._process_arbitrage(
+                    now,
+                    prices,
+                    arbitrage_engine,
+                    writer,
+                    symbols=symbols,
+                    update_events=update_events,
+                )
+                if self.latency is not None:
+                    self.latency.observe("evaluate", "snapshot", time.perf_counter_ns() - started)
+                if metrics:
+                    writer.add_metrics(metrics)
+                    self._remember_metrics(metrics)
+            await asyncio.sleep(interval)
+
+    async def _tick_loop(
+        self,
+        subscription: TickSubscription,
+        writer: PersistenceWriter,
+        arbitrage_engine: ArbitrageEngine | SpreadMatrixEngine,
+    ) -> None:
+        while not self.stop_event.is_set():
+            changed = await subscription.wait()
+            watch = self.watch
+            symbols = [symbol for symbol in changed if symbol in watch]
+            if not symbols:
+                continue
+            now = datetime.now(timezone.utc)
+            started = time.perf_counter_ns()
+            self._process_arbitrage(
+                now,
+                self.state.get_prices(),
+                arbitrage_engine,
+                writer,
+                symbols=symbols,
+            )
+            if self.latency is not None:
+                self.latency.observe("evaluate", "tick", time.perf_counter_ns() - started)
+
+    def _remember_metrics(self, metrics: List[MetricRow]) -> None:
+        self.recent_metrics.extend(metrics)
+        self.metrics_total += len(metrics)
+
+    async def _maintenance_loop(
+        self,
+        rollup_job: RollupJob,
+        repository: Repository,
+        archive: ParquetArchive | None = None,
+    ) -> None:
+        interval = max(1, int(self.settings.rollup_interval_s))
+        while not self.stop_event.is_set():
+            try:
+                stats = await asyncio.to_thread(rollup_job.run_once)
+                logger.debug("Rollup finished: %s", stats)
+            except Exception:  # noqa: BLE001
+                logger.exception("Rollup job failed")
+            if archive is not None:
+                try:
+                    sealed = await asyncio.to_thread(archive.seal_closed_days, repository)
+                    logger.debug("Archive finished: %s", sealed)
+                    if self.settings.raw_retention_days > 0:
+                        cutoff = datetime.now(timezone.utc) - timedelta(
+                            days=self.settings.raw_retention_days
+                        )
+                        await asyncio.to_thread(archive.prune, cutoff)
+                except Exception:  # noqa: BLE001
+                    logger.exception("Archive job failed")
             await asyncio.sleep(interval)
 
-    def _build_snapshot(
+    async def _metrics_loop(self, latency: PipelineLatency) -> None:
+        exported_at = time.monotonic()
+        while not self.stop_event.is_set():
+            await asyncio.sleep(LATENCY_FLUSH_S)
+            latency.flush()
+            if not self.settings.metrics_path:
+                continue
+            if time.monotonic() - exported_at < METRICS_EXPORT_S:
+                continue
+            exported_at = time.monotonic()
+            try:
+                await asyncio.to_thread(latency.write_textfile, self.settings.metrics_path)
+            except OSError:
+                logger.exception("Metrics export failed")
+
+    def _snapshot_row(
         self,
         timestamp: datetime,
         exchange: str,
         symbol_std: str,
         data: PriceData,
-    ) -> Snapshot:
+    ) -> SnapshotRow:
         spread_abs = data.ask - data.bid
         spread_pct = (spread_abs / data.bid * 100) if data.bid else 0.0
-        return Snapshot(
-            timestamp=timestamp,
-            exchange=exchange,
-            symbol_std=symbol_std,
-            bid=data.bid,
-            ask=data.ask,
-            last=data.last,
-            volume_24h=data.volume_24h,
-            spread_abs=spread_abs,
-            spread_pct=spread_pct,
+        return (
+            timestamp,
+            exchange,
+            symbol_std,
+            data.bid,
+            data.ask,
+            data.last,
+            data.volume_24h,
+            spread_abs,
+            spread_pct,
         )
 
     def _process_arbitrage(
         self,
         timestamp: datetime,
-        prices: dict[str, dict[str, PriceData]],
-        arbitrage_engine: ArbitrageEngine,
-        repository: Repository,
-    ) -> List[ArbitrageMetric]:
-        metrics: List[ArbitrageMetric] = []
-        for symbol in self.settings.watchlist:
+        prices: Prices,
+        arbitrage_engine: ArbitrageEngine | SpreadMatrixEngine,
+        writer: PersistenceWriter,
+        symbols: Iterable[str] | None = None,
+        update_events: bool = True,
+    ) -> List[MetricRow]:
+        if self.graph is not None and update_events:
+            self._process_graph(timestamp, prices, self.graph, writer, symbols)
+        if isinstance(arbitrage_engine, SpreadMatrixEngine):
+            return self._process_matrix(
+                timestamp, prices, arbitrage_engine, writer, symbols, update_events
+            )
+        metrics: List[MetricRow] = []
+        for symbol in self.settings.watchlist if symbols is None else symbols:
             binance_data = prices.get("binance", {}).get(symbol)
             kraken_data = prices.get("kraken", {}).get(symbol)
             if not binance_data or not kraken_data:
@@ -138,27 +521,117 @@ class MonitoringService:
                 result = arbitrage_engine.compute(
                     symbol, sell_exchange, sell_bid, buy_exchange, buy_ask
                 )
-                metrics.append(arbitrage_engine.to_metric(result, timestamp))
+                if self.settings.book_depth > 0:
+                    self._fill_depth(arbitrage_engine, result, sell_exchange, buy_exchange)
+                metrics.append(arbitrage_engine.to_metric_row(result, timestamp))
+                if not update_events:
+                    continue
                 action, state = arbitrage_engine.update_event_state(result, timestamp)
                 if action == "start" and state:
-                    event = repository.create_event(
-                        symbol_std=result.symbol_std,
-                        direction=result.direction,
-                        start_ts=state.start_ts,
-                        max_net_pct=state.max_net_pct,
-                        avg_net_pct=state.sum_net_pct / state.samples,
-                    )
-                    state.event_id = event.id
+                    self._record_start(writer, result.symbol_std, result.direction, state)
                 elif action == "close" and state:
-                    avg = state.sum_net_pct / state.samples
-                    duration = int((timestamp - state.start_ts).total_seconds())
-                    if state.event_id is not None:
-                        repository.close_event(
-                            state.event_id,
-                            timestamp,
-                            state.max_net_pct,
-                            avg,
-                            duration,
-                        )
+                    self._record_close(writer, timestamp, state)
                     arbitrage_engine.finalize_event(result.symbol_std, result.direction)
         return metrics
+
+    def _fill_depth(
+        self,
+        arbitrage_engine: ArbitrageEngine,
+        result: ArbitrageResult,
+        sell_exchange: str,
+        buy_exchange: str,
+    ) -> None:
+        sell_book = self.state.books.get((sell_exchange, result.symbol_std))
+        buy_book = self.state.books.get((buy_exchange, result.symbol_std))
+        if not (sell_book and sell_book.ready and buy_book and buy_book.ready):
+            return
+        depth = self.settings.book_depth
+        arbitrage_engine.compute_depth(
+            result,
+            sell_exchange,
+            sell_book.walk(sell_book.bids, depth),
+            buy_exchange,
+            buy_book.walk(buy_book.asks, depth),
+            self.settings.depth_notional,
+        )
+
+    def _process_matrix(
+        self,
+        timestamp: datetime,
+        prices: Prices,
+        matrix_engine: SpreadMatrixEngine,
+        writer: PersistenceWriter,
+        symbols: Iterable[str] | None = None,
+        update_events: bool = True,
+    ) -> List[MetricRow]:
+        symbols = list(self.settings.watchlist if symbols is None else symbols)
+        matrix_engine.load_prices(prices, symbols)
+        step = matrix_engine.step(timestamp, symbols, update_events=update_events)
+        for transition in step.transitions:
+            if transition.action == "start":
+                self._record_start(
+                    writer, transition.symbol_std, transition.direction, transition.state
+                )
+            elif transition.action == "close":
+                self._record_close(writer, timestamp, transition.state)
+        return matrix_engine.to_metric_rows(step, timestamp)
+
+    def _process_graph(
+        self,
+        timestamp: datetime,
+        prices: Prices,
+        graph: GraphArbitrageEngine,
+        writer: PersistenceWriter,
+        symbols: Iterable[str] | None = None,
+    ) -> None:
+        graph.load_prices(prices, symbols)
+        for transition in graph.step(timestamp):
+            if transition.action == "start":
+                self._record_start(
+                    writer, transition.symbol_std, transition.direction, transition.state
+                )
+            elif transition.action == "close":
+                self._record_close(writer, timestamp, transition.state)
+
+    def _record_start(
+        self,
+        writer: PersistenceWriter,
+        symbol_std: str,
+        direction: str,
+        state: EventState,
+    ) -> None:
+        writer.create_event(
+            state,
+            symbol_std=symbol_std,
+            direction=direction,
+            start_ts=state.start_ts,
+            max_net_pct=state.max_net_pct,
+            avg_net_pct=state.sum_net_pct / state.samples,
+            max_exec_qty=state.max_exec_qty,
+            max_vwap_net_pct=state.max_vwap_net_pct,
+        )
+
+    def _record_close(
+        self,
+        writer: PersistenceWriter,
+        timestamp: datetime,
+        state: EventState,
+    ) -> None:
+        avg = state.sum_net_pct / state.samples
+        duration = int((timestamp - state.start_ts).total_seconds())
+        writer.close_event(
+            state,
+            timestamp,
+            state.max_net_pct,
+            avg,
+            duration,
+            state.max_exec_qty,
+            state.max_vwap_net_pct,
+        )
+
+
+def _modified_ns(path: Path) -> int | None:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field, fields, replace
+from typing import Dict, List
+
+from app.config import Settings
+from app.core.symbol_mapping import SymbolMapping
+
+LIVE_FIELDS = ("watchlist", "mapping_overrides", "binance_fee", "kraken_fee", "min_net_pct")
+ENGINE_FIELDS = ("watchlist", "binance_fee", "kraken_fee", "min_net_pct")
+
+
+@dataclass
+class SettingsChange:
+    added: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    removed: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    engine_changed: bool = False
+    restart_fields: List[str] = field(default_factory=list)
+
+    @property
+    def symbols_changed(self) -> bool:
+        return any(self.added.values()) or any(self.removed.values())
+
+    @property
+    def empty(self) -> bool:
+        return not (self.symbols_changed or self.engine_changed or self.restart_fields)
+
+
+def exchange_map(settings: Settings) -> Dict[str, Dict[str, str]]:
+    return SymbolMapping(settings.mapping_overrides).as_exchange_map(settings.watchlist)
+
+
+def diff_settings(old: Settings, new: Settings) -> SettingsChange:
+    before = exchange_map(old)
+    after = exchange_map(new)
+    change = SettingsChange()
+    for exchange in sorted(before.keys() | after.keys()):
+        current = before.get(exchange, {})
+        wanted = after.get(exchange, {})
+        change.added[exchange] = {
+            symbol: pair for symbol, pair in wanted.items() if current.get(symbol) != pair
+        }
+        change.removed[exchange] = {
+            symbol: pair for symbol, pair in current.items() if wanted.get(symbol) != pair
+        }
+    change.engine_changed = any(
+        getattr(old, name) != getattr(new, name) for name in ENGINE_FIELDS
+    )
+    change.restart_fields = [
+        item.name
+        for item in fields(Settings)
+        if item.name not in LIVE_FIELDS and getattr(old, item.name) != getattr(new, item.name)
+    ]
+    return change
+
+
+def live_settings(current: Settings, new: Settings) -> Settings:
+    return replace(current, **{name: getattr(new, name) for name in LIVE_FIELDS})
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import time
+from multiprocessing import shared_memory
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+SLOT_FIELDS = 8
+SEQ, BID, ASK, LAST, VOLUME, UPDATED_NS = range(6)
+ITEM_BYTES = 8
+
+SlotKey = Tuple[str, str]
+
+
+class SharedPriceBoard:
+    def __init__(
+        self, shm: shared_memory.SharedMemory, keys: Sequence[SlotKey], owner: bool
+    ) -> None:
+        self.shm = shm
+        self.keys: List[SlotKey] = [tuple(key) for key in keys]
+        self.index: Dict[SlotKey, int] = {key: slot for slot, key in enumerate(self.keys)}
+        self.owner = owner
+        size = max(1, len(self.keys)) * SLOT_FIELDS * ITEM_BYTES
+        self._buffer = shm.buf[:size]
+        self.ints = self._buffer.cast("q")
+        self.floats = self._buffer.cast("d")
+        shape = (max(1, len(self.keys)), SLOT_FIELDS)
+        self._int_rows = np.ndarray(shape, dtype=np.int64, buffer=self._buffer)
+        self._float_rows = np.ndarray(shape, dtype=np.float64, buffer=self._buffer)
+
+    @classmethod
+    def create(cls, keys: Sequence[SlotKey]) -> SharedPriceBoard:
+        size = max(1, len(keys)) * SLOT_FIELDS * ITEM_BYTES
+        board = cls(shared_memory.SharedMemory(create=True, size=size), keys, owner=True)
+        board._int_rows[:] = 0
+        board._float_rows[:, BID : VOLUME + 1] = np.nan
+        return board
+
+    @classmethod
+    def attach(cls, name: str, keys: Sequence[SlotKey]) -> SharedPriceBoard:
+        return cls(shared_memory.SharedMemory(name=name), keys, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write_book(self, slot: int, bid: float, ask: float) -> None:
+        ints, floats = self.ints, self.floats
+        base = slot * SLOT_FIELDS
+        ints[base] += 1
+        floats[base + BID] = bid
+        floats[base + ASK] = ask
+        ints[base + UPDATED_NS] = time.time_ns()
+        ints[base] += 1
+
+    def write_quote(self, slot: int, bid: float, ask: float, last: float, volume: float) -> None:
+        ints, floats = self.ints, self.floats
+        base = slot * SLOT_FIELDS
+        ints[base] += 1
+        floats[base + BID] = bid
+        floats[base + ASK] = ask
+        floats[base + LAST] = last
+        floats[base + VOLUME] = volume
+        ints[base + UPDATED_NS] = time.time_ns()
+        ints[base] += 1
+
+    def write_ticker(self, slot: int, last: float, volume: float) -> None:
+        ints, floats = self.ints, self.floats
+        base = slot * SLOT_FIELDS
+        ints[base] += 1
+        floats[base + LAST] = last
+        floats[base + VOLUME] = volume
+        ints[base + UPDATED_NS] = time.time_ns()
+        ints[base] += 1
+
+    def changes(self, seen: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        count = len(self.keys)
+        sequences = self._int_rows[:count, SEQ].copy()
+        candidates = np.flatnonzero((sequences != seen) & ((sequences & 1) == 0))
+        if not len(candidates):
+            return candidates, np.empty((0, 4))
+        values = self._float_rows[candidates, BID : VOLUME + 1]
+        stable = self._int_rows[candidates, SEQ] == sequences[candidates]
+        slots = candidates[stable]
+        seen[slots] = sequences[slots]
+        return slots, values[stable]
+
+    def writes(self) -> int:
+        return int(self._int_rows[: len(self.keys), SEQ].sum()) // 2
+
+    def close(self) -> None:
+        del self._int_rows, self._float_rows
+        self.ints.release()
+        self.floats.release()
+        self._buffer.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
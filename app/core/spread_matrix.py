@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from app.core.arbitrage import EventState
+from app.core.state import Prices
+from app.storage.models import MetricRow
+
+
+@dataclass
+class Transition:
+    action: str
+    symbol_std: str
+    direction: str
+    state: EventState
+
+
+@dataclass
+class MatrixStep:
+    rows: np.ndarray
+    raw_spread: np.ndarray
+    net_pct: np.ndarray
+    transitions: List[Transition]
+
+
+class SpreadMatrixEngine:
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        fee_map: Dict[str, float],
+        threshold_pct: float,
+    ) -> None:
+        self.symbols = list(symbols)
+        self.exchanges = list(fee_map)
+        self.threshold_pct = threshold_pct
+        self._rows = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._cols = {exchange: j for j, exchange in enumerate(self.exchanges)}
+        shape = (len(self.symbols), len(self.exchanges))
+        self.fees = np.array([fee_map[exchange] for exchange in self.exchanges], dtype=float)
+        self.bid = np.full(shape, np.nan)
+        self.ask = np.full(shape, np.nan)
+        self.active = np.zeros(shape + (shape[1],), dtype=bool)
+        self.max_net = np.zeros(self.active.shape)
+        self.sum_net = np.zeros(self.active.shape)
+        self.samples = np.zeros(self.active.shape, dtype=np.int64)
+        self.directions = [
+            [f"{sell}_sell/{buy}_buy" for buy in self.exchanges] for sell in self.exchanges
+        ]
+        self._off_diagonal = ~np.eye(shape[1], dtype=bool)
+        self.events: Dict[Tuple[str, str], EventState] = {}
+        self._event_index: Dict[Tuple[str, str], Tuple[int, int, int]] = {}
+
+    def update_quote(self, symbol_std: str, exchange: str, bid: float, ask: float) -> None:
+        row = self._rows.get(symbol_std)
+        col = self._cols.get(exchange)
+        if row is None or col is None:
+            return
+        self.bid[row, col] = bid
+        self.ask[row, col] = ask
+
+    def load_prices(
+        self,
+        prices: Prices,
+        symbols: Iterable[str] | None = None,
+    ) -> None:
+        for symbol in self.symbols if symbols is None else symbols:
+            for exchange in self.exchanges:
+                data = prices.get(exchange, {}).get(symbol)
+                if data is None:
+                    self.update_quote(symbol, exchange, np.nan, np.nan)
+                else:
+                    self.update_quote(symbol, exchange, data.bid, data.ask)
+
+    def row_indices(self, symbols: Iterable[str] | None = None) -> np.ndarray:
+        if symbols is None:
+            return np.arange(len(self.symbols))
+        return np.array(
+            [self._rows[symbol] for symbol in symbols if symbol in self._rows], dtype=np.intp
+        )
+
+    def compute(self, rows: np.ndarray | None = None) -> Tuple[np.ndarray, np.ndarray]:
+        bid = self.bid if rows is None else self.bid[rows]
+        ask = self.ask if rows is None else self.ask[rows]
+        sell_bid = bid[:, :, None]
+        buy_ask = ask[:, None, :]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            raw_spread = sell_bid - buy_ask
+            net = (
+                sell_bid * (1 - self.fees)[None, :, None]
+                - buy_ask * (1 + self.fees)[None, None, :]
+            )
+            net_pct = (net / buy_ask) * 100
+        net_pct[:, ~self._off_diagonal] = np.nan
+        return raw_spread, net_pct
+
+    def step(
+        self,
+        timestamp: datetime,
+        symbols: Iterable[str] | None = None,
+        update_events: bool = True,
+    ) -> MatrixStep:
+        rows = self.row_indices(symbols)
+        raw_spread, net_pct = self.compute(rows)
+        if not update_events:
+            return MatrixStep(rows, raw_spread, net_pct, [])
+
+        valid = ~np.isnan(net_pct)
+        above = valid & (net_pct >= self.threshold_pct)
+        active = self.active[rows]
+        start = above & ~active
+        update = above & active
+        close = active & valid & ~above
+
+        max_net = self.max_net[rows]
+        sum_net = self.sum_net[rows]
+        samples = self.samples[rows]
+        max_net = np.where(start, net_pct, np.where(update, np.maximum(max_net, net_pct), max_net))
+        sum_net = np.where(start, net_pct, np.where(update | close, sum_net + net_pct, sum_net))
+        samples = np.where(start, 1, np.where(update | close, samples + 1, samples))
+
+        self.max_net[rows] = max_net
+        self.sum_net[rows] = sum_net
+        self.samples[rows] = samples
+        self.active[rows] = (active | start) & ~close
+
+        transitions: List[Transition] = []
+        for m, i, j in np.argwhere(start | close):
+            symbol_std = self.symbols[rows[m]]
+            direction = self.directions[i][j]
+            key = (symbol_std, direction)
+            if start[m, i, j]:
+                state = EventState(
+                    event_id=None,
+                    start_ts=timestamp,
+                    max_net_pct=float(max_net[m, i, j]),
+                    sum_net_pct=float(sum_net[m, i, j]),
+                    samples=1,
+                )
+                self.events[key] = state
+                self._event_index[key] = (int(rows[m]), int(i), int(j))
+                transitions.append(Transition("start", symbol_std, direction, state))
+                continue
+            state = self.events.pop(key)
+            del self._event_index[key]
+            self._sync_state(state, rows[m], i, j)
+            transitions.append(Transition("close", symbol_std, direction, state))
+        return MatrixStep(rows, raw_spread, net_pct, transitions)
+
+    def reconfigure(
+        self, symbols: Sequence[str], fee_map: Dict[str, float], threshold_pct: float
+    ) -> None:
+        symbols = list(symbols)
+        rows = self._rows
+        kept = [(new, rows[symbol]) for new, symbol in enumerate(symbols) if symbol in rows]
+        new_rows = np.array([new for new, _ in kept], dtype=np.intp)
+        old_rows = np.array([old for _, old in kept], dtype=np.intp)
+        shape = (len(symbols), len(self.exchanges))
+        for name in ("bid", "ask"):
+            values = np.full(shape, np.nan)
+            values[new_rows] = getattr(self, name)[old_rows]
+            setattr(self, name, values)
+        for name in ("active", "max_net", "sum_net", "samples"):
+            current = getattr(self, name)
+            values = np.zeros(shape + (shape[1],), dtype=current.dtype)
+            values[new_rows] = current[old_rows]
+            setattr(self, name, values)
+        self.symbols = symbols
+        self._rows = {symbol: i for i, symbol in enumerate(symbols)}
+        self._event_index = {
+            key: (self._rows[key[0]], i, j)
+            for key, (_, i, j) in self._event_index.items()
+            if key[0] in self._rows
+        }
+        self.events = {key: state for key, state in self.events.items() if key in self._event_index}
+        self.fees = np.array([fee_map[exchange] for exchange in self.exchanges], dtype=float)
+        self.threshold_pct = threshold_pct
+
+    def drop_events(self, symbols: Iterable[str]) -> List[EventState]:
+        dropped = set(symbols)
+        states = []
+        for key in [key for key in self.events if key[0] in dropped]:
+            row, i, j = self._event_index.pop(key)
+            state = self.events.pop(key)
+            self._sync_state(state, row, i, j)
+            self.active[row, i, j] = False
+            states.append(state)
+        return states
+
+    def open_events(self) -> Dict[Tuple[str, str], EventState]:
+        for key, state in self.events.items():
+            self._sync_state(state, *self._event_index[key])
+        return dict(self.events)
+
+    def _sync_state(self, state: EventState, row: int, i: int, j: int) -> None:
+        state.max_net_pct = float(self.max_net[row, i, j])
+        state.sum_net_pct = float(self.sum_net[row, i, j])
+        state.samples = int(self.samples[row, i, j])
+
+    def to_metric_rows(self, step: MatrixStep, timestamp: datetime) -> List[MetricRow]:
+        indices = np.argwhere(~np.isnan(step.net_pct))
+        if not len(indices):
+            return []
+        m, i, j = indices.T
+        raw_spread = step.raw_spread[m, i, j].tolist()
+        net_pct = step.net_pct[m, i, j].tolist()
+        rows = step.rows[m].tolist()
+        return [
+            (timestamp, self.symbols[row], self.directions[a][b], raw, net, None, None)
+            for row, a, b, raw, net in zip(rows, i.tolist(), j.tolist(), raw_spread, net_pct)
+        ]
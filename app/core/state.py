@@ -1,39 +1,204 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import asyncio
+import threading
+from dataclasses import dataclass, replace
 from threading import Lock
-from typing import Dict
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping, Set, Tuple
+
+from app.core.order_book import OrderBook
+from app.core.price_board import NAN, BoardView, ExchangeBoard, PriceData
 
 
 @dataclass
-class PriceData:
-    bid: float
-    ask: float
-    last: float | None = None
-    volume_24h: float | None = None
+class ConnectionStatus:
+    connected: bool = False
+    last_message: str | None = None
 
 
 @dataclass
-class ConnectionStatus:
+class StreamStats:
+    streams: int = 0
     connected: bool = False
+    reconnects: int = 0
+    messages: int = 0
+    rate: float = 0.0
+    lag_ms: float | None = None
+    max_lag_ms: float | None = None
     last_message: str | None = None
+    duplicates: int = 0
+    failovers: int = 0
+    gaps: int = 0
+    gap_ms: float = 0.0
+
+
+PriceListener = Callable[[str, str], None]
+
+
+class TickSubscription:
+    def __init__(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        self._loop = loop or asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._event = asyncio.Event()
+        self._pending: Set[str] = set()
+
+    def __call__(self, exchange: str, symbol_std: str) -> None:
+        if threading.get_ident() == self._loop_thread:
+            self._mark(symbol_std)
+        else:
+            self._loop.call_soon_threadsafe(self._mark, symbol_std)
+
+    def _mark(self, symbol_std: str) -> None:
+        self._pending.add(symbol_std)
+        self._event.set()
+
+    async def wait(self) -> Set[str]:
+        await self._event.wait()
+        self._event.clear()
+        pending, self._pending = self._pending, set()
+        return pending
+
+
+Prices = Mapping[str, Mapping[str, PriceData]]
 
 
 @dataclass
+class PriceView:
+    version: int
+    prices: Prices
+
+
+EMPTY_VIEW = PriceView(0, MappingProxyType({}))
+
+
 class SharedState:
-    prices: Dict[str, Dict[str, PriceData]] = field(default_factory=dict)
-    status: Dict[str, ConnectionStatus] = field(
-        default_factory=lambda: {"binance": ConnectionStatus(), "kraken": ConnectionStatus()}
-    )
-    lock: Lock = field(default_factory=Lock)
+    def __init__(self) -> None:
+        self.status: Dict[str, ConnectionStatus] = {
+            "binance": ConnectionStatus(),
+            "kraken": ConnectionStatus(),
+        }
+        self.streams: Dict[str, StreamStats] = {}
+        self.listeners: Tuple[PriceListener, ...] = ()
+        self.books: Dict[Tuple[str, str], OrderBook] = {}
+        self.lock = Lock()
+        self._write_lock = Lock()
+        self._boards: Dict[str, ExchangeBoard] = {}
+        self._version = 0
+        self._published: Dict[str, BoardView] = {}
+        self._view = EMPTY_VIEW
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def board(self, exchange: str) -> ExchangeBoard:
+        board = self._boards.get(exchange)
+        if board is None:
+            with self._write_lock:
+                board = self._boards.setdefault(exchange, ExchangeBoard(exchange))
+        return board
+
+    def slot(self, exchange: str, symbol_std: str) -> int:
+        board = self.board(exchange)
+        with self._write_lock:
+            return board.slot(symbol_std)
+
+    def order_book(self, exchange: str, symbol_std: str, depth: int | None = None) -> OrderBook:
+        book = self.books.get((exchange, symbol_std))
+        if book is None:
+            with self._write_lock:
+                book = self.books.setdefault((exchange, symbol_std), OrderBook(depth))
+        book.depth = depth
+        return book
+
+    def update_book(self, board: ExchangeBoard, row: int, bid: float, ask: float) -> None:
+        with self._write_lock:
+            self._version += 1
+            board.set_book(row, bid, ask, self._version)
+        for listener in self.listeners:
+            listener(board.exchange, board.symbols[row])
+
+    def update_quote(
+        self,
+        board: ExchangeBoard,
+        row: int,
+        bid: float,
+        ask: float,
+        last: float = NAN,
+        volume: float = NAN,
+    ) -> None:
+        with self._write_lock:
+            self._version += 1
+            board.set_quote(row, bid, ask, last, volume, self._version)
+        for listener in self.listeners:
+            listener(board.exchange, board.symbols[row])
+
+    def update_ticker(self, board: ExchangeBoard, row: int, last: float, volume: float) -> None:
+        with self._write_lock:
+            published = board.set_ticker(row, last, volume, self._version + 1)
+            if published:
+                self._version += 1
+        if published:
+            for listener in self.listeners:
+                listener(board.exchange, board.symbols[row])
 
     def update_price(self, exchange: str, symbol_std: str, data: PriceData) -> None:
+        self.update_quote(
+            self.board(exchange),
+            self.slot(exchange, symbol_std),
+            data.bid,
+            data.ask,
+            NAN if data.last is None else data.last,
+            NAN if data.volume_24h is None else data.volume_24h,
+        )
+
+    def remove_quote(self, exchange: str, symbol_std: str) -> None:
+        board = self._boards.get(exchange)
+        if board is None:
+            return
+        with self._write_lock:
+            row = board.index.get(symbol_std)
+            if row is None or not board.versions[row]:
+                return
+            self._version += 1
+            board.clear(row, self._version)
+
+    def snapshot(self) -> PriceView:
+        view = self._view
+        version = self._version
+        if view.version == version:
+            return view
+        published = self._published
+        prices: Dict[str, BoardView] = {}
+        for exchange, board in self._boards.copy().items():
+            board_view = published.get(exchange)
+            if board_view is None or board_view.version != board.version:
+                board_view = published[exchange] = board.view()
+            if len(board_view):
+                prices[exchange] = board_view
+        view = PriceView(version, MappingProxyType(prices))
+        if version > self._view.version:
+            self._view = view
+        return view
+
+    def get_prices(self) -> Prices:
+        return self.snapshot().prices
+
+    def changed_since(self, version: int) -> Set[Tuple[str, str]]:
+        return {
+            (exchange, symbol)
+            for exchange, board in self._boards.copy().items()
+            for symbol in board.changed_since(version)
+        }
+
+    def subscribe(self, listener: PriceListener) -> None:
         with self.lock:
-            self.prices.setdefault(exchange, {})[symbol_std] = data
+            self.listeners = (*self.listeners, listener)
 
-    def get_prices(self) -> Dict[str, Dict[str, PriceData]]:
+    def unsubscribe(self, listener: PriceListener) -> None:
         with self.lock:
-            return {ex: prices.copy() for ex, prices in self.prices.items()}
+            self.listeners = tuple(item for item in self.listeners if item != listener)
 
     def set_status(self, exchange: str, connected: bool, message: str | None = None) -> None:
         with self.lock:
@@ -45,5 +210,13 @@ class SharedState:
         with self.lock:
             return {ex: ConnectionStatus(s.connected, s.last_message) for ex, s in self.status.items()}
 
+    def set_stream_stats(self, name: str, stats: StreamStats) -> None:
+        with self.lock:
+            self.streams[name] = replace(stats)
+
+    def get_stream_stats(self) -> Dict[str, StreamStats]:
+        with self.lock:
+            return {name: replace(stats) for name, stats in self.streams.items()}
+
 
 STATE = SharedState()
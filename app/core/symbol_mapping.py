@@ -32,6 +32,8 @@ class SymbolMapping:
         base, quote = symbol_std.split("/")
         if base == "BTC":
             base = "XBT"
+        if quote == "BTC":
+            quote = "XBT"
         return f"{base}/{quote}"
 
     def as_exchange_map(self, symbols: list[str]) -> Dict[str, Dict[str, str]]:
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from app.storage.db import init_db
+from app.storage.models import ArbitrageMetric, Snapshot
+from app.storage.repository import (
+    METRIC_COLUMNS,
+    SNAPSHOT_COLUMNS,
+    MetricRow,
+    Repository,
+    SnapshotRow,
+)
+
+EXCHANGES = ("binance", "kraken")
+DIRECTIONS = ("binance_sell/kraken_buy", "kraken_sell/binance_buy")
+
+
+def _cycle_rows(
+    symbols: int, timestamp: datetime
+) -> Tuple[List[SnapshotRow], List[MetricRow]]:
+    snapshots: List[SnapshotRow] = []
+    metrics: List[MetricRow] = []
+    for i in range(symbols):
+        symbol = f"S{i}/USDT"
+        for exchange in EXCHANGES:
+            snapshots.append((timestamp, exchange, symbol, 100.0, 100.1, 100.05, 1e6, 0.1, 0.1))
+        for direction in DIRECTIONS:
+            metrics.append((timestamp, symbol, direction, -0.1, -0.35, None, None))
+    return snapshots, metrics
+
+
+def _orm_path(
+    repository: Repository, snapshots: List[SnapshotRow], metrics: List[MetricRow]
+) -> None:
+    repository.add_snapshots([Snapshot(**dict(zip(SNAPSHOT_COLUMNS, row))) for row in snapshots])
+    repository.add_metrics([ArbitrageMetric(**dict(zip(METRIC_COLUMNS, row))) for row in metrics])
+
+
+def _tuple_path(
+    repository: Repository, snapshots: List[SnapshotRow], metrics: List[MetricRow]
+) -> None:
+    repository.bulk_insert_snapshots(snapshots)
+    repository.bulk_insert_metrics(metrics)
+
+
+def _column_path(
+    repository: Repository, snapshots: List[SnapshotRow], metrics: List[MetricRow]
+) -> None:
+    repository.bulk_insert_snapshots(
+        {name: [row[i] for row in snapshots] for i, name in enumerate(SNAPSHOT_COLUMNS)}
+    )
+    repository.bulk_insert_metrics(
+        {name: [row[i] for row in metrics] for i, name in enumerate(METRIC_COLUMNS)}
+    )
+
+
+PATHS: dict[str, Callable[[Repository, List[SnapshotRow], List[MetricRow]], None]] = {
+    "orm add_all": _orm_path,
+    "core tuples": _tuple_path,
+    "core columns": _column_path,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ORM vs Core bulk insert throughput")
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--symbols", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    start = datetime.now(timezone.utc).replace(microsecond=0)
+    with tempfile.TemporaryDirectory() as tmp:
+        for symbols in args.symbols:
+            results = []
+            for name, path in PATHS.items():
+                db_path = str(Path(tmp) / f"{symbols}_{name.replace(' ', '_')}.db")
+                init_db(db_path)
+                repository = Repository(db_path)
+                cycles = [
+                    _cycle_rows(symbols, start + timedelta(seconds=i)) for i in range(args.cycles)
+                ]
+                rows = sum(len(s) + len(m) for s, m in cycles)
+                began = time.perf_counter()
+                for snapshots, metrics in cycles:
+                    path(repository, snapshots, metrics)
+                elapsed = time.perf_counter() - began
+                results.append(f"{name}: {rows / elapsed:,.0f} rows/s")
+            print(f"{symbols:>5} symbols | " + " | ".join(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, List
+
+from app.collectors.mock_exchange import MockExchangeServer
+from app.config import Settings
+from app.core.latency import PipelineLatency
+from app.core.scheduler import MonitoringService
+from app.core.state import SharedState
+from app.scripts.load_test import _free_port, _wait_for_port
+
+
+def _run_mock(port: int, rate: float, sent: Any) -> None:
+    async def serve() -> None:
+        server = MockExchangeServer(port=port, rate=rate, reuse_port=True)
+        await server.start()
+        while True:
+            await asyncio.sleep(0.2)
+            sent.value = server.stats.binance_sent + server.stats.kraken_sent
+
+    asyncio.run(serve())
+
+
+def _start_mocks(ports: List[int], rate: float, per_port: int) -> tuple[list, list]:
+    counters = []
+    mocks = []
+    for port in ports:
+        for _ in range(per_port):
+            counter = multiprocessing.Value("q", 0, lock=False)
+            mock = multiprocessing.Process(
+                target=_run_mock, args=(port, rate, counter), daemon=True
+            )
+            mock.start()
+            counters.append(counter)
+            mocks.append(mock)
+    for port in ports:
+        _wait_for_port(port)
+    return mocks, counters
+
+
+def _measure(args: argparse.Namespace, processes: int) -> dict:
+    connections = max(1, processes)
+    ports = [_free_port(), _free_port()]
+    mocks, counters = _start_mocks(ports, args.rate / connections, args.mock_processes)
+    watchlist = [f"S{index:03d}/USDT" for index in range(args.symbols)]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = Settings(
+                watchlist=watchlist,
+                evaluation_mode="tick",
+                db_path=str(Path(tmp) / "bench.db"),
+                archive_enabled=False,
+                metrics_path="",
+                binance_ws_url=f"ws://127.0.0.1:{ports[0]}",
+                kraken_ws_url=f"ws://127.0.0.1:{ports[1]}/kraken",
+                collector_processes=processes,
+            )
+            state = SharedState()
+            latency = PipelineLatency()
+            service = MonitoringService(settings, state, latency=latency)
+            service.start()
+
+            def ingested() -> int:
+                return service.pool.writes() if service.pool is not None else state.version
+
+            try:
+                time.sleep(args.warmup)
+                latency.reset()
+                sent_before = sum(counter.value for counter in counters)
+                ingested_before, published_before = ingested(), state.version
+                cpu_before, began = time.process_time(), time.monotonic()
+                time.sleep(args.seconds)
+                elapsed = time.monotonic() - began
+                cpu = time.process_time() - cpu_before
+                sent = sum(counter.value for counter in counters) - sent_before
+                ingested_count = ingested() - ingested_before
+                published = state.version - published_before
+                evaluate = [row for row in latency.summary() if row.stage == "evaluate"]
+            finally:
+                service.stop()
+    finally:
+        for mock in mocks:
+            mock.terminate()
+    return {
+        "processes": processes,
+        "sent": sent / elapsed,
+        "ingested": ingested_count / elapsed,
+        "published": published / elapsed,
+        "engine_cpu": cpu / elapsed * 100,
+        "evaluate_p50_ms": evaluate[0].p50_ns / 1e6 if evaluate else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Collector process count vs. ingest throughput")
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=20_000.0, help="borsa başına toplam msgs/s")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=4.0)
+    parser.add_argument("--processes", default="0,1,2,4", help="virgülle ayrılmış liste")
+    parser.add_argument("--mock-processes", type=int, default=2, help="port başına mock süreci")
+    args = parser.parse_args()
+
+    print(
+        f"symbols: {args.symbols} | offered: {args.rate * 2:,.0f} msgs/s | "
+        f"cpus: {multiprocessing.cpu_count()}"
+    )
+    print("processes |  mock sent/s |  ingested/s | published/s | engine CPU | evaluate p50")
+    for processes in [int(item) for item in args.processes.split(",")]:
+        row = _measure(args, processes)
+        print(
+            f"{row['processes']:>9} | {row['sent']:>12,.0f} | {row['ingested']:>11,.0f} | "
+            f"{row['published']:>11,.0f} | {row['engine_cpu']:>9.0f}% | "
+            f"{row['evaluate_p50_ms']:.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
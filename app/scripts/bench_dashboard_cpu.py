@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+ROOT = Path(__file__).resolve().parents[2]
+PAGE_NAME = "Dashboard"
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _cpu_seconds(pid: int) -> float:
+    fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+def _rerun(page_script_hash: str = "", fragment_id: str = "") -> bytes:
+    msg = BackMsg()
+    state = msg.rerun_script
+    state.query_string = ""
+    state.page_name = PAGE_NAME
+    state.widget_states.SetInParent()
+    if page_script_hash:
+        state.page_script_hash = page_script_hash
+    if fragment_id:
+        state.fragment_id = fragment_id
+        state.is_auto_rerun = True
+    return msg.SerializeToString()
+
+
+async def _run_once(url: str) -> None:
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        await ws.send(_rerun())
+        async for raw in ws:
+            msg = ForwardMsg()
+            msg.ParseFromString(raw)
+            if msg.WhichOneof("type") == "script_finished":
+                return
+
+
+async def reload_viewer(base: str, url: str, interval: float, deadline: float) -> None:
+    while time.monotonic() < deadline:
+        began = time.monotonic()
+        await asyncio.to_thread(lambda: urllib.request.urlopen(f"{base}/{PAGE_NAME}").read())
+        await _run_once(url)
+        await asyncio.sleep(max(0.0, interval - (time.monotonic() - began)))
+
+
+async def fragment_viewer(url: str, deadline: float) -> None:
+    timers: dict[str, asyncio.Task] = {}
+
+    async def tick(ws, page_hash: str, fragment_id: str, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await ws.send(_rerun(page_hash, fragment_id))
+
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        await ws.send(_rerun())
+        page_hash = ""
+        try:
+            while time.monotonic() < deadline:
+                try:
+                    raw = await asyncio.wait_for(ws.recv(), deadline - time.monotonic())
+                except asyncio.TimeoutError:
+                    break
+                msg = ForwardMsg()
+                msg.ParseFromString(raw)
+                kind = msg.WhichOneof("type")
+                if kind == "new_session":
+                    page_hash = msg.new_session.page_script_hash
+                elif kind == "auto_rerun" and msg.auto_rerun.fragment_id not in timers:
+                    fragment_id = msg.auto_rerun.fragment_id
+                    timers[fragment_id] = asyncio.create_task(
+                        tick(ws, page_hash, fragment_id, msg.auto_rerun.interval)
+                    )
+        finally:
+            for task in timers.values():
+                task.cancel()
+
+
+async def _measure(pid: int, port: int, mode: str, viewers: int, seconds: float) -> float:
+    base = f"http://127.0.0.1:{port}"
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    await _run_once(url)
+    deadline = time.monotonic() + seconds + 3
+    if mode == "reload":
+        tasks = [reload_viewer(base, url, 1.0, deadline) for _ in range(viewers)]
+    else:
+        tasks = [fragment_viewer(url, deadline) for _ in range(viewers)]
+    runner = asyncio.gather(*tasks)
+    await asyncio.sleep(3)
+    cpu_start, wall_start = _cpu_seconds(pid), time.monotonic()
+    await runner
+    return (_cpu_seconds(pid) - cpu_start) / (time.monotonic() - wall_start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Streamlit server CPU per Dashboard viewer")
+    parser.add_argument("--mode", choices=("reload", "fragment"), default="fragment")
+    parser.add_argument("--viewers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--post-script-gc", action="store_true")
+    args = parser.parse_args()
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "streamlit",
+            "run",
+            "app/ui/app.py",
+            "--server.headless=true",
+            f"--server.port={port}",
+            "--server.fileWatcherType=none",
+            "--browser.gatherUsageStats=false",
+            f"--runner.postScriptGC={str(args.post_script_gc).lower()}",
+        ],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health").read()
+                break
+            except OSError:
+                time.sleep(0.2)
+        for viewers in args.viewers:
+            load = asyncio.run(_measure(server.pid, port, args.mode, viewers, args.seconds))
+            print(
+                f"{args.mode:>8} | {viewers} viewers | server CPU {load * 100:5.1f}% "
+                f"| per viewer {load * 100 / viewers:5.1f}%"
+            )
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
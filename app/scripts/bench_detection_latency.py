@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from app.config import Settings
+from app.core.scheduler import MonitoringService
+from app.core.state import PriceData, SharedState, TickSubscription
+from app.storage.db import init_db
+from app.storage.repository import Repository
+from app.storage.writer import PersistenceWriter
+
+SYMBOL = "BTC/USDT"
+NOISE_SYMBOLS = ["ETH/USDT", "SOL/USDT", "XRP/USDT", "ADA/USDT"]
+
+
+class TimingWriter(PersistenceWriter):
+    def __init__(self, repository: Repository) -> None:
+        super().__init__(repository)
+        self.opened: list[float] = []
+
+    def create_event(self, ref, **kwargs) -> None:  # type: ignore[override]
+        self.opened.append(time.perf_counter())
+        super().create_event(ref, **kwargs)
+
+
+def _quote(bid: float) -> PriceData:
+    return PriceData(bid=bid, ask=bid + 0.01, last=bid, volume_24h=1.0)
+
+
+async def _feed(
+    state: SharedState,
+    writer: TimingWriter,
+    spikes: int,
+    noise_hz: float,
+) -> list[float]:
+    latencies: list[float] = []
+    for symbol in [SYMBOL, *NOISE_SYMBOLS]:
+        state.update_price("binance", symbol, _quote(100.0))
+        state.update_price("kraken", symbol, _quote(100.0))
+    rng = random.Random(42)
+    for _ in range(spikes):
+        await asyncio.sleep(rng.uniform(0.2, 1.2))
+        opened_before = len(writer.opened)
+        tick_ts = time.perf_counter()
+        state.update_price("binance", SYMBOL, _quote(101.0))
+        while len(writer.opened) == opened_before:
+            symbol = rng.choice(NOISE_SYMBOLS)
+            state.update_price("kraken", symbol, _quote(100.0 + rng.uniform(-0.05, 0.05)))
+            await asyncio.sleep(1 / noise_hz)
+        latencies.append(writer.opened[-1] - tick_ts)
+        state.update_price("binance", SYMBOL, _quote(100.0))
+        await asyncio.sleep(1.1)
+    return latencies
+
+
+async def _measure(mode: str, db_path: str, spikes: int, noise_hz: float) -> list[float]:
+    settings = Settings(
+        watchlist=[SYMBOL, *NOISE_SYMBOLS],
+        evaluation_mode=mode,
+        db_path=db_path,
+    )
+    state = SharedState()
+    service = MonitoringService(settings, state)
+    writer = TimingWriter(Repository(db_path))
+    writer.start()
+    arbitrage_engine = service._build_engine()
+    tick_driven = mode == "tick"
+    tasks = [
+        asyncio.create_task(
+            service._snapshot_loop(writer, arbitrage_engine, update_events=not tick_driven)
+        )
+    ]
+    if tick_driven:
+        subscription = TickSubscription()
+        state.subscribe(subscription)
+        tasks.append(
+            asyncio.create_task(service._tick_loop(subscription, writer, arbitrage_engine))
+        )
+    try:
+        return await _feed(state, writer, spikes, noise_hz)
+    finally:
+        service.stop_event.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        writer.stop()
+
+
+def _report(mode: str, latencies: list[float]) -> None:
+    ms = sorted(value * 1000 for value in latencies)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    print(
+        f"{mode:>8}: n={len(ms)} min={ms[0]:.2f}ms median={statistics.median(ms):.2f}ms "
+        f"p95={p95:.2f}ms max={ms[-1]:.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tick received -> event opened latency")
+    parser.add_argument("--spikes", type=int, default=20)
+    parser.add_argument("--noise-hz", type=float, default=200.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("snapshot", "tick"):
+            db_path = str(Path(tmp) / f"{mode}.db")
+            init_db(db_path)
+            latencies = asyncio.run(_measure(mode, db_path, args.spikes, args.noise_hz))
+            _report(mode, latencies)
+
+
+if __name__ == "__main__":
+    main()
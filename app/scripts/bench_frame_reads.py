@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from app.storage.db import init_db
+from app.storage.repository import Repository
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+SYMBOL = "BTC/USDT"
+EXCHANGES = ("binance", "kraken")
+BATCH = 50_000
+
+
+def _seed(repository: Repository, rows: int) -> None:
+    for offset in range(0, rows, BATCH):
+        batch = []
+        for i in range(offset, min(rows, offset + BATCH)):
+            ts = START + timedelta(seconds=i // len(EXCHANGES))
+            exchange = EXCHANGES[i % len(EXCHANGES)]
+            batch.append((ts, exchange, SYMBOL, 100.0, 100.1, 100.05, 1e6, 0.1, 0.1))
+        repository.bulk_insert_snapshots(batch)
+
+
+def _orm_frame(repository: Repository, end: datetime) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                "timestamp": snap.timestamp,
+                "exchange": snap.exchange,
+                "symbol": snap.symbol_std,
+                "bid": snap.bid,
+                "ask": snap.ask,
+                "last": snap.last,
+                "volume_24h": snap.volume_24h,
+                "spread_abs": snap.spread_abs,
+                "spread_pct": snap.spread_pct,
+            }
+            for snap in repository.list_snapshots(START, end, SYMBOL)
+        ]
+    )
+
+
+def _native_frame(repository: Repository, end: datetime) -> pd.DataFrame:
+    return repository.snapshots_frame(START, end, SYMBOL).rename(
+        columns={"symbol_std": "symbol"}
+    )
+
+
+PATHS: dict[str, Callable[[Repository, datetime], pd.DataFrame]] = {
+    "orm list + dicts": _orm_frame,
+    "snapshots_frame": _native_frame,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ORM list vs column-oriented DataFrame reads")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            db_path = str(Path(tmp) / f"{rows}.db")
+            init_db(db_path)
+            _seed(Repository(db_path), rows)
+            repository = Repository(db_path, read_only=True)
+            end = START + timedelta(seconds=rows)
+            results = []
+            for name, path in PATHS.items():
+                best = float("inf")
+                for _ in range(args.repeat):
+                    began = time.perf_counter()
+                    frame = path(repository, end)
+                    best = min(best, time.perf_counter() - began)
+                assert len(frame) == rows
+                results.append(f"{name}: {best * 1000:,.0f} ms")
+            print(f"{rows:>9,} rows | " + " | ".join(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.core.graph_arbitrage import GraphArbitrageEngine
+
+EXCHANGES = ("binance", "kraken")
+FEES = {"binance": 0.001, "kraken": 0.0026}
+CROSS_QUOTES = ("BTC", "ETH")
+
+
+def _universe(assets: int) -> Tuple[List[str], Dict[str, float]]:
+    prices = {"USDT": 1.0, "BTC": 60000.0, "ETH": 3000.0}
+    for index in range(assets):
+        prices[f"A{index:03d}"] = 10 ** random.uniform(-2, 3)
+    symbols = [f"{asset}/USDT" for asset in prices if asset != "USDT"]
+    symbols += [
+        f"{asset}/{quote}"
+        for asset in prices
+        for quote in CROSS_QUOTES
+        if asset not in ("USDT", quote) and not (asset == "BTC" and quote == "ETH")
+    ]
+    return symbols, prices
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-tick cost of the graph cycle search")
+    parser.add_argument("--assets", type=int, default=100)
+    parser.add_argument("--ticks", type=int, default=20000)
+    parser.add_argument("--spike-ratio", type=float, default=0.001)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    symbols, prices = _universe(args.assets)
+    engine = GraphArbitrageEngine(symbols, FEES, threshold_pct=0.1)
+    now = datetime.now(timezone.utc)
+
+    def quote(symbol: str, noise: float) -> Tuple[float, float]:
+        base, quote_asset = symbol.split("/")
+        mid = prices[base] / prices[quote_asset] * (1 + noise)
+        return mid * 0.99995, mid * 1.00005
+
+    for symbol in symbols:
+        for exchange in EXCHANGES:
+            engine.update_quote(symbol, exchange, *quote(symbol, random.gauss(0, 2e-4)))
+    began = time.perf_counter_ns()
+    engine.step(now)
+    print(
+        f"pairs: {len(symbols) * len(EXCHANGES)} | nodes: {len(engine.nodes)} | "
+        f"edges: {len(engine.tail)} | full scan {(time.perf_counter_ns() - began) / 1e6:.1f} ms"
+    )
+
+    samples: List[int] = []
+    spikes = starts = closes = 0
+    relaxations = engine.relaxations
+    for _ in range(args.ticks):
+        symbol = random.choice(symbols)
+        exchange = random.choice(EXCHANGES)
+        noise = random.gauss(0, 2e-4)
+        if random.random() < args.spike_ratio:
+            noise += random.choice((-1, 1)) * 0.01
+            spikes += 1
+        began = time.perf_counter_ns()
+        engine.update_quote(symbol, exchange, *quote(symbol, noise))
+        transitions = engine.step(now)
+        samples.append(time.perf_counter_ns() - began)
+        starts += sum(1 for item in transitions if item.action == "start")
+        closes += sum(1 for item in transitions if item.action == "close")
+
+    values = np.array(samples) / 1e3
+    print(
+        f"tick update+search p50 {np.percentile(values, 50):.1f} us | "
+        f"p99 {np.percentile(values, 99):.1f} us | max {values.max():.1f} us"
+    )
+    print(
+        f"relaxations/tick: {(engine.relaxations - relaxations) / args.ticks:.1f} | "
+        f"spikes: {spikes} | cycle events started: {starts} closed: {closes} "
+        f"open: {len(engine.events)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import threading
+import time
+from contextlib import suppress
+from typing import List
+
+import numpy as np
+
+from app.config import Settings
+from app.core.live_api import LiveApiServer, LiveClient
+from app.core.scheduler import MonitoringService
+from app.core.state import PriceData, SharedState
+
+
+def _start_server(service: MonitoringService) -> LiveApiServer:
+    loop = asyncio.new_event_loop()
+    server = LiveApiServer(service, "127.0.0.1", 0)
+    task = loop.create_task(server.run())
+
+    def serve() -> None:
+        with suppress(asyncio.CancelledError):
+            loop.run_until_complete(task)
+
+    threading.Thread(target=serve, daemon=True).start()
+    while server.port == 0:
+        time.sleep(0.01)
+    return server
+
+
+def _describe(name: str, samples_ns: List[int]) -> None:
+    values = np.array(samples_ns) / 1e3
+    print(
+        f"{name:<18} p50 {np.percentile(values, 50):>8.1f} us | "
+        f"p99 {np.percentile(values, 99):>8.1f} us | max {values.max():>8.1f} us"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Live API request and push latency")
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--pushes", type=int, default=2000)
+    args = parser.parse_args()
+
+    watchlist = [f"S{index:03d}/USDT" for index in range(args.symbols)]
+    state = SharedState()
+    for exchange in ("binance", "kraken"):
+        for symbol in watchlist:
+            state.update_price(exchange, symbol, PriceData(100.0, 100.1))
+    service = MonitoringService(Settings(watchlist=watchlist), state, latency=None)
+    server = _start_server(service)
+    client = LiveClient("127.0.0.1", server.port)
+
+    for path in ("/quotes", "/snapshot"):
+        client.get(path)
+        samples = []
+        for _ in range(args.requests):
+            began = time.perf_counter_ns()
+            client.get(path)
+            samples.append(time.perf_counter_ns() - began)
+        _describe(f"GET {path}", samples)
+
+    pushes: List[int] = []
+    stream = client.stream()
+    next(stream)
+
+    def read() -> None:
+        for event, payload in stream:
+            if event != "quotes":
+                continue
+            received = time.perf_counter_ns()
+            for quotes in payload["quotes"].values():
+                for values in quotes.values():
+                    pushes.append(received - int(values[2]))
+            if len(pushes) >= args.pushes:
+                return
+
+    reader = threading.Thread(target=read, daemon=True)
+    reader.start()
+    for index in range(args.pushes):
+        symbol = watchlist[index % len(watchlist)]
+        state.update_price("binance", symbol, PriceData(100.0, 100.1, time.perf_counter_ns()))
+        time.sleep(0.001)
+    reader.join(10)
+    print(f"symbols: {args.symbols} | pushes received: {len(pushes)}")
+    if pushes:
+        _describe("SSE update->client", pushes)
+
+
+if __name__ == "__main__":
+    main()
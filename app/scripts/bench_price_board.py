@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import random
+import time
+from typing import List, Tuple
+
+from app.collectors.binance import BinanceCollector
+from app.collectors.kraken import KrakenCollector
+from app.core import state as state_module
+from app.core.state import SharedState
+
+READ_EVERY = 20
+
+
+def _frames(symbols: int, count: int, seed: int = 7) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    frames = []
+    for index in range(count):
+        base = f"S{rng.randrange(symbols):03d}"
+        price = 100.0 + rng.uniform(-1, 1)
+        if index % 2:
+            data = {"a": [f"{price + 0.01:.2f}", 0, "1"], "b": [f"{price:.2f}", 0, "1"]}
+            data |= {"c": [f"{price:.2f}", "1"], "v": ["10", "1000"]}
+            frames.append(("kraken", json.dumps([42, data, "ticker", f"{base}/USDT"])))
+        elif index % 20 == 2:
+            data = {"e": "24hrMiniTicker", "E": 1, "s": f"{base}USDT", "c": f"{price:.2f}"}
+            data["v"] = "1000"
+            frames.append(("binance", json.dumps({"data": data})))
+        else:
+            data = {"e": "bookTicker", "s": f"{base}USDT", "b": f"{price:.2f}"}
+            data["a"] = f"{price + 0.01:.2f}"
+            frames.append(("binance", json.dumps({"data": data})))
+    return frames
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Collector -> SharedState tick throughput")
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--frames", type=int, default=500_000)
+    args = parser.parse_args()
+
+    watchlist = [f"S{index:03d}/USDT" for index in range(args.symbols)]
+    state = SharedState()
+    handlers = {
+        "binance": BinanceCollector(
+            {symbol: symbol.replace("/", "") for symbol in watchlist}, state
+        )._handle_message,
+        "kraken": KrakenCollector({symbol: symbol for symbol in watchlist}, state)._handle_message,
+    }
+    frames = _frames(args.symbols, args.frames)
+    for exchange, frame in frames[:10_000]:
+        handlers[exchange](frame)
+
+    def feed() -> float:
+        began = time.perf_counter()
+        for index, (exchange, frame) in enumerate(frames):
+            handlers[exchange](frame)
+            if not index % READ_EVERY:
+                prices = state.get_prices()
+                for symbol in watchlist[:4]:
+                    prices.get("binance", {}).get(symbol)
+                    prices.get("kraken", {}).get(symbol)
+        return time.perf_counter() - began
+
+    collections_before = [stats["collections"] for stats in gc.get_stats()]
+    elapsed = feed()
+    collections = [
+        stats["collections"] - before
+        for stats, before in zip(gc.get_stats(), collections_before)
+    ]
+
+    created = [0]
+    price_init = state_module.PriceData.__init__
+
+    def counting_init(self, *args, **kwargs) -> None:
+        created[0] += 1
+        price_init(self, *args, **kwargs)
+
+    state_module.PriceData.__init__ = counting_init
+    try:
+        feed()
+    finally:
+        state_module.PriceData.__init__ = price_init
+
+    print(f"symbols: {args.symbols} | frames: {len(frames):,} | read every {READ_EVERY} ticks")
+    per_frame_ns = elapsed / len(frames) * 1e9
+    print(f"throughput: {len(frames) / elapsed:,.0f} frames/s ({per_frame_ns:.0f} ns/frame)")
+    print(f"PriceData allocations per tick: {created[0] / len(frames):.2f}")
+    print(f"gc collections (gen0/gen1/gen2): {collections}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,24 @@
 from __future__ import annotations
 
+import argparse
+
 from app.config import DEFAULT_DB_PATH, load_settings
-from app.storage.db import Base, get_engine
-from app.storage import models  # noqa: F401
+from app.storage.db import enable_incremental_vacuum, init_db
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Create or migrate the SQLite database")
+    parser.add_argument(
+        "--vacuum",
+        action="store_true",
+        help="Switch an existing database to incremental auto-vacuum (runs a full VACUUM)",
+    )
+    args = parser.parse_args()
     settings = load_settings()
     db_path = settings.db_path or str(DEFAULT_DB_PATH)
-    engine = get_engine(db_path)
-    Base.metadata.create_all(engine)
+    init_db(db_path)
+    if args.vacuum:
+        enable_incremental_vacuum(db_path)
     print(f"Database initialized at {db_path}")
 
 
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import socket
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, List
+
+from app.collectors.mock_exchange import MockExchangeServer
+from app.config import EVALUATION_MODES, Settings
+from app.core.scheduler import MonitoringService
+from app.core.state import SharedState
+
+LAG_PROBE_S = 0.005
+LATENCY_SAMPLE_EVERY = 10
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise SystemExit(f"Mock exchange on port {port} did not start")
+
+
+def _run_mock(
+    port: int, rate: float, disconnect_every_s: float, random_disconnects: bool, sent: Any
+) -> None:
+    async def serve() -> None:
+        server = MockExchangeServer(
+            port=port,
+            rate=rate,
+            disconnect_every_s=disconnect_every_s,
+            random_disconnects=random_disconnects,
+        )
+        await server.start()
+        while True:
+            await asyncio.sleep(0.2)
+            sent.value = server.stats.binance_sent + server.stats.kraken_sent
+
+    asyncio.run(serve())
+
+
+class CountingState(SharedState):
+    def __init__(self) -> None:
+        super().__init__()
+        self.connects: Counter[str] = Counter()
+
+    def set_status(self, exchange: str, connected: bool, message: str | None = None) -> None:
+        if connected:
+            self.connects[exchange] += 1
+        super().set_status(exchange, connected, message)
+
+
+class LoadTestService(MonitoringService):
+    def __init__(self, settings: Settings, state: SharedState) -> None:
+        super().__init__(settings, state)
+        self.frames: Counter[str] = Counter()
+        self.latencies_ns: List[int] = []
+        self.lags_s: List[float] = []
+
+    def reset_samples(self) -> None:
+        self.latencies_ns = []
+        self.lags_s = []
+        if self.latency is not None:
+            self.latency.reset()
+
+    async def _run(self) -> None:
+        probe = asyncio.create_task(self._probe_lag())
+        try:
+            await super()._run()
+        finally:
+            probe.cancel()
+
+    async def _probe_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            began = loop.time()
+            await asyncio.sleep(LAG_PROBE_S)
+            self.lags_s.append(loop.time() - began - LAG_PROBE_S)
+
+    def _build_collectors(self, exchange_map, recorder=None):  # type: ignore[override]
+        collectors = super()._build_collectors(exchange_map, recorder)
+        for collector in collectors:
+            self._instrument(collector)
+        return collectors
+
+    def _instrument(self, collector: Any) -> None:
+        handle = collector._handle_message
+        exchange = collector.exchange
+        frames = self.frames
+
+        def handle_and_measure(message: str) -> Any:
+            result = handle(message)
+            frames[exchange] += 1
+            if frames[exchange] % LATENCY_SAMPLE_EVERY:
+                return result
+            position = message.rfind('"T":')
+            if position >= 0:
+                sent_ns = int(message[position + 4 : position + 23])
+                self.latencies_ns.append(time.time_ns() - sent_ns)
+            return result
+
+        collector._handle_message = handle_and_measure
+
+
+def _percentiles(values: List[float], scale: float, unit: str) -> str:
+    if not values:
+        return "n=0"
+    ordered = sorted(values)
+
+    def pick(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * scale
+
+    return (
+        f"n={len(ordered)} p50={pick(0.5):.2f}{unit} p99={pick(0.99):.2f}{unit} "
+        f"max={ordered[-1] * scale:.2f}{unit}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Collector load test against the local mock")
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=5000.0, help="bağlantı başına msgs/s")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--disconnect-every", type=float, default=0.0, help="saniye, 0 = kapalı")
+    parser.add_argument("--mode", choices=EVALUATION_MODES, default="tick")
+    parser.add_argument("--connections", type=int, default=1, help="Binance bağlantı sayısı")
+    parser.add_argument("--random-disconnects", action="store_true")
+    parser.add_argument("--standby", action="store_true", help="yedek (hot standby) bağlantılar")
+    args = parser.parse_args()
+
+    watchlist = [f"S{index:03d}/USDT" for index in range(args.symbols)]
+    ports = [_free_port(), _free_port()]
+    counters = [multiprocessing.Value("q", 0, lock=False) for _ in ports]
+    mocks = [
+        multiprocessing.Process(
+            target=_run_mock,
+            args=(port, args.rate, args.disconnect_every, args.random_disconnects, counter),
+            daemon=True,
+        )
+        for port, counter in zip(ports, counters)
+    ]
+    for mock in mocks:
+        mock.start()
+    for port in ports:
+        _wait_for_port(port)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(
+            watchlist=watchlist,
+            evaluation_mode=args.mode,
+            db_path=str(Path(tmp) / "load.db"),
+            archive_enabled=False,
+            binance_ws_url=f"ws://127.0.0.1:{ports[0]}",
+            kraken_ws_url=f"ws://127.0.0.1:{ports[1]}/kraken",
+            binance_connections=args.connections,
+            hot_standby=args.standby,
+        )
+        state = CountingState()
+        service = LoadTestService(settings, state)
+        service.start()
+        try:
+            time.sleep(args.warmup)
+            service.reset_samples()
+            sent_before = sum(counter.value for counter in counters)
+            handled_before = sum(service.frames.values())
+            began = time.monotonic()
+            time.sleep(args.seconds)
+            elapsed = time.monotonic() - began
+            sent = sum(counter.value for counter in counters) - sent_before
+            handled = sum(service.frames.values()) - handled_before
+            latencies, lags = list(service.latencies_ns), list(service.lags_s)
+            stages = service.latency.summary() if service.latency else []
+            streams = state.get_stream_stats()
+        finally:
+            service.stop()
+            for mock in mocks:
+                mock.terminate()
+        writer_stats = service.writer.stats() if service.writer else None
+
+    offered = args.rate * (args.connections + 1) * (2 if args.standby else 1)
+    print(f"symbols: {args.symbols} | offered: {offered:,.0f} msgs/s | mode: {args.mode}")
+    print(f"mock sent:  {sent / elapsed:,.0f} msgs/s")
+    print(f"handled:    {handled / elapsed:,.0f} msgs/s ({dict(service.frames)})")
+    print(f"event-loop lag ({LAG_PROBE_S * 1000:.0f} ms probe): {_percentiles(lags, 1e3, 'ms')}")
+    print(f"end-to-end send -> SharedState: {_percentiles(latencies, 1e-6, 'ms')}")
+    for row in stages:
+        print(
+            f"  {row.stage:>11} {row.source:<8} n={row.count:<8} p50={row.p50_ns / 1e6:.3f}ms "
+            f"p99={row.p99_ns / 1e6:.3f}ms max={row.max_ns / 1e6:.3f}ms"
+        )
+    for name, stream in streams.items():
+        print(
+            f"  {name:<11} streams={stream.streams:<5} messages={stream.messages:<9} "
+            f"rate={stream.rate:,.0f}/s reconnects={stream.reconnects} "
+            f"duplicates={stream.duplicates} failovers={stream.failovers} "
+            f"gaps={stream.gaps} gap={stream.gap_ms:.0f}ms"
+        )
+    print(f"connects: {dict(state.connects)}")
+    if writer_stats is not None:
+        print(
+            f"writer: written={writer_stats.written} dropped={writer_stats.dropped} "
+            f"failed={writer_stats.failed}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+from app.collectors.mock_exchange import MockExchangeServer
+from app.logging_config import setup_logging
+
+
+async def _serve(server: MockExchangeServer, report_every_s: float) -> None:
+    await server.start()
+    print(f"Binance URL: {server.binance_url}")
+    print(f"Kraken URL:  {server.kraken_url}")
+    sent = 0
+    while True:
+        await asyncio.sleep(report_every_s)
+        stats = server.stats
+        total = stats.binance_sent + stats.kraken_sent
+        print(
+            f"sent {(total - sent) / report_every_s:,.0f} msgs/s | connections {stats.connections} "
+            f"| disconnects {stats.disconnects} | lagging batches {stats.lagging_batches}"
+        )
+        sent = total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local Binance/Kraken websocket mock")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--rate", type=float, default=1000.0, help="bağlantı başına msgs/s")
+    parser.add_argument("--disconnect-every", type=float, default=0.0, help="saniye, 0 = kapalı")
+    parser.add_argument(
+        "--random-disconnects",
+        action="store_true",
+        help="bağlantıları ortalaması --disconnect-every olan rastgele (üstel) aralıklarla kes",
+    )
+    args = parser.parse_args()
+
+    setup_logging()
+    server = MockExchangeServer(
+        args.host,
+        args.port,
+        args.rate,
+        args.disconnect_every,
+        random_disconnects=args.random_disconnects,
+    )
+    try:
+        asyncio.run(_serve(server, 5.0))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from app.collectors.recording import FrameReplayer, list_segments
+from app.config import EVALUATION_MODES, load_settings
+from app.core.scheduler import MonitoringService
+from app.core.state import SharedState
+from app.storage.repository import Repository
+
+
+def main() -> None:
+    settings = load_settings()
+    parser = argparse.ArgumentParser(description="Replay recorded websocket frames offline")
+    parser.add_argument("--dir", default=settings.recording_dir)
+    parser.add_argument("--speed", type=float, default=0.0, help="1 = gerçek zaman, 0 = max")
+    parser.add_argument("--mode", choices=EVALUATION_MODES, default=settings.evaluation_mode)
+    parser.add_argument("--db", default=None, help="varsayılan: geçici DB")
+    args = parser.parse_args()
+
+    segments = list_segments(args.dir)
+    if not segments:
+        raise SystemExit(f"No frame segments found in {args.dir}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or str(Path(tmp) / "replay.db")
+        service = MonitoringService(
+            replace(settings, db_path=db_path, evaluation_mode=args.mode, record_frames=False),
+            SharedState(),
+            FrameReplayer.from_directory(args.dir, speed=args.speed),
+        )
+        started = datetime.now(timezone.utc)
+        service.start()
+        while service.replay_stats is None and service.thread and service.thread.is_alive():
+            time.sleep(0.05)
+        service.stop()
+
+        stats = service.replay_stats
+        if stats is None:
+            raise SystemExit("Replay did not finish, see app/logs/app.log")
+        writer_stats = service.writer.stats() if service.writer else None
+        events = Repository(db_path, read_only=True).count_events(
+            started, datetime.now(timezone.utc) + timedelta(seconds=1)
+        )
+        rate = stats.frames / stats.elapsed_s if stats.elapsed_s else 0.0
+        speedup = stats.recorded_span_s / stats.elapsed_s if stats.elapsed_s else 0.0
+        print(f"segments: {len(segments)}")
+        print(
+            f"frames: {stats.frames} (skipped={stats.skipped} failed={stats.failed}) "
+            f"in {stats.elapsed_s:.2f}s -> {rate:,.0f} frames/s"
+        )
+        print(f"recorded span: {stats.recorded_span_s:.1f}s ({speedup:,.1f}x)")
+        if writer_stats is not None:
+            print(
+                f"rows written: {writer_stats.written} dropped: {writer_stats.dropped} "
+                f"failed: {writer_stats.failed}"
+            )
+        print(f"arbitrage events: {events}")
+
+
+if __name__ == "__main__":
+    main()
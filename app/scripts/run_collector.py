@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import time
 
-from app.config import load_settings
+from app.config import DEFAULT_SETTINGS_PATH, load_settings
 from app.core.scheduler import MonitoringService
 from app.logging_config import setup_logging
 
@@ -10,8 +10,10 @@ from app.logging_config import setup_logging
 def main() -> None:
     setup_logging()
     settings = load_settings()
-    service = MonitoringService(settings)
+    service = MonitoringService(settings, settings_path=DEFAULT_SETTINGS_PATH)
     service.start()
+    if settings.api_port > 0:
+        print(f"Live API: http://{settings.api_host}:{settings.api_port} (/snapshot, /stream)")
     print("Collector running. Press Ctrl+C to stop.")
     try:
         while True:
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Sequence, Tuple, Type
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sqlalchemy import DateTime, Float, Integer, delete, func, select
+
+from app.storage.db import Base
+from app.storage.models import ArbitrageMetric, Snapshot
+from app.storage.rollup import (
+    METRIC_ROLLUP,
+    ROLLUP_TIERS,
+    SNAPSHOT_ROLLUP,
+    RollupSource,
+    as_utc,
+    load_watermarks,
+)
+
+if TYPE_CHECKING:
+    from app.storage.repository import Repository
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = "date="
+ARCHIVE_DIRNAME = "archive"
+ROW_GROUP_ROWS = 65_536
+
+
+@dataclass(frozen=True)
+class ArchiveTable:
+    name: str
+    model: Type[Base]
+    columns: Tuple[str, ...]
+    sort_keys: Tuple[str, ...]
+    rollup: RollupSource
+
+
+SNAPSHOT_ARCHIVE = ArchiveTable(
+    name="snapshots",
+    model=Snapshot,
+    columns=(
+        "id",
+        "timestamp",
+        "exchange",
+        "symbol_std",
+        "bid",
+        "ask",
+        "last",
+        "volume_24h",
+        "spread_abs",
+        "spread_pct",
+    ),
+    sort_keys=("symbol_std", "exchange", "timestamp"),
+    rollup=SNAPSHOT_ROLLUP,
+)
+METRIC_ARCHIVE = ArchiveTable(
+    name="arbitrage_metrics",
+    model=ArbitrageMetric,
+    columns=(
+        "id",
+        "timestamp",
+        "symbol_std",
+        "direction",
+        "raw_spread",
+        "net_pct",
+        "exec_qty",
+        "vwap_net_pct",
+    ),
+    sort_keys=("symbol_std", "direction", "timestamp"),
+    rollup=METRIC_ROLLUP,
+)
+ARCHIVE_TABLES = (SNAPSHOT_ARCHIVE, METRIC_ARCHIVE)
+
+
+def arrow_schema(table: ArchiveTable) -> pa.Schema:
+    fields = []
+    for name in table.columns:
+        column_type = table.model.__table__.c[name].type
+        if isinstance(column_type, DateTime):
+            fields.append(pa.field(name, pa.timestamp("us", tz="UTC")))
+        elif isinstance(column_type, Float):
+            fields.append(pa.field(name, pa.float64()))
+        elif isinstance(column_type, Integer):
+            fields.append(pa.field(name, pa.int64()))
+        else:
+            fields.append(pa.field(name, pa.string()))
+    return pa.schema(fields)
+
+
+def archive_root(db_path: str) -> Path:
+    return Path(db_path).parent / ARCHIVE_DIRNAME
+
+
+def _arrow_chunk(
+    table: ArchiveTable, schema: pa.Schema, rows: Sequence[Sequence[Any]]
+) -> pa.Table:
+    arrays = {}
+    for i, name in enumerate(table.columns):
+        values = [row[i] for row in rows]
+        if name == "timestamp":
+            values = [as_utc(value) for value in values]
+        arrays[name] = pa.array(values, type=schema.field(name).type)
+    return pa.table(arrays, schema=schema)
+
+
+def _day_bounds(day: date) -> Tuple[datetime, datetime]:
+    start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+class ParquetArchive:
+    def __init__(self, root: Path, delete_batch_size: int = 5000) -> None:
+        self.root = Path(root)
+        self.delete_batch_size = delete_batch_size
+
+    def table_dir(self, table: ArchiveTable) -> Path:
+        return self.root / table.name
+
+    def partition_dir(self, table: ArchiveTable, day: date) -> Path:
+        return self.table_dir(table) / f"{PARTITION_PREFIX}{day.isoformat()}"
+
+    def sealed_days(self, table: ArchiveTable) -> List[date]:
+        base = self.table_dir(table)
+        if not base.is_dir():
+            return []
+        days = []
+        for entry in os.scandir(base):
+            if entry.is_dir() and entry.name.startswith(PARTITION_PREFIX):
+                if any(name.endswith(".parquet") for name in os.listdir(entry.path)):
+                    days.append(date.fromisoformat(entry.name[len(PARTITION_PREFIX) :]))
+        return sorted(days)
+
+    def sealed_until(self, table: ArchiveTable) -> datetime | None:
+        days = self.sealed_days(table)
+        if not days:
+            return None
+        return _day_bounds(days[-1])[1]
+
+    def read(
+        self,
+        table: ArchiveTable,
+        start_ts: datetime,
+        end_ts: datetime,
+        columns: Sequence[str] | None = None,
+        equals: Dict[str, Any] | None = None,
+    ) -> pa.Table | None:
+        files = self._files(table, start_ts, end_ts)
+        if not files:
+            return None
+        return pq.read_table(
+            files,
+            schema=arrow_schema(table),
+            columns=list(columns or table.columns),
+            filters=self._filters(start_ts, end_ts, equals),
+            memory_map=True,
+            partitioning=None,
+        )
+
+    def iter_batches(
+        self,
+        table: ArchiveTable,
+        start_ts: datetime,
+        end_ts: datetime,
+        columns: Sequence[str] | None = None,
+        equals: Dict[str, Any] | None = None,
+        batch_size: int = 10_000,
+    ) -> Iterator[pa.RecordBatch]:
+        files = self._files(table, start_ts, end_ts)
+        if not files:
+            return
+        dataset = ds.dataset(
+            files, schema=arrow_schema(table), format="parquet", partitioning=None
+        )
+        yield from dataset.to_batches(
+            columns=list(columns or table.columns),
+            filter=pq.filters_to_expression(self._filters(start_ts, end_ts, equals)),
+            batch_size=batch_size,
+        )
+
+    def count(
+        self,
+        table: ArchiveTable,
+        start_ts: datetime,
+        end_ts: datetime,
+        equals: Dict[str, Any] | None = None,
+    ) -> int:
+        files = self._files(table, start_ts, end_ts)
+        if not files:
+            return 0
+        dataset = ds.dataset(
+            files, schema=arrow_schema(table), format="parquet", partitioning=None
+        )
+        return dataset.count_rows(
+            filter=pq.filters_to_expression(self._filters(start_ts, end_ts, equals))
+        )
+
+    def _files(self, table: ArchiveTable, start_ts: datetime, end_ts: datetime) -> List[str]:
+        start_utc, end_utc = as_utc(start_ts), as_utc(end_ts)
+        return [
+            str(path)
+            for day in self.sealed_days(table)
+            if _day_bounds(day)[1] > start_utc and _day_bounds(day)[0] <= end_utc
+            for path in sorted(self.partition_dir(table, day).glob("*.parquet"))
+        ]
+
+    def _filters(
+        self,
+        start_ts: datetime,
+        end_ts: datetime,
+        equals: Dict[str, Any] | None,
+    ) -> List[Tuple[str, str, Any]]:
+        filters: List[Tuple[str, str, Any]] = [
+            ("timestamp", ">=", as_utc(start_ts)),
+            ("timestamp", "<=", as_utc(end_ts)),
+        ]
+        for name, value in (equals or {}).items():
+            if value is not None and value != "All":
+                filters.append((name, "==", value))
+        return filters
+
+    def seal_closed_days(self, repository: Repository, today: date | None = None) -> Dict[str, int]:
+        sealed: Dict[str, int] = {}
+        current = today or datetime.now(timezone.utc).date()
+        for table in ARCHIVE_TABLES:
+            with repository.session_scope() as session:
+                first = session.execute(select(func.min(table.model.timestamp))).scalar()
+                rolled = load_watermarks(session, table.rollup).get(ROLLUP_TIERS[0])
+            if first is None or rolled is None:
+                continue
+            last_open = min(current, as_utc(rolled).date())
+            day = as_utc(first).date()
+            rows = 0
+            while day < last_open:
+                rows += self.seal_day(repository, table, day)
+                day += timedelta(days=1)
+            sealed[table.name] = rows
+        return sealed
+
+    def seal_day(self, repository: Repository, table: ArchiveTable, day: date) -> int:
+        start, end = _day_bounds(day)
+        model = table.model
+        columns = [getattr(model, name) for name in table.columns]
+        partition = self.partition_dir(table, day)
+        existing_ids: set[int] = set()
+        for path in partition.glob("*.parquet"):
+            ids = pq.read_table(path, columns=["id"], memory_map=True)["id"]
+            existing_ids.update(ids.to_pylist())
+
+        schema = arrow_schema(table)
+        tmp_path = partition / "part-pending.parquet.tmp"
+        writer: pq.ParquetWriter | None = None
+        rows = 0
+        max_id = 0
+        first_id = last_id = None
+        try:
+            with repository.session_scope() as session:
+                result = session.execute(
+                    select(*columns)
+                    .where(model.timestamp >= start, model.timestamp < end)
+                    .order_by(*[getattr(model, name) for name in table.sort_keys])
+                    .execution_options(yield_per=ROW_GROUP_ROWS)
+                )
+                for chunk in result.partitions():
+                    rows += len(chunk)
+                    max_id = max(max_id, max(row[0] for row in chunk))
+                    fresh = [row for row in chunk if row[0] not in existing_ids]
+                    if not fresh:
+                        continue
+                    if writer is None:
+                        partition.mkdir(parents=True, exist_ok=True)
+                        writer = pq.ParquetWriter(tmp_path, schema, compression="zstd")
+                        first_id = fresh[0][0]
+                    last_id = max(last_id or 0, max(row[0] for row in fresh))
+                    writer.write_table(
+                        _arrow_chunk(table, schema, fresh), row_group_size=ROW_GROUP_ROWS
+                    )
+        finally:
+            if writer is not None:
+                writer.close()
+        if not rows:
+            return 0
+        if writer is not None:
+            os.replace(tmp_path, partition / f"part-{first_id}-{last_id}.parquet")
+
+        while True:
+            with repository.session_scope() as session:
+                batch = (
+                    select(model.id)
+                    .where(model.timestamp >= start, model.timestamp < end, model.id <= max_id)
+                    .limit(self.delete_batch_size)
+                    .scalar_subquery()
+                )
+                result = session.execute(delete(model).where(model.id.in_(batch)))
+            if (result.rowcount or 0) < self.delete_batch_size:
+                break
+        logger.info("Archived %d %s rows for %s", rows, table.name, day)
+        return rows
+
+    def prune(self, before: datetime) -> int:
+        cutoff = as_utc(before).date()
+        removed = 0
+        for table in ARCHIVE_TABLES:
+            for day in self.sealed_days(table):
+                if day < cutoff:
+                    shutil.rmtree(self.partition_dir(table, day), ignore_errors=True)
+                    removed += 1
+        return removed
@@ -1,21 +1,134 @@
 from __future__ import annotations
 
 from pathlib import Path
-from sqlalchemy import create_engine
+from threading import Lock
+from typing import Any, Dict, Tuple
+
+from sqlalchemy import create_engine, event, inspect
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
+SQLITE_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+    "busy_timeout": 5000,
+}
+READ_ONLY_SKIPPED_PRAGMAS = ("journal_mode", "synchronous")
+OBSOLETE_INDEXES = (
+    "ix_snapshots_exchange",
+    "ix_snapshots_symbol_std",
+    "ix_arbitrage_events_symbol_std",
+    "ix_arbitrage_metrics_symbol_std",
+    "ux_metric_rollups_bucket",
+)
+
+_ENGINES: Dict[Tuple[str, bool], Engine] = {}
+_SESSION_FACTORIES: Dict[Tuple[str, bool], sessionmaker] = {}
+_REGISTRY_LOCK = Lock()
+
 
 class Base(DeclarativeBase):
     pass
 
 
-def get_engine(db_path: str) -> Engine:
-    path = Path(db_path)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    return create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+def get_engine(db_path: str, read_only: bool = False) -> Engine:
+    path = Path(db_path).resolve()
+    key = (str(path), read_only)
+    with _REGISTRY_LOCK:
+        engine = _ENGINES.get(key)
+        if engine is None:
+            engine = _create_engine(path, read_only)
+            _ENGINES[key] = engine
+        return engine
+
+
+def get_session_factory(db_path: str, read_only: bool = False) -> sessionmaker:
+    path = Path(db_path).resolve()
+    key = (str(path), read_only)
+    engine = get_engine(db_path, read_only)
+    with _REGISTRY_LOCK:
+        factory = _SESSION_FACTORIES.get(key)
+        if factory is None:
+            factory = sessionmaker(bind=engine, expire_on_commit=False)
+            _SESSION_FACTORIES[key] = factory
+        return factory
 
 
-def get_session_factory(db_path: str) -> sessionmaker:
+def init_db(db_path: str) -> Engine:
+    from app.storage import models  # noqa: F401
+
     engine = get_engine(db_path)
-    return sessionmaker(bind=engine)
+    with engine.connect() as connection:
+        fresh = not inspect(connection).get_table_names()
+    if fresh:
+        enable_incremental_vacuum(db_path)
+    Base.metadata.create_all(engine)
+    migrate_columns(engine)
+    migrate_indexes(engine)
+    return engine
+
+
+def migrate_columns(engine: Engine) -> None:
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=connection.dialect)
+                connection.exec_driver_sql(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+                )
+
+
+def migrate_indexes(engine: Engine) -> None:
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=connection, checkfirst=True)
+        for name in OBSOLETE_INDEXES:
+            connection.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+        connection.exec_driver_sql("PRAGMA optimize")
+
+
+def enable_incremental_vacuum(db_path: str) -> None:
+    engine = get_engine(db_path)
+    with engine.connect() as connection:
+        connection.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+        connection.exec_driver_sql("VACUUM")
+
+
+def dispose_engines() -> None:
+    with _REGISTRY_LOCK:
+        for engine in _ENGINES.values():
+            engine.dispose()
+        _ENGINES.clear()
+        _SESSION_FACTORIES.clear()
+
+
+def _create_engine(path: Path, read_only: bool) -> Engine:
+    if read_only:
+        url = f"sqlite:///file:{path.as_posix()}?mode=ro&uri=true"
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        url = f"sqlite:///{path}"
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    pragmas = {
+        name: value
+        for name, value in SQLITE_PRAGMAS.items()
+        if not (read_only and name in READ_ONLY_SKIPPED_PRAGMAS)
+    }
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record) -> None:  # noqa: ANN001
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return engine
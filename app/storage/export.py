@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import csv
+import gzip
+import logging
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, TextIO, Tuple
+
+from app.storage.repository import EVENT_COLUMNS, SNAPSHOT_COLUMNS, Repository
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPORT_DIR = Path("app/exports")
+EXPORT_FORMATS = ("csv", "csv.gz", "pdf")
+EXPORT_BATCH_SIZE = 5000
+MAX_JOBS = 20
+PDF_FONT_SIZE = 8
+PDF_LINE_HEIGHT = 11
+PDF_MARGIN = 40
+
+Row = Tuple[Any, ...]
+Pages = Iterable[List[Row]]
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+@dataclass
+class ExportJob:
+    job_id: str
+    kind: str
+    fmt: str
+    path: Path
+    total: int
+    rows: int = 0
+    status: str = "running"
+    error: str | None = None
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: datetime | None = None
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def progress(self) -> float:
+        if self.status == "done":
+            return 1.0
+        if not self.total:
+            return 0.0
+        return min(1.0, self.rows / self.total)
+
+    @property
+    def running(self) -> bool:
+        return self.status == "running"
+
+
+class ExportService:
+    def __init__(
+        self,
+        repository: Repository,
+        export_dir: Path = DEFAULT_EXPORT_DIR,
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> None:
+        self.repository = repository
+        self.export_dir = Path(export_dir)
+        self.batch_size = batch_size
+        self._jobs: Dict[str, ExportJob] = {}
+        self._lock = threading.Lock()
+
+    def export_events(
+        self,
+        fmt: str,
+        start_ts: datetime,
+        end_ts: datetime,
+        symbol_std: str | None = None,
+        direction: str | None = None,
+        min_net_pct: float | None = None,
+    ) -> ExportJob:
+        filters = (start_ts, end_ts, symbol_std, direction, min_net_pct)
+        return self._submit(
+            kind="arbitrage_events",
+            fmt=fmt,
+            header=EVENT_COLUMNS,
+            total=self.repository.count_events(*filters),
+            pages=lambda: self.repository.iter_events(*filters, batch_size=self.batch_size),
+            title="Arbitrage Events Report",
+            line=_event_line,
+        )
+
+    def export_snapshots(
+        self,
+        fmt: str,
+        start_ts: datetime,
+        end_ts: datetime,
+        symbol_std: str | None = None,
+        exchange: str | None = None,
+    ) -> ExportJob:
+        filters = (start_ts, end_ts, symbol_std, exchange)
+        return self._submit(
+            kind="snapshots",
+            fmt=fmt,
+            header=SNAPSHOT_COLUMNS,
+            total=self.repository.count_snapshots(*filters),
+            pages=lambda: self.repository.iter_snapshots(*filters, batch_size=self.batch_size),
+            title="Snapshots Report",
+            line=_snapshot_line,
+        )
+
+    def jobs(self, kind: str | None = None) -> List[ExportJob]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job for job in jobs if kind is None or job.kind == kind]
+
+    def get(self, job_id: str) -> ExportJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> None:
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel_event.set()
+
+    def _submit(
+        self,
+        kind: str,
+        fmt: str,
+        header: Sequence[str],
+        total: int,
+        pages: Callable[[], Pages],
+        title: str,
+        line: Callable[[Row], str],
+    ) -> ExportJob:
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+        job_id = uuid.uuid4().hex[:8]
+        job = ExportJob(
+            job_id=job_id,
+            kind=kind,
+            fmt=fmt,
+            path=self.export_dir / f"{kind}_{stamp}_{job_id}.{fmt}",
+            total=total,
+        )
+        with self._lock:
+            self._jobs[job_id] = job
+            finished = [j for j in self._jobs.values() if not j.running]
+            for stale in finished[: max(0, len(self._jobs) - MAX_JOBS)]:
+                del self._jobs[stale.job_id]
+        if fmt == "pdf":
+            write = partial(self._write_pdf, title=title, line=line)
+        else:
+            write = partial(self._write_csv, header=header)
+        thread = threading.Thread(
+            target=self._run, args=(job, pages, write), name=f"export-{job_id}", daemon=True
+        )
+        thread.start()
+        return job
+
+    def _run(
+        self,
+        job: ExportJob,
+        pages: Callable[[], Pages],
+        write: Callable[[ExportJob, Pages], None],
+    ) -> None:
+        try:
+            write(job, _tracked(job, pages()))
+        except ExportCancelled:
+            job.status = "cancelled"
+            job.path.unlink(missing_ok=True)
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Export %s failed", job.job_id)
+            job.status = "failed"
+            job.error = str(exc)
+            job.path.unlink(missing_ok=True)
+        else:
+            job.status = "done"
+            logger.info("Export %s wrote %d rows to %s", job.job_id, job.rows, job.path)
+        job.finished_at = datetime.now(timezone.utc)
+
+    def _write_csv(self, job: ExportJob, pages: Pages, header: Sequence[str]) -> None:
+        handle: TextIO
+        if job.fmt == "csv.gz":
+            handle = gzip.open(job.path, "wt", encoding="utf-8", newline="")
+        else:
+            handle = open(job.path, "w", encoding="utf-8", newline="")
+        with handle:
+            writer = csv.writer(handle)
+            writer.writerow(header)
+            for page in pages:
+                writer.writerows([_format(value) for value in row] for row in page)
+
+    def _write_pdf(
+        self,
+        job: ExportJob,
+        pages: Pages,
+        title: str,
+        line: Callable[[Row], str],
+    ) -> None:
+        from reportlab.lib.pagesizes import letter
+        from reportlab.pdfgen import canvas
+
+        width, height = letter
+        lines_per_page = int((height - 3 * PDF_MARGIN) // PDF_LINE_HEIGHT)
+        pdf = canvas.Canvas(str(job.path), pagesize=letter, pageCompression=1)
+        page_no = 1
+        text = _start_page(pdf, height, f"{title} ({job.total} rows)")
+        used = 1
+        for page in pages:
+            for row in page:
+                if used >= lines_per_page:
+                    pdf.drawText(text)
+                    pdf.drawRightString(width - PDF_MARGIN, PDF_MARGIN / 2, str(page_no))
+                    pdf.showPage()
+                    page_no += 1
+                    text = _start_page(pdf, height, title)
+                    used = 1
+                text.textLine(line(row))
+                used += 1
+        pdf.drawText(text)
+        pdf.drawRightString(width - PDF_MARGIN, PDF_MARGIN / 2, str(page_no))
+        pdf.save()
+
+
+def _tracked(job: ExportJob, pages: Pages) -> Iterator[List[Row]]:
+    for page in pages:
+        if job.cancel_event.is_set():
+            raise ExportCancelled(job.job_id)
+        yield page
+        job.rows += len(page)
+
+
+def _start_page(pdf: Any, height: float, title: str) -> Any:
+    pdf.setFont("Helvetica", PDF_FONT_SIZE)
+    text = pdf.beginText(PDF_MARGIN, height - PDF_MARGIN)
+    text.setFont("Helvetica", PDF_FONT_SIZE)
+    text.setLeading(PDF_LINE_HEIGHT)
+    text.textLine(title)
+    return text
+
+
+def _format(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return value
+
+
+def _event_line(row: Row) -> str:
+    _, symbol, direction, start_ts, end_ts, status, max_net, avg_net, duration = row[:9]
+    max_exec_qty, max_vwap_net = row[9:11]
+    end = end_ts.isoformat(sep=" ", timespec="seconds") if end_ts else "-"
+    line = (
+        f"{start_ts.isoformat(sep=' ', timespec='seconds')} | {end} | {symbol} | {direction} | "
+        f"{status} | max {max_net:.2f}% | avg {avg_net:.2f}% | {duration}s"
+    )
+    if max_exec_qty is not None and max_vwap_net is not None:
+        line += f" | qty {max_exec_qty:.8g} | vwap {max_vwap_net:.2f}%"
+    return line
+
+
+def _snapshot_line(row: Row) -> str:
+    timestamp, exchange, symbol, bid, ask, _, _, _, spread_pct = row
+    return (
+        f"{timestamp.isoformat(sep=' ', timespec='seconds')} | {exchange} | {symbol} | "
+        f"bid {bid:.8g} | ask {ask:.8g} | spread {spread_pct:.4f}%"
+    )
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+
+import pandas as pd
+
+from app.storage.archive import METRIC_ARCHIVE
+from app.storage.repository import METRIC_COLUMNS, Repository
+from app.storage.rollup import as_utc
+
+CACHE_COLUMNS = ("id", *METRIC_COLUMNS)
+
+
+@dataclass
+class MetricsCacheStats:
+    full_loads: int = 0
+    backfills: int = 0
+    refreshes: int = 0
+    skipped: int = 0
+    rows_fetched: int = 0
+
+
+@dataclass
+class _SymbolWindow:
+    frame: pd.DataFrame | None = None
+    covered_from: datetime | None = None
+    last_id: int = 0
+    last_ts: datetime | None = None
+    refreshed_at: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class MetricsCache:
+    def __init__(
+        self,
+        repository: Repository,
+        max_window_s: float = 3600,
+        min_refresh_s: float = 0.5,
+        evict_slack_s: float = 60.0,
+    ) -> None:
+        self.repository = repository
+        self.max_window_s = max_window_s
+        self.min_refresh_s = min_refresh_s
+        self.evict_slack_s = evict_slack_s
+        self._windows: Dict[str, _SymbolWindow] = {}
+        self._lock = threading.Lock()
+        self._stats = MetricsCacheStats()
+
+    def window(self, symbol_std: str, start_ts: datetime, end_ts: datetime) -> pd.DataFrame:
+        start, end = as_utc(start_ts), as_utc(end_ts)
+        entry = self._entry(symbol_std)
+        with entry.lock:
+            if entry.frame is None or self._sealed_since(entry):
+                self._load(entry, symbol_std, start, end)
+            else:
+                if start < entry.covered_from:
+                    self._backfill(entry, symbol_std, start)
+                self._refresh(entry, symbol_std)
+            self._evict(entry, min(start, end - timedelta(seconds=self.max_window_s)))
+            frame = entry.frame
+        timestamps = frame["timestamp"]
+        mask = (timestamps >= pd.Timestamp(start)) & (timestamps <= pd.Timestamp(end))
+        return frame.loc[mask, list(METRIC_COLUMNS)].reset_index(drop=True)
+
+    def stats(self) -> MetricsCacheStats:
+        with self._lock:
+            return MetricsCacheStats(**vars(self._stats))
+
+    def _entry(self, symbol_std: str) -> _SymbolWindow:
+        with self._lock:
+            entry = self._windows.get(symbol_std)
+            if entry is None:
+                entry = self._windows[symbol_std] = _SymbolWindow()
+            return entry
+
+    def _count(self, rows: int, **deltas: int) -> None:
+        with self._lock:
+            self._stats.rows_fetched += rows
+            for name, delta in deltas.items():
+                setattr(self._stats, name, getattr(self._stats, name) + delta)
+
+    def _sealed_since(self, entry: _SymbolWindow) -> bool:
+        if entry.last_ts is None:
+            return False
+        since = entry.last_ts
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        if since >= today:
+            return False
+        sealed_until = self.repository.archive.sealed_until(METRIC_ARCHIVE)
+        return sealed_until is not None and since < sealed_until
+
+    def _load(self, entry: _SymbolWindow, symbol_std: str, start: datetime, end: datetime) -> None:
+        frame = self.repository.metrics_frame(symbol_std, start, end, columns=CACHE_COLUMNS)
+        entry.frame = frame
+        entry.covered_from = start
+        entry.last_id = 0
+        entry.last_ts = None
+        self._advance(entry, frame)
+        entry.refreshed_at = time.monotonic()
+        self._count(len(frame), full_loads=1)
+
+    def _backfill(self, entry: _SymbolWindow, symbol_std: str, start: datetime) -> None:
+        older = self.repository.metrics_frame(
+            symbol_std,
+            start,
+            entry.covered_from - timedelta(microseconds=1),
+            columns=CACHE_COLUMNS,
+        )
+        if not older.empty:
+            entry.frame = pd.concat([older, entry.frame], ignore_index=True)
+        entry.covered_from = start
+        self._count(len(older), backfills=1)
+
+    def _refresh(self, entry: _SymbolWindow, symbol_std: str) -> None:
+        now = time.monotonic()
+        if now - entry.refreshed_at < self.min_refresh_s:
+            self._count(0, skipped=1)
+            return
+        since = entry.covered_from if entry.last_id == 0 else None
+        newer = self.repository.metrics_since(symbol_std, since, entry.last_id, CACHE_COLUMNS)
+        if not newer.empty:
+            entry.frame = pd.concat([entry.frame, newer], ignore_index=True)
+            self._advance(entry, newer)
+        entry.refreshed_at = now
+        self._count(len(newer), refreshes=1)
+
+    def _advance(self, entry: _SymbolWindow, rows: pd.DataFrame) -> None:
+        if rows.empty:
+            return
+        entry.last_id = max(entry.last_id, int(rows["id"].max()))
+        newest = rows["timestamp"].max().to_pydatetime()
+        if entry.last_ts is None or newest > entry.last_ts:
+            entry.last_ts = newest
+
+    def _evict(self, entry: _SymbolWindow, cutoff: datetime) -> None:
+        if entry.covered_from >= cutoff - timedelta(seconds=self.evict_slack_s):
+            return
+        frame = entry.frame
+        entry.frame = frame[frame["timestamp"] >= pd.Timestamp(cutoff)].reset_index(drop=True)
+        entry.covered_from = cutoff
@@ -1,19 +1,30 @@
 from __future__ import annotations
 
 from datetime import datetime
-from sqlalchemy import Float, Integer, String, DateTime
+from typing import Tuple
+
+from sqlalchemy import DateTime, Float, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.storage.db import Base
 
+SnapshotRow = Tuple[
+    datetime, str, str, float, float, float | None, float | None, float, float
+]
+MetricRow = Tuple[datetime, str, str, float, float, float | None, float | None]
+
 
 class Snapshot(Base):
     __tablename__ = "snapshots"
+    __table_args__ = (
+        Index("ix_snapshots_symbol_ts", "symbol_std", "timestamp"),
+        Index("ix_snapshots_exchange_symbol_ts", "exchange", "symbol_std", "timestamp"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
-    exchange: Mapped[str] = mapped_column(String(20), index=True)
-    symbol_std: Mapped[str] = mapped_column(String(20), index=True)
+    exchange: Mapped[str] = mapped_column(String(20))
+    symbol_std: Mapped[str] = mapped_column(String(20))
     bid: Mapped[float] = mapped_column(Float)
     ask: Mapped[float] = mapped_column(Float)
     last: Mapped[float | None] = mapped_column(Float, nullable=True)
@@ -24,24 +35,110 @@ class Snapshot(Base):
 
 class ArbitrageEvent(Base):
     __tablename__ = "arbitrage_events"
+    __table_args__ = (
+        Index("ix_arbitrage_events_symbol_direction_start", "symbol_std", "direction", "start_ts"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    symbol_std: Mapped[str] = mapped_column(String(20), index=True)
-    direction: Mapped[str] = mapped_column(String(40), index=True)
+    symbol_std: Mapped[str] = mapped_column(String(64))
+    direction: Mapped[str] = mapped_column(String(64), index=True)
     start_ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
     end_ts: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     status: Mapped[str] = mapped_column(String(10), default="open", index=True)
     max_net_pct: Mapped[float] = mapped_column(Float)
     avg_net_pct: Mapped[float] = mapped_column(Float)
     duration_s: Mapped[int] = mapped_column(Integer, default=0)
+    max_exec_qty: Mapped[float | None] = mapped_column(Float, nullable=True)
+    max_vwap_net_pct: Mapped[float | None] = mapped_column(Float, nullable=True)
 
 
 class ArbitrageMetric(Base):
     __tablename__ = "arbitrage_metrics"
+    __table_args__ = (
+        Index(
+            "ix_arbitrage_metrics_symbol_ts_cover",
+            "symbol_std",
+            "timestamp",
+            "direction",
+            "raw_spread",
+            "net_pct",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
-    symbol_std: Mapped[str] = mapped_column(String(20), index=True)
+    symbol_std: Mapped[str] = mapped_column(String(20))
     direction: Mapped[str] = mapped_column(String(40), index=True)
     raw_spread: Mapped[float] = mapped_column(Float)
     net_pct: Mapped[float] = mapped_column(Float)
+    exec_qty: Mapped[float | None] = mapped_column(Float, nullable=True)
+    vwap_net_pct: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+
+class SnapshotRollup(Base):
+    __tablename__ = "snapshot_rollups"
+    __table_args__ = (
+        Index(
+            "ux_snapshot_rollups_bucket",
+            "bucket_s",
+            "symbol_std",
+            "exchange",
+            "bucket_ts",
+            unique=True,
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    bucket_s: Mapped[int] = mapped_column(Integer)
+    bucket_ts: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    exchange: Mapped[str] = mapped_column(String(20))
+    symbol_std: Mapped[str] = mapped_column(String(20))
+    samples: Mapped[int] = mapped_column(Integer)
+    bid_min: Mapped[float] = mapped_column(Float)
+    bid_max: Mapped[float] = mapped_column(Float)
+    bid_avg: Mapped[float] = mapped_column(Float)
+    bid_last: Mapped[float] = mapped_column(Float)
+    ask_min: Mapped[float] = mapped_column(Float)
+    ask_max: Mapped[float] = mapped_column(Float)
+    ask_avg: Mapped[float] = mapped_column(Float)
+    ask_last: Mapped[float] = mapped_column(Float)
+    spread_pct_min: Mapped[float] = mapped_column(Float)
+    spread_pct_max: Mapped[float] = mapped_column(Float)
+    spread_pct_avg: Mapped[float] = mapped_column(Float)
+    spread_pct_last: Mapped[float] = mapped_column(Float)
+
+
+class MetricRollup(Base):
+    __tablename__ = "metric_rollups"
+    __table_args__ = (
+        Index(
+            "ux_metric_rollups_symbol_bucket",
+            "bucket_s",
+            "symbol_std",
+            "bucket_ts",
+            "direction",
+            unique=True,
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    bucket_s: Mapped[int] = mapped_column(Integer)
+    bucket_ts: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    symbol_std: Mapped[str] = mapped_column(String(20))
+    direction: Mapped[str] = mapped_column(String(40))
+    samples: Mapped[int] = mapped_column(Integer)
+    raw_spread_min: Mapped[float] = mapped_column(Float)
+    raw_spread_max: Mapped[float] = mapped_column(Float)
+    raw_spread_avg: Mapped[float] = mapped_column(Float)
+    raw_spread_last: Mapped[float] = mapped_column(Float)
+    net_pct_min: Mapped[float] = mapped_column(Float)
+    net_pct_max: Mapped[float] = mapped_column(Float)
+    net_pct_avg: Mapped[float] = mapped_column(Float)
+    net_pct_last: Mapped[float] = mapped_column(Float)
+
+
+class RollupWatermark(Base):
+    __tablename__ = "rollup_watermarks"
+
+    name: Mapped[str] = mapped_column(String(40), primary_key=True)
+    watermark_ts: Mapped[datetime] = mapped_column(DateTime(timezone=True))
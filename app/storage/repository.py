@@ -1,18 +1,115 @@
 from __future__ import annotations
 
 from contextlib import contextmanager
-from datetime import datetime
-from typing import Iterable
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
 
-from sqlalchemy import select
+import pandas as pd
+import pyarrow as pa
+from sqlalchemy import (
+    DateTime,
+    Float,
+    Integer,
+    String,
+    Table,
+    func,
+    insert,
+    null,
+    select,
+    tuple_,
+    type_coerce,
+)
+from sqlalchemy.orm import Session
 
-from app.storage.db import get_session_factory
-from app.storage.models import ArbitrageEvent, ArbitrageMetric, Snapshot
+from app.storage.archive import (
+    METRIC_ARCHIVE,
+    SNAPSHOT_ARCHIVE,
+    ArchiveTable,
+    ParquetArchive,
+    archive_root,
+)
+from app.storage.db import get_session_factory, init_db
+from app.storage.models import (
+    ArbitrageEvent,
+    ArbitrageMetric,
+    MetricRollup,
+    MetricRow,
+    Snapshot,
+    SnapshotRollup,
+    SnapshotRow,
+)
+from app.storage.rollup import (
+    METRIC_ROLLUP,
+    RAW_TIER,
+    ROLLUP_TIERS,
+    SNAPSHOT_ROLLUP,
+    RollupSource,
+    as_utc,
+    load_watermarks,
+    pick_tier,
+)
+
+SNAPSHOT_COLUMNS = (
+    "timestamp",
+    "exchange",
+    "symbol_std",
+    "bid",
+    "ask",
+    "last",
+    "volume_24h",
+    "spread_abs",
+    "spread_pct",
+)
+SNAPSHOT_KEYS = ("exchange", "symbol_std")
+SNAPSHOT_KEYFRAME_S = 300
+METRIC_COLUMNS = ("timestamp", "symbol_std", "direction", "raw_spread", "net_pct")
+METRIC_DEPTH_COLUMNS = ("exec_qty", "vwap_net_pct")
+EVENT_COLUMNS = (
+    "id",
+    "symbol_std",
+    "direction",
+    "start_ts",
+    "end_ts",
+    "status",
+    "max_net_pct",
+    "avg_net_pct",
+    "duration_s",
+    "max_exec_qty",
+    "max_vwap_net_pct",
+)
+
+SNAPSHOT_ROLLUP_EXPRESSIONS: Dict[str, Any] = {
+    "timestamp": SnapshotRollup.bucket_ts,
+    "exchange": SnapshotRollup.exchange,
+    "symbol_std": SnapshotRollup.symbol_std,
+    "bid": SnapshotRollup.bid_avg,
+    "ask": SnapshotRollup.ask_avg,
+    "last": SnapshotRollup.bid_last,
+    "volume_24h": null(),
+    "spread_abs": SnapshotRollup.ask_avg - SnapshotRollup.bid_avg,
+    "spread_pct": SnapshotRollup.spread_pct_avg,
+}
+METRIC_ROLLUP_EXPRESSIONS: Dict[str, Any] = {
+    "timestamp": MetricRollup.bucket_ts,
+    "symbol_std": MetricRollup.symbol_std,
+    "direction": MetricRollup.direction,
+    "raw_spread": MetricRollup.raw_spread_avg,
+    "net_pct": MetricRollup.net_pct_avg,
+    "exec_qty": null(),
+    "vwap_net_pct": null(),
+}
+
+BulkRows = Sequence[Sequence[Any]] | Mapping[str, Sequence[Any]]
 
 
 class Repository:
-    def __init__(self, db_path: str) -> None:
-        self._session_factory = get_session_factory(db_path)
+    def __init__(self, db_path: str, read_only: bool = False) -> None:
+        if read_only and not Path(db_path).exists():
+            init_db(db_path)
+        self.read_only = read_only
+        self.archive = ParquetArchive(archive_root(db_path))
+        self._session_factory = get_session_factory(db_path, read_only)
 
     @contextmanager
     def session_scope(self):
@@ -31,6 +128,34 @@ class Repository:
         with self.session_scope() as session:
             session.add_all(list(metrics))
 
+    def bulk_insert_snapshots(self, rows: BulkRows, session: Session | None = None) -> int:
+        return self._bulk_insert(Snapshot.__table__, SNAPSHOT_COLUMNS, rows, session)
+
+    def bulk_insert_metrics(self, rows: BulkRows, session: Session | None = None) -> int:
+        columns = (*METRIC_COLUMNS, *METRIC_DEPTH_COLUMNS)
+        return self._bulk_insert(ArbitrageMetric.__table__, columns, rows, session)
+
+    def _bulk_insert(
+        self,
+        table: Table,
+        columns: Sequence[str],
+        rows: BulkRows,
+        session: Session | None,
+    ) -> int:
+        if isinstance(rows, Mapping):
+            names = list(rows)
+            params = [dict(zip(names, values)) for values in zip(*rows.values())]
+        else:
+            params = [dict(zip(columns, row)) for row in rows]
+        if not params:
+            return 0
+        if session is not None:
+            session.execute(insert(table), params)
+        else:
+            with self.session_scope() as own_session:
+                own_session.execute(insert(table), params)
+        return len(params)
+
     def create_event(
         self,
         symbol_std: str,
@@ -38,6 +163,8 @@ class Repository:
         start_ts: datetime,
         max_net_pct: float,
         avg_net_pct: float,
+        max_exec_qty: float | None = None,
+        max_vwap_net_pct: float | None = None,
     ) -> ArbitrageEvent:
         with self.session_scope() as session:
             event = ArbitrageEvent(
@@ -46,6 +173,8 @@ class Repository:
                 start_ts=start_ts,
                 max_net_pct=max_net_pct,
                 avg_net_pct=avg_net_pct,
+                max_exec_qty=max_exec_qty,
+                max_vwap_net_pct=max_vwap_net_pct,
                 duration_s=0,
                 status="open",
             )
@@ -61,6 +190,8 @@ class Repository:
         max_net_pct: float,
         avg_net_pct: float,
         duration_s: int,
+        max_exec_qty: float | None = None,
+        max_vwap_net_pct: float | None = None,
     ) -> None:
         with self.session_scope() as session:
             event = session.get(ArbitrageEvent, event_id)
@@ -70,6 +201,8 @@ class Repository:
             event.status = "closed"
             event.max_net_pct = max_net_pct
             event.avg_net_pct = avg_net_pct
+            event.max_exec_qty = max_exec_qty
+            event.max_vwap_net_pct = max_vwap_net_pct
             event.duration_s = duration_s
 
     def list_events(
@@ -80,18 +213,233 @@ class Repository:
         direction: str | None = None,
         min_net_pct: float | None = None,
     ) -> list[ArbitrageEvent]:
+        conditions = _event_conditions(start_ts, end_ts, symbol_std, direction, min_net_pct)
+        with self.session_scope() as session:
+            return list(session.scalars(select(ArbitrageEvent).where(*conditions)).all())
+
+    def events_frame(
+        self,
+        start_ts: datetime,
+        end_ts: datetime,
+        symbol_std: str | None = None,
+        direction: str | None = None,
+        min_net_pct: float | None = None,
+        columns: Sequence[str] = EVENT_COLUMNS,
+    ) -> pd.DataFrame:
+        conditions = _event_conditions(start_ts, end_ts, symbol_std, direction, min_net_pct)
+        query = select(*_raw_columns(ArbitrageEvent, columns)).where(*conditions)
         with self.session_scope() as session:
-            query = select(ArbitrageEvent).where(
-                ArbitrageEvent.start_ts >= start_ts,
-                ArbitrageEvent.start_ts <= end_ts,
+            return _frame(_fetch_raw(session, query), ArbitrageEvent, columns)
+
+    def snapshots_frame(
+        self,
+        start_ts: datetime,
+        end_ts: datetime,
+        symbol_std: str | None = None,
+        exchange: str | None = None,
+        max_points: int | None = None,
+        columns: Sequence[str] = SNAPSHOT_COLUMNS,
+        fill_gaps: bool = False,
+    ) -> pd.DataFrame:
+        if fill_gaps:
+            read_columns = tuple(dict.fromkeys(("timestamp", *SNAPSHOT_KEYS, *columns)))
+            frame = self.snapshots_frame(
+                start_ts, end_ts, symbol_std, exchange, max_points, read_columns
+            )
+            carry = self.snapshots_frame(
+                start_ts - timedelta(seconds=SNAPSHOT_KEYFRAME_S),
+                start_ts,
+                symbol_std,
+                exchange,
+                columns=read_columns,
             )
-            if symbol_std and symbol_std != "All":
-                query = query.where(ArbitrageEvent.symbol_std == symbol_std)
-            if direction and direction != "All":
-                query = query.where(ArbitrageEvent.direction == direction)
-            if min_net_pct is not None:
-                query = query.where(ArbitrageEvent.max_net_pct >= min_net_pct)
-            return list(session.scalars(query).all())
+            return _fill_frame_gaps(frame, carry)[list(columns)]
+        frames: List[pd.DataFrame] = []
+        with self.session_scope() as session:
+            for tier, seg_start, seg_end in self._tier_segments(
+                session, SNAPSHOT_ROLLUP, start_ts, end_ts, max_points
+            ):
+                if not tier:
+                    seg_start = self._archive_frame(
+                        frames,
+                        SNAPSHOT_ARCHIVE,
+                        seg_start,
+                        seg_end,
+                        {"symbol_std": symbol_std, "exchange": exchange},
+                        columns,
+                    )
+                    conditions = _snapshot_conditions(seg_start, seg_end, symbol_std, exchange)
+                    query = select(*_raw_columns(Snapshot, columns)).where(*conditions)
+                    frames.append(_frame(_fetch_raw(session, query), Snapshot, columns))
+                    continue
+                query = select(
+                    *_rollup_columns(Snapshot, SNAPSHOT_ROLLUP_EXPRESSIONS, columns)
+                ).where(
+                    SnapshotRollup.bucket_s == tier,
+                    SnapshotRollup.bucket_ts >= seg_start,
+                    SnapshotRollup.bucket_ts < seg_end,
+                )
+                if symbol_std and symbol_std != "All":
+                    query = query.where(SnapshotRollup.symbol_std == symbol_std)
+                if exchange and exchange != "All":
+                    query = query.where(SnapshotRollup.exchange == exchange)
+                frames.append(_frame(_fetch_raw(session, query), Snapshot, columns))
+        return _concat(frames, Snapshot, columns)
+
+    def metrics_frame(
+        self,
+        symbol_std: str,
+        start_ts: datetime,
+        end_ts: datetime,
+        max_points: int | None = None,
+        columns: Sequence[str] = METRIC_COLUMNS,
+    ) -> pd.DataFrame:
+        frames: List[pd.DataFrame] = []
+        with self.session_scope() as session:
+            for tier, seg_start, seg_end in self._tier_segments(
+                session, METRIC_ROLLUP, start_ts, end_ts, max_points
+            ):
+                if not tier:
+                    seg_start = self._archive_frame(
+                        frames,
+                        METRIC_ARCHIVE,
+                        seg_start,
+                        seg_end,
+                        {"symbol_std": symbol_std},
+                        columns,
+                    )
+                    query = select(*_raw_columns(ArbitrageMetric, columns)).where(
+                        ArbitrageMetric.symbol_std == symbol_std,
+                        ArbitrageMetric.timestamp >= seg_start,
+                        ArbitrageMetric.timestamp <= seg_end,
+                    )
+                    frames.append(_frame(_fetch_raw(session, query), ArbitrageMetric, columns))
+                    continue
+                query = select(
+                    *_rollup_columns(ArbitrageMetric, METRIC_ROLLUP_EXPRESSIONS, columns)
+                ).where(
+                    MetricRollup.bucket_s == tier,
+                    MetricRollup.symbol_std == symbol_std,
+                    MetricRollup.bucket_ts >= seg_start,
+                    MetricRollup.bucket_ts < seg_end,
+                )
+                frames.append(_frame(_fetch_raw(session, query), ArbitrageMetric, columns))
+        return _concat(frames, ArbitrageMetric, columns)
+
+    def metrics_since(
+        self,
+        symbol_std: str,
+        since_ts: datetime | None,
+        after_id: int = 0,
+        columns: Sequence[str] = ("id", *METRIC_COLUMNS),
+    ) -> pd.DataFrame:
+        conditions = [ArbitrageMetric.symbol_std == symbol_std, ArbitrageMetric.id > after_id]
+        if since_ts is not None:
+            conditions.append(ArbitrageMetric.timestamp >= since_ts)
+        query = (
+            select(*_raw_columns(ArbitrageMetric, columns))
+            .where(*conditions)
+            .order_by(ArbitrageMetric.id)
+        )
+        with self.session_scope() as session:
+            return _frame(_fetch_raw(session, query), ArbitrageMetric, columns)
+
+    def count_events(
+        self,
+        start_ts: datetime,
+        end_ts: datetime,
+        symbol_std: str | None = None,
+        direction: str | None = None,
+        min_net_pct: float | None = None,
+    ) -> int:
+        conditions = _event_conditions(start_ts, end_ts, symbol_std, direction, min_net_pct)
+        with self.session_scope() as session:
+            return session.execute(
+                select(func.count()).select_from(ArbitrageEvent).where(*conditions)
+            ).scalar_one()
+
+    def iter_events(
+        self,
+        start_ts: datetime,
+        end_ts: datetime,
+        symbol_std: str | None = None,
+        direction: str | None = None,
+        min_net_pct: float | None = None,
+        batch_size: int = 5000,
+    ) -> Iterator[List[Tuple[Any, ...]]]:
+        conditions = _event_conditions(start_ts, end_ts, symbol_std, direction, min_net_pct)
+        columns = [getattr(ArbitrageEvent, name) for name in EVENT_COLUMNS]
+        yield from self._keyset_pages(
+            ArbitrageEvent, ArbitrageEvent.start_ts, columns, conditions, batch_size
+        )
+
+    def count_snapshots(
+        self,
+        start_ts: datetime,
+        end_ts: datetime,
+        symbol_std: str | None = None,
+        exchange: str | None = None,
+    ) -> int:
+        equals = {"symbol_std": symbol_std, "exchange": exchange}
+        open_start = self._open_partition_start(SNAPSHOT_ARCHIVE, start_ts)
+        total = 0
+        if open_start != start_ts:
+            total += self.archive.count(SNAPSHOT_ARCHIVE, start_ts, end_ts, equals=equals)
+        conditions = _snapshot_conditions(open_start, end_ts, symbol_std, exchange)
+        with self.session_scope() as session:
+            total += session.execute(
+                select(func.count()).select_from(Snapshot).where(*conditions)
+            ).scalar_one()
+        return total
+
+    def iter_snapshots(
+        self,
+        start_ts: datetime,
+        end_ts: datetime,
+        symbol_std: str | None = None,
+        exchange: str | None = None,
+        batch_size: int = 5000,
+    ) -> Iterator[List[Tuple[Any, ...]]]:
+        equals = {"symbol_std": symbol_std, "exchange": exchange}
+        open_start = self._open_partition_start(SNAPSHOT_ARCHIVE, start_ts)
+        if open_start != start_ts:
+            for batch in self.archive.iter_batches(
+                SNAPSHOT_ARCHIVE,
+                start_ts,
+                end_ts,
+                columns=SNAPSHOT_COLUMNS,
+                equals=equals,
+                batch_size=batch_size,
+            ):
+                columns = batch.to_pydict()
+                columns["timestamp"] = batch["timestamp"].cast(pa.timestamp("us")).to_pylist()
+                yield list(zip(*(columns[name] for name in SNAPSHOT_COLUMNS)))
+        conditions = _snapshot_conditions(open_start, end_ts, symbol_std, exchange)
+        columns = [getattr(Snapshot, name) for name in SNAPSHOT_COLUMNS]
+        yield from self._keyset_pages(Snapshot, Snapshot.timestamp, columns, conditions, batch_size)
+
+    def _keyset_pages(
+        self,
+        model: Any,
+        order_column: Any,
+        columns: Sequence[Any],
+        conditions: Sequence[Any],
+        batch_size: int,
+    ) -> Iterator[List[Tuple[Any, ...]]]:
+        last: Tuple[Any, Any] | None = None
+        while True:
+            query = select(order_column, model.id, *columns).where(*conditions)
+            if last is not None:
+                query = query.where(tuple_(order_column, model.id) > tuple_(*last))
+            query = query.order_by(order_column, model.id).limit(batch_size)
+            with self.session_scope() as session:
+                rows = session.execute(query).all()
+            if not rows:
+                return
+            last = (rows[-1][0], rows[-1][1])
+            yield [tuple(row[2:]) for row in rows]
+            if len(rows) < batch_size:
+                return
 
     def list_snapshots(
         self,
@@ -99,28 +447,322 @@ class Repository:
         end_ts: datetime,
         symbol_std: str | None = None,
         exchange: str | None = None,
+        max_points: int | None = None,
+        fill_gaps: bool = False,
     ) -> list[Snapshot]:
-        with self.session_scope() as session:
-            query = select(Snapshot).where(
-                Snapshot.timestamp >= start_ts,
-                Snapshot.timestamp <= end_ts,
+        if fill_gaps:
+            snapshots = self.list_snapshots(start_ts, end_ts, symbol_std, exchange, max_points)
+            carry = self.list_snapshots(
+                start_ts - timedelta(seconds=SNAPSHOT_KEYFRAME_S), start_ts, symbol_std, exchange
             )
-            if symbol_std and symbol_std != "All":
-                query = query.where(Snapshot.symbol_std == symbol_std)
-            if exchange and exchange != "All":
-                query = query.where(Snapshot.exchange == exchange)
-            return list(session.scalars(query).all())
+            return _fill_snapshot_gaps(snapshots, carry)
+        with self.session_scope() as session:
+            snapshots: list[Snapshot] = []
+            for tier, seg_start, seg_end in self._tier_segments(
+                session, SNAPSHOT_ROLLUP, start_ts, end_ts, max_points
+            ):
+                if not tier:
+                    seg_start = self._extend_from_archive(
+                        snapshots,
+                        SNAPSHOT_ARCHIVE,
+                        seg_start,
+                        seg_end,
+                        {"symbol_std": symbol_std, "exchange": exchange},
+                    )
+                    conditions = _snapshot_conditions(seg_start, seg_end, symbol_std, exchange)
+                    snapshots.extend(session.scalars(select(Snapshot).where(*conditions)).all())
+                    continue
+                query = select(SnapshotRollup).where(
+                    SnapshotRollup.bucket_s == tier,
+                    SnapshotRollup.bucket_ts >= seg_start,
+                    SnapshotRollup.bucket_ts < seg_end,
+                )
+                if symbol_std and symbol_std != "All":
+                    query = query.where(SnapshotRollup.symbol_std == symbol_std)
+                if exchange and exchange != "All":
+                    query = query.where(SnapshotRollup.exchange == exchange)
+                snapshots.extend(
+                    Snapshot(
+                        timestamp=row.bucket_ts,
+                        exchange=row.exchange,
+                        symbol_std=row.symbol_std,
+                        bid=row.bid_avg,
+                        ask=row.ask_avg,
+                        last=row.bid_last,
+                        volume_24h=None,
+                        spread_abs=row.ask_avg - row.bid_avg,
+                        spread_pct=row.spread_pct_avg,
+                    )
+                    for row in session.scalars(query)
+                )
+            return snapshots
 
     def list_metrics(
         self,
         symbol_std: str,
         start_ts: datetime,
         end_ts: datetime,
+        max_points: int | None = None,
     ) -> list[ArbitrageMetric]:
         with self.session_scope() as session:
-            query = select(ArbitrageMetric).where(
-                ArbitrageMetric.symbol_std == symbol_std,
-                ArbitrageMetric.timestamp >= start_ts,
-                ArbitrageMetric.timestamp <= end_ts,
-            )
-            return list(session.scalars(query).all())
+            metrics: list[ArbitrageMetric] = []
+            for tier, seg_start, seg_end in self._tier_segments(
+                session, METRIC_ROLLUP, start_ts, end_ts, max_points
+            ):
+                if not tier:
+                    seg_start = self._extend_from_archive(
+                        metrics,
+                        METRIC_ARCHIVE,
+                        seg_start,
+                        seg_end,
+                        {"symbol_std": symbol_std},
+                    )
+                    query = select(ArbitrageMetric).where(
+                        ArbitrageMetric.symbol_std == symbol_std,
+                        ArbitrageMetric.timestamp >= seg_start,
+                        ArbitrageMetric.timestamp <= seg_end,
+                    )
+                    metrics.extend(session.scalars(query).all())
+                    continue
+                query = select(MetricRollup).where(
+                    MetricRollup.bucket_s == tier,
+                    MetricRollup.symbol_std == symbol_std,
+                    MetricRollup.bucket_ts >= seg_start,
+                    MetricRollup.bucket_ts < seg_end,
+                )
+                metrics.extend(
+                    ArbitrageMetric(
+                        timestamp=row.bucket_ts,
+                        symbol_std=row.symbol_std,
+                        direction=row.direction,
+                        raw_spread=row.raw_spread_avg,
+                        net_pct=row.net_pct_avg,
+                    )
+                    for row in session.scalars(query)
+                )
+            return metrics
+
+    def _open_partition_start(self, table: ArchiveTable, start_ts: datetime) -> datetime:
+        sealed_until = self.archive.sealed_until(table)
+        if sealed_until is None or as_utc(start_ts) >= sealed_until:
+            return start_ts
+        return sealed_until
+
+    def _archive_frame(
+        self,
+        frames: List[pd.DataFrame],
+        table: ArchiveTable,
+        start_ts: datetime,
+        end_ts: datetime,
+        equals: Dict[str, Any],
+        columns: Sequence[str],
+    ) -> datetime:
+        sealed_until = self._open_partition_start(table, start_ts)
+        if sealed_until == start_ts:
+            return start_ts
+        read_columns = columns if "id" in columns else ("id", *columns)
+        archived = self.archive.read(table, start_ts, end_ts, columns=read_columns, equals=equals)
+        if archived is not None:
+            archived = archived.sort_by("id")
+            if "id" not in columns:
+                archived = archived.drop_columns("id")
+            frames.append(archived.to_pandas())
+        return sealed_until
+
+    def _extend_from_archive(
+        self,
+        target: List[Any],
+        table: ArchiveTable,
+        start_ts: datetime,
+        end_ts: datetime,
+        equals: Dict[str, Any],
+    ) -> datetime:
+        sealed_until = self._open_partition_start(table, start_ts)
+        if sealed_until == start_ts:
+            return start_ts
+        archived = self.archive.read(table, start_ts, end_ts, equals=equals)
+        if archived is None:
+            return sealed_until
+        archived = archived.sort_by("id")
+        naive = archived["timestamp"].cast(pa.timestamp("us"))
+        columns = archived.set_column(
+            archived.schema.get_field_index("timestamp"), "timestamp", naive
+        ).to_pydict()
+        names = list(columns)
+        target.extend(
+            table.model(**dict(zip(names, values))) for values in zip(*columns.values())
+        )
+        return sealed_until
+
+    def _tier_segments(
+        self,
+        session: Session,
+        source: RollupSource,
+        start_ts: datetime,
+        end_ts: datetime,
+        max_points: int | None,
+    ) -> list[tuple[int, datetime, datetime]]:
+        tier = pick_tier(start_ts, end_ts, max_points)
+        watermarks = load_watermarks(session, source)
+        raw_floor = watermarks.get(RAW_TIER)
+        if not tier and (raw_floor is None or as_utc(start_ts) >= raw_floor):
+            return [(0, start_ts, end_ts)]
+        segments: list[tuple[int, datetime, datetime]] = []
+        cursor = as_utc(start_ts)
+        for candidate in sorted((t for t in ROLLUP_TIERS if t <= tier), reverse=True):
+            watermark = watermarks.get(candidate)
+            if watermark is None:
+                continue
+            seg_end = min(as_utc(end_ts), watermark)
+            if cursor < seg_end:
+                segments.append((candidate, cursor, seg_end))
+                cursor = seg_end
+        if raw_floor is not None and cursor < raw_floor:
+            # Raw rows before the retention cutoff are gone; read the finest rollup instead.
+            for candidate in ROLLUP_TIERS:
+                watermark = watermarks.get(candidate)
+                seg_end = min(as_utc(end_ts), raw_floor, watermark or cursor)
+                if cursor < seg_end:
+                    segments.append((candidate, cursor, seg_end))
+                    cursor = seg_end
+                    break
+        segments.append((0, cursor, end_ts))
+        return segments
+
+
+def _event_conditions(
+    start_ts: datetime,
+    end_ts: datetime,
+    symbol_std: str | None,
+    direction: str | None,
+    min_net_pct: float | None,
+) -> List[Any]:
+    conditions = [ArbitrageEvent.start_ts >= start_ts, ArbitrageEvent.start_ts <= end_ts]
+    if symbol_std and symbol_std != "All":
+        conditions.append(ArbitrageEvent.symbol_std == symbol_std)
+    if direction and direction != "All":
+        conditions.append(ArbitrageEvent.direction == direction)
+    if min_net_pct is not None:
+        conditions.append(ArbitrageEvent.max_net_pct >= min_net_pct)
+    return conditions
+
+
+def _snapshot_conditions(
+    start_ts: datetime,
+    end_ts: datetime,
+    symbol_std: str | None,
+    exchange: str | None,
+) -> List[Any]:
+    conditions = [Snapshot.timestamp >= start_ts, Snapshot.timestamp <= end_ts]
+    if symbol_std and symbol_std != "All":
+        conditions.append(Snapshot.symbol_std == symbol_std)
+    if exchange and exchange != "All":
+        conditions.append(Snapshot.exchange == exchange)
+    return conditions
+
+
+def _fill_snapshot_gaps(snapshots: List[Snapshot], carry: List[Snapshot]) -> List[Snapshot]:
+    latest: Dict[Tuple[str, str], Snapshot] = {}
+    for snapshot in sorted(carry, key=lambda row: row.timestamp):
+        latest[(snapshot.exchange, snapshot.symbol_std)] = snapshot
+    by_timestamp: Dict[datetime, List[Snapshot]] = {}
+    for snapshot in snapshots:
+        by_timestamp.setdefault(snapshot.timestamp, []).append(snapshot)
+    filled: List[Snapshot] = []
+    for timestamp in sorted(by_timestamp):
+        for snapshot in by_timestamp[timestamp]:
+            latest[(snapshot.exchange, snapshot.symbol_std)] = snapshot
+        window = _keyframe_window(timestamp)
+        for key, snapshot in list(latest.items()):
+            if snapshot.timestamp == timestamp:
+                filled.append(snapshot)
+                continue
+            if _keyframe_window(snapshot.timestamp) != window:
+                del latest[key]
+                continue
+            values = {name: getattr(snapshot, name) for name in SNAPSHOT_COLUMNS}
+            filled.append(Snapshot(**{**values, "timestamp": timestamp}))
+    return filled
+
+
+def _keyframe_window(timestamp: datetime) -> int:
+    return int(as_utc(timestamp).timestamp()) // SNAPSHOT_KEYFRAME_S
+
+
+def _fill_frame_gaps(frame: pd.DataFrame, carry: pd.DataFrame) -> pd.DataFrame:
+    if frame.empty:
+        return frame
+    keys = list(SNAPSHOT_KEYS)
+    index = ["timestamp", *keys]
+    values = [name for name in frame.columns if name not in index]
+    observed = frame.drop_duplicates(index, keep="last").assign(_observed=True)
+    seeds = carry.sort_values("timestamp").drop_duplicates(keys, keep="last")
+    pairs = pd.concat([seeds[keys], observed[keys]]).drop_duplicates()
+    grid = pairs.merge(observed[["timestamp"]].drop_duplicates(), how="cross")
+    filled = pd.concat(
+        [
+            seeds.assign(_observed=True, _seed=True),
+            grid.merge(observed, on=index, how="left").assign(_seed=False),
+        ],
+        ignore_index=True,
+    )
+    filled["_observed"] = filled["_observed"].eq(True)
+    filled["_source"] = filled["timestamp"].where(filled["_observed"])
+    filled = filled.sort_values([*keys, "timestamp"], kind="stable")
+    groups = filled.groupby(keys, sort=False)
+    filled[[*values, "_source"]] = groups[[*values, "_source"]].ffill()
+    # A keyframe rewrites every live pair, so a value never carries into a later keyframe window.
+    keyframe = f"{SNAPSHOT_KEYFRAME_S}s"
+    live = filled["_source"].dt.floor(keyframe) == filled["timestamp"].dt.floor(keyframe)
+    filled = filled[live & ~filled["_seed"]].sort_values([*index], kind="stable")
+    return filled[list(frame.columns)].reset_index(drop=True)
+
+
+def _raw_columns(model: Any, columns: Sequence[str]) -> List[Any]:
+    return [
+        type_coerce(getattr(model, name), String).label(name)
+        if isinstance(model.__table__.c[name].type, DateTime)
+        else getattr(model, name)
+        for name in columns
+    ]
+
+
+def _rollup_columns(model: Any, expressions: Dict[str, Any], columns: Sequence[str]) -> List[Any]:
+    return [
+        type_coerce(expressions[name], String).label(name)
+        if isinstance(model.__table__.c[name].type, DateTime)
+        else expressions[name].label(name)
+        for name in columns
+    ]
+
+
+def _fetch_raw(session: Session, query: Any) -> List[Tuple[Any, ...]]:
+    # Frame queries select no column with a result processor (timestamps are coerced to
+    # text), so the DBAPI tuples can be used as-is without building Row objects.
+    result = session.connection().execute(query)
+    try:
+        return result.cursor.fetchall()
+    finally:
+        result.close()
+
+
+def _frame(rows: Sequence[Any], model: Any, columns: Sequence[str]) -> pd.DataFrame:
+    frame = pd.DataFrame.from_records(rows, columns=list(columns), coerce_float=True)
+    for name in columns:
+        column = model.__table__.c[name]
+        if isinstance(column.type, DateTime):
+            frame[name] = pd.to_datetime(frame[name], format="ISO8601", utc=True).dt.as_unit("us")
+        elif isinstance(column.type, Float):
+            frame[name] = frame[name].astype("float64")
+        elif isinstance(column.type, Integer):
+            frame[name] = frame[name].astype("Int64" if column.nullable else "int64")
+    return frame
+
+
+def _concat(frames: List[pd.DataFrame], model: Any, columns: Sequence[str]) -> pd.DataFrame:
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return _frame([], model, columns)
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Sequence, Tuple, Type
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.storage.db import Base
+from app.storage.models import (
+    ArbitrageMetric,
+    MetricRollup,
+    RollupWatermark,
+    Snapshot,
+    SnapshotRollup,
+)
+
+if TYPE_CHECKING:
+    from app.storage.repository import Repository
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_TIERS = (60, 900, 3600)
+RAW_TIER = 0
+ROLLUP_STATS = ("min", "max", "avg", "last")
+
+
+@dataclass(frozen=True)
+class RollupSource:
+    name: str
+    raw: Type[Base]
+    rollup: Type[Base]
+    keys: Tuple[str, ...]
+    values: Tuple[str, ...]
+
+
+SNAPSHOT_ROLLUP = RollupSource(
+    name="snapshots",
+    raw=Snapshot,
+    rollup=SnapshotRollup,
+    keys=("exchange", "symbol_std"),
+    values=("bid", "ask", "spread_pct"),
+)
+METRIC_ROLLUP = RollupSource(
+    name="metrics",
+    raw=ArbitrageMetric,
+    rollup=MetricRollup,
+    keys=("symbol_std", "direction"),
+    values=("raw_spread", "net_pct"),
+)
+ROLLUP_SOURCES = (SNAPSHOT_ROLLUP, METRIC_ROLLUP)
+
+
+@dataclass
+class RollupStats:
+    buckets: Dict[str, int] = field(default_factory=dict)
+    deleted: Dict[str, int] = field(default_factory=dict)
+
+
+def watermark_name(source: RollupSource, tier: int) -> str:
+    return f"{source.name}:{tier}"
+
+
+def as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def floor_ts(value: datetime, tier: int) -> datetime:
+    epoch = int(as_utc(value).timestamp())
+    return datetime.fromtimestamp(epoch - epoch % tier, tz=timezone.utc)
+
+
+def pick_tier(start_ts: datetime, end_ts: datetime, max_points: int | None) -> int:
+    if not max_points:
+        return 0
+    span = (as_utc(end_ts) - as_utc(start_ts)).total_seconds()
+    if span <= max_points:
+        return 0
+    for tier in ROLLUP_TIERS:
+        if span / tier <= max_points:
+            return tier
+    return ROLLUP_TIERS[-1]
+
+
+def load_watermarks(session: Session, source: RollupSource) -> Dict[int, datetime]:
+    names = {watermark_name(source, tier): tier for tier in (RAW_TIER, *ROLLUP_TIERS)}
+    rows = session.execute(
+        select(RollupWatermark.name, RollupWatermark.watermark_ts).where(
+            RollupWatermark.name.in_(names)
+        )
+    )
+    return {names[name]: as_utc(ts) for name, ts in rows}
+
+
+class _Bucket:
+    __slots__ = ("samples", "mins", "maxs", "sums", "lasts", "last_ts")
+
+    def __init__(self, width: int) -> None:
+        self.samples = 0
+        self.mins = [float("inf")] * width
+        self.maxs = [float("-inf")] * width
+        self.sums = [0.0] * width
+        self.lasts = [0.0] * width
+        self.last_ts: datetime | None = None
+
+    def add(
+        self,
+        ts: datetime,
+        stats: Sequence[Tuple[float, float, float, float]],
+        samples: int,
+    ) -> None:
+        for i, (low, high, avg, last) in enumerate(stats):
+            if low < self.mins[i]:
+                self.mins[i] = low
+            if high > self.maxs[i]:
+                self.maxs[i] = high
+            self.sums[i] += avg * samples
+        if self.last_ts is None or ts >= self.last_ts:
+            self.last_ts = ts
+            self.lasts = [last for _, _, _, last in stats]
+        self.samples += samples
+
+
+class RollupJob:
+    def __init__(
+        self,
+        repository: Repository,
+        raw_retention_days: float = 0,
+        lag_s: int = 60,
+        delete_batch_size: int = 5000,
+        vacuum_pages: int = 2000,
+    ) -> None:
+        self.repository = repository
+        self.raw_retention_days = raw_retention_days
+        self.lag_s = lag_s
+        self.delete_batch_size = delete_batch_size
+        self.vacuum_pages = vacuum_pages
+
+    def run_once(self, now: datetime | None = None) -> RollupStats:
+        now_ts = as_utc(now or datetime.now(timezone.utc))
+        stats = RollupStats()
+        for source in ROLLUP_SOURCES:
+            source_tier = 0
+            for tier in ROLLUP_TIERS:
+                key = watermark_name(source, tier)
+                stats.buckets[key] = self._roll_tier(source, tier, source_tier, now_ts)
+                source_tier = tier
+            if self.raw_retention_days > 0:
+                stats.deleted[source.name] = self._apply_retention(source, now_ts)
+        if any(stats.deleted.values()):
+            self._incremental_vacuum()
+        return stats
+
+    def _roll_tier(self, source: RollupSource, tier: int, source_tier: int, now: datetime) -> int:
+        with self.repository.session_scope() as session:
+            watermarks = load_watermarks(session, source)
+            watermark = watermarks.get(tier)
+            limit = floor_ts(now - timedelta(seconds=self.lag_s), tier)
+            if source_tier:
+                source_watermark = watermarks.get(source_tier)
+                if source_watermark is None:
+                    return 0
+                limit = min(limit, floor_ts(source_watermark, tier))
+            if watermark is None:
+                first = self._first_ts(session, source, source_tier)
+                if first is None:
+                    return 0
+                watermark = floor_ts(first, tier)
+        chunk = timedelta(seconds=max(tier * 24, 3600))
+        written = 0
+        while watermark < limit:
+            chunk_end = min(limit, watermark + chunk)
+            with self.repository.session_scope() as session:
+                rows = self._source_rows(session, source, source_tier, watermark, chunk_end)
+                buckets = self._aggregate(rows, tier, len(source.keys), len(source.values))
+                if buckets:
+                    session.execute(
+                        insert(source.rollup.__table__),
+                        self._rollup_params(source, tier, buckets),
+                    )
+                session.merge(
+                    RollupWatermark(name=watermark_name(source, tier), watermark_ts=chunk_end)
+                )
+            written += len(buckets)
+            watermark = chunk_end
+        return written
+
+    def _first_ts(
+        self, session: Session, source: RollupSource, source_tier: int
+    ) -> datetime | None:
+        if source_tier:
+            model = source.rollup
+            query = select(func.min(model.bucket_ts)).where(model.bucket_s == source_tier)
+        else:
+            query = select(func.min(source.raw.timestamp))
+        first = session.execute(query).scalar()
+        return as_utc(first) if first is not None else None
+
+    def _source_rows(
+        self,
+        session: Session,
+        source: RollupSource,
+        source_tier: int,
+        start_ts: datetime,
+        end_ts: datetime,
+    ) -> Iterable[Tuple[Any, ...]]:
+        if not source_tier:
+            model = source.raw
+            columns = [getattr(model, name) for name in source.keys + source.values]
+            query = select(model.timestamp, *columns).where(
+                model.timestamp >= start_ts, model.timestamp < end_ts
+            )
+            width = len(source.keys)
+            for ts, *values in session.execute(query):
+                stats = [(v, v, v, v) for v in values[width:]]
+                yield (ts, tuple(values[:width]), stats, 1)
+            return
+        model = source.rollup
+        columns = [getattr(model, name) for name in source.keys]
+        for value in source.values:
+            columns.extend(getattr(model, f"{value}_{stat}") for stat in ROLLUP_STATS)
+        query = select(model.bucket_ts, model.samples, *columns).where(
+            model.bucket_s == source_tier,
+            model.bucket_ts >= start_ts,
+            model.bucket_ts < end_ts,
+        )
+        width = len(source.keys)
+        for ts, samples, *values in session.execute(query):
+            flat = values[width:]
+            stats = [tuple(flat[i : i + 4]) for i in range(0, len(flat), 4)]
+            yield (ts, tuple(values[:width]), stats, samples)
+
+    def _aggregate(
+        self,
+        rows: Iterable[Tuple[Any, ...]],
+        tier: int,
+        key_width: int,
+        value_width: int,
+    ) -> Dict[Tuple[datetime, Tuple[Any, ...]], _Bucket]:
+        buckets: Dict[Tuple[datetime, Tuple[Any, ...]], _Bucket] = {}
+        for ts, keys, stats, samples in rows:
+            bucket_key = (floor_ts(ts, tier), keys)
+            bucket = buckets.get(bucket_key)
+            if bucket is None:
+                bucket = buckets[bucket_key] = _Bucket(value_width)
+            bucket.add(ts, stats, samples)
+        return buckets
+
+    def _rollup_params(
+        self,
+        source: RollupSource,
+        tier: int,
+        buckets: Dict[Tuple[datetime, Tuple[Any, ...]], _Bucket],
+    ) -> List[Dict[str, Any]]:
+        params: List[Dict[str, Any]] = []
+        for (bucket_ts, keys), bucket in buckets.items():
+            row: Dict[str, Any] = {
+                "bucket_s": tier,
+                "bucket_ts": bucket_ts,
+                "samples": bucket.samples,
+            }
+            row.update(zip(source.keys, keys))
+            for i, value in enumerate(source.values):
+                row[f"{value}_min"] = bucket.mins[i]
+                row[f"{value}_max"] = bucket.maxs[i]
+                row[f"{value}_avg"] = bucket.sums[i] / bucket.samples
+                row[f"{value}_last"] = bucket.lasts[i]
+            params.append(row)
+        return params
+
+    def _apply_retention(self, source: RollupSource, now: datetime) -> int:
+        cutoff = now - timedelta(days=self.raw_retention_days)
+        with self.repository.session_scope() as session:
+            rolled = load_watermarks(session, source).get(ROLLUP_TIERS[0])
+        if rolled is None:
+            return 0
+        cutoff = min(cutoff, rolled)
+        model = source.raw
+        deleted = 0
+        while True:
+            with self.repository.session_scope() as session:
+                batch = (
+                    select(model.id)
+                    .where(model.timestamp < cutoff)
+                    .limit(self.delete_batch_size)
+                    .scalar_subquery()
+                )
+                result = session.execute(delete(model).where(model.id.in_(batch)))
+            deleted += result.rowcount or 0
+            if (result.rowcount or 0) < self.delete_batch_size:
+                break
+        with self.repository.session_scope() as session:
+            session.merge(
+                RollupWatermark(name=watermark_name(source, RAW_TIER), watermark_ts=cutoff)
+            )
+        if deleted:
+            logger.info("Retention removed %d %s rows older than %s", deleted, source.name, cutoff)
+        return deleted
+
+    def _incremental_vacuum(self) -> None:
+        with self.repository.session_scope() as session:
+            session.execute(text(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)})"))
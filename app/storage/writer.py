@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Protocol, Sequence, Tuple
+
+from app.core.latency import PipelineLatency
+from app.storage.models import ArbitrageEvent, MetricRow, SnapshotRow
+from app.storage.repository import Repository
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+_DROPPABLE = ("snapshots", "metrics")
+
+
+class EventRef(Protocol):
+    event_id: int | None
+
+
+@dataclass
+class WriterStats:
+    enqueued: int = 0
+    written: int = 0
+    dropped: int = 0
+    failed: int = 0
+    retried: int = 0
+    batches: int = 0
+    queue_depth: int = 0
+    last_batch_rows: int = 0
+    last_flush_ms: float = 0.0
+
+
+class PersistenceWriter:
+    def __init__(
+        self,
+        repository: Repository,
+        max_queue: int = 10_000,
+        flush_size: int = 500,
+        flush_interval_s: float = 0.5,
+        event_retries: int = 5,
+        latency: PipelineLatency | None = None,
+    ) -> None:
+        self.repository = repository
+        self.latency = latency
+        self.max_queue = max(1, max_queue)
+        self.flush_size = max(1, flush_size)
+        self.flush_interval_s = max(0.01, flush_interval_s)
+        self.event_retries = event_retries
+        self._queue: queue.Queue[Any] = queue.Queue()
+        self._pending = 0
+        self._retry: List[Tuple[str, Any, int]] = []
+        self._attempts = 0
+        self._stats = WriterStats()
+        self._stats_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="persistence-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        if not self._thread:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def stats(self) -> WriterStats:
+        with self._stats_lock:
+            stats = WriterStats(**vars(self._stats))
+        stats.queue_depth = self._queue.qsize()
+        return stats
+
+    def add_snapshots(self, snapshots: Sequence[SnapshotRow]) -> None:
+        self._offer(("snapshots", list(snapshots)), droppable=True)
+
+    def add_metrics(self, metrics: Sequence[MetricRow]) -> None:
+        self._offer(("metrics", list(metrics)), droppable=True)
+
+    def create_event(
+        self,
+        ref: EventRef,
+        symbol_std: str,
+        direction: str,
+        start_ts: datetime,
+        max_net_pct: float,
+        avg_net_pct: float,
+        max_exec_qty: float | None = None,
+        max_vwap_net_pct: float | None = None,
+    ) -> None:
+        fields = dict(
+            symbol_std=symbol_std,
+            direction=direction,
+            start_ts=start_ts,
+            max_net_pct=max_net_pct,
+            avg_net_pct=avg_net_pct,
+            max_exec_qty=max_exec_qty,
+            max_vwap_net_pct=max_vwap_net_pct,
+            duration_s=0,
+            status="open",
+        )
+        self._offer(("create_event", (ref, fields)), droppable=False)
+
+    def close_event(
+        self,
+        ref: EventRef,
+        end_ts: datetime,
+        max_net_pct: float,
+        avg_net_pct: float,
+        duration_s: int,
+        max_exec_qty: float | None = None,
+        max_vwap_net_pct: float | None = None,
+    ) -> None:
+        depth = (max_exec_qty, max_vwap_net_pct)
+        self._offer(
+            ("close_event", (ref, end_ts, max_net_pct, avg_net_pct, duration_s, *depth)),
+            droppable=False,
+        )
+
+    def _offer(self, item: Tuple[str, Any], droppable: bool) -> None:
+        record = (*item, time.perf_counter_ns())
+        rows = _row_count(record)
+        with self._stats_lock:
+            if droppable and self._pending >= self.max_queue:
+                self._stats.dropped += rows
+                return
+            if droppable:
+                self._pending += 1
+            self._stats.enqueued += rows
+        self._queue.put_nowait(record)
+
+    def _take(self, timeout: float | None) -> Any:
+        record = self._queue.get_nowait() if timeout is None else self._queue.get(timeout=timeout)
+        if record is not _STOP and record[0] in _DROPPABLE:
+            with self._stats_lock:
+                self._pending -= 1
+        return record
+
+    def _count(self, **deltas: int) -> None:
+        with self._stats_lock:
+            for name, delta in deltas.items():
+                setattr(self._stats, name, getattr(self._stats, name) + delta)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                first = self._take(self.flush_interval_s)
+            except queue.Empty:
+                if self._retry:
+                    self._flush([], 0)
+                continue
+            if first is _STOP:
+                break
+            batch = [first]
+            rows = _row_count(first)
+            deadline = time.monotonic() + self.flush_interval_s
+            while rows < self.flush_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    record = self._take(remaining)
+                except queue.Empty:
+                    break
+                if record is _STOP:
+                    stopping = True
+                    break
+                batch.append(record)
+                rows += _row_count(record)
+            self._flush(batch, rows)
+        self._drain()
+
+    def _drain(self) -> None:
+        while True:
+            batch: List[Tuple[str, Any, int]] = []
+            rows = 0
+            while rows < self.flush_size:
+                try:
+                    record = self._take(None)
+                except queue.Empty:
+                    break
+                if record is _STOP:
+                    continue
+                batch.append(record)
+                rows += _row_count(record)
+            if not batch and not self._retry:
+                return
+            self._flush(batch, rows)
+
+    def _flush(self, batch: List[Tuple[str, Any, int]], rows: int) -> None:
+        if self._retry:
+            batch = self._retry + batch
+            rows += len(self._retry)
+            self._retry = []
+        if self._write(batch, rows):
+            self._attempts = 0
+            return
+        events = [record for record in batch if record[0] not in _DROPPABLE]
+        if len(events) < len(batch):
+            self._count(failed=rows - len(events))
+            if events and self._write(events, len(events)):
+                self._attempts = 0
+                return
+        if not events:
+            return
+        self._attempts += 1
+        if self._attempts > self.event_retries:
+            logger.error(
+                "Giving up on %d event records after %d attempts", len(events), self._attempts
+            )
+            self._count(failed=len(events))
+            self._attempts = 0
+            return
+        self._count(retried=len(events))
+        self._retry = events
+
+    def _write(self, batch: List[Tuple[str, Any, int]], rows: int) -> bool:
+        started = time.perf_counter_ns()
+        created: List[EventRef] = []
+        try:
+            with self.repository.session_scope() as session:
+                for kind, payload, _ in batch:
+                    if kind == "snapshots":
+                        self.repository.bulk_insert_snapshots(payload, session=session)
+                    elif kind == "metrics":
+                        self.repository.bulk_insert_metrics(payload, session=session)
+                    elif kind == "create_event":
+                        ref, fields = payload
+                        event = ArbitrageEvent(**fields)
+                        session.add(event)
+                        session.flush()
+                        created.append(ref)
+                        ref.event_id = event.id
+                    elif kind == "close_event":
+                        ref, end_ts, max_net_pct, avg_net_pct, duration_s, *depth = payload
+                        if ref.event_id is None:
+                            continue
+                        event = session.get(ArbitrageEvent, ref.event_id)
+                        if not event:
+                            continue
+                        event.end_ts = end_ts
+                        event.status = "closed"
+                        event.max_net_pct = max_net_pct
+                        event.avg_net_pct = avg_net_pct
+                        event.max_exec_qty, event.max_vwap_net_pct = depth
+                        event.duration_s = duration_s
+        except Exception:  # noqa: BLE001
+            logger.exception("Persistence batch of %d rows failed", rows)
+            for ref in created:
+                ref.event_id = None
+            return False
+        committed = time.perf_counter_ns()
+        elapsed_ms = (committed - started) / 1e6
+        if self.latency is not None:
+            self.latency.observe("commit", "writer", committed - started)
+            for kind, _, enqueued in batch:
+                self.latency.observe("queue", "writer", started - enqueued)
+                if kind == "create_event":
+                    self.latency.observe("event_write", "writer", committed - enqueued)
+        with self._stats_lock:
+            self._stats.written += rows
+            self._stats.batches += 1
+            self._stats.last_batch_rows = rows
+            self._stats.last_flush_ms = elapsed_ms
+        return True
+
+
+def _row_count(record: Any) -> int:
+    kind, payload = record[0], record[1]
+    if kind in ("snapshots", "metrics"):
+        return len(payload)
+    return 1
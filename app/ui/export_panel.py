@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import streamlit as st
+
+from app.storage.export import EXPORT_FORMATS, ExportService
+
+
+def export_format_select(key: str) -> str:
+    return st.selectbox(
+        "Export Formatı",
+        options=list(EXPORT_FORMATS),
+        key=key,
+        help="Export arka planda sayfa sayfa yazılır; büyük aralıklar belleğe yüklenmez.",
+    )
+
+
+def render_export_jobs(service: ExportService, kind: str) -> None:
+    running = any(job.running for job in service.jobs(kind))
+    st.fragment(_export_jobs, run_every=1.0 if running else None)(service, kind)
+
+
+def _export_jobs(service: ExportService, kind: str) -> None:
+    for job in reversed(service.jobs(kind)):
+        if job.running:
+            col1, col2 = st.columns([5, 1])
+            col1.progress(job.progress, text=f"{job.path.name}: {job.rows}/{job.total} satır")
+            if col2.button("İptal", key=f"cancel_{job.job_id}"):
+                service.cancel(job.job_id)
+        elif job.status == "done":
+            st.success(f"Export kaydedildi: {job.path} ({job.rows} satır)")
+        elif job.status == "cancelled":
+            st.info(f"Export iptal edildi: {job.path.name}")
+        else:
+            st.warning(f"Export başarısız: {job.error}")
@@ -5,25 +5,70 @@ from datetime import datetime, timedelta, timezone
 import pandas as pd
 import plotly.express as px
 import streamlit as st
-import streamlit.components.v1 as components
 
-from app.config import load_settings
-from app.core.state import STATE
-from app.storage.repository import Repository
-from app.ui.service_manager import get_service
+from app.config import Settings, load_settings
+from app.core.live_api import LiveClient, LiveSnapshot, local_snapshot
+from app.core.scheduler import MonitoringService
+from app.core.state import Prices
+from app.storage.metrics_cache import MetricsCache
+from app.ui.service_manager import get_live_client, get_metrics_cache, get_service
 
+LIVE_REFRESH_S = 1.0
+CHART_REFRESH_S = 5.0
 
-st.set_page_config(page_title="Dashboard", layout="wide")
-settings = load_settings()
-service = get_service(settings)
-repository = Repository(settings.db_path)
 
-st.title("Dashboard")
+def _live_rows(settings: Settings, prices: Prices) -> list[dict]:
+    rows = []
+    for symbol in settings.watchlist:
+        binance = prices.get("binance", {}).get(symbol)
+        kraken = prices.get("kraken", {}).get(symbol)
+        if not binance or not kraken:
+            continue
+        net_binance_sell = (
+            (binance.bid * (1 - settings.binance_fee) - kraken.ask * (1 + settings.kraken_fee))
+            / kraken.ask
+            * 100
+        )
+        net_kraken_sell = (
+            (kraken.bid * (1 - settings.kraken_fee) - binance.ask * (1 + settings.binance_fee))
+            / binance.ask
+            * 100
+        )
+        rows.append(
+            {
+                "symbol": symbol,
+                "binance_bid": binance.bid,
+                "binance_ask": binance.ask,
+                "kraken_bid": kraken.bid,
+                "kraken_ask": kraken.ask,
+                "net_pct_binance_sell": net_binance_sell,
+                "net_pct_kraken_sell": net_kraken_sell,
+                "firsat": "✅"
+                if max(net_binance_sell, net_kraken_sell) >= settings.min_net_pct
+                else "—",
+            }
+        )
+    return rows
+
+
+@st.fragment(run_every=LIVE_REFRESH_S)
+def live_panel(
+    service: MonitoringService, client: LiveClient | None, settings: Settings
+) -> None:
+    if client is None:
+        live = local_snapshot(service)
+    else:
+        try:
+            live = client.snapshot()
+        except (OSError, ValueError) as exc:
+            st.error(
+                f"Collector servisine bağlanılamadı ({settings.api_host}:{settings.api_port}): "
+                f"{exc}"
+            )
+            return
 
-col_status, col_actions = st.columns([2, 1])
-with col_status:
-    status = STATE.get_status()
     st.subheader("Bağlantı Durumları")
+    status = live.status
     st.write(
         {
             "Binance": "✅" if status["binance"].connected else "❌",
@@ -33,81 +78,126 @@ with col_status:
     st.caption(
         f"Binance: {status['binance'].last_message} | Kraken: {status['kraken'].last_message}"
     )
+    streams = live.streams
+    if len(streams) > 1:
+        with st.expander("Websocket bağlantıları"):
+            stream_rows = [
+                {
+                    "bağlantı": name,
+                    "durum": "✅" if stream.connected else "❌",
+                    "stream": stream.streams,
+                    "mesaj/s": round(stream.rate, 1),
+                    "gecikme_ms": stream.lag_ms,
+                    "max_gecikme_ms": stream.max_lag_ms,
+                    "yeniden bağlanma": stream.reconnects,
+                    "tekrar (atılan)": stream.duplicates,
+                    "failover": stream.failovers,
+                    "kesinti": stream.gaps,
+                    "kesinti_ms": round(stream.gap_ms),
+                    "son mesaj": stream.last_message,
+                }
+                for name, stream in streams.items()
+            ]
+            st.dataframe(pd.DataFrame(stream_rows), hide_index=True, use_container_width=True)
+    if live.writer is not None:
+        stats = live.writer
+        st.caption(
+            f"DB kuyruğu: {stats.queue_depth} | yazılan: {stats.written} | "
+            f"düşen: {stats.dropped} | hatalı: {stats.failed} | "
+            f"son batch: {stats.last_batch_rows} satır / {stats.last_flush_ms:.1f} ms"
+        )
 
-with col_actions:
-    st.subheader("Monitoring")
-    if st.button("Start Monitoring", use_container_width=True):
-        service.start()
-        st.success("Monitoring başlatıldı")
-    if st.button("Stop Monitoring", use_container_width=True):
-        service.stop()
-        st.warning("Monitoring durduruldu")
-
-st.subheader("Seçili Coinler")
-st.write(", ".join(settings.watchlist))
-
-prices = STATE.get_prices()
-rows = []
-for symbol in settings.watchlist:
-    binance = prices.get("binance", {}).get(symbol)
-    kraken = prices.get("kraken", {}).get(symbol)
-    if not binance or not kraken:
-        continue
-    net_binance_sell = (
-        (binance.bid * (1 - settings.binance_fee) - kraken.ask * (1 + settings.kraken_fee))
-        / kraken.ask
-        * 100
-    )
-    net_kraken_sell = (
-        (kraken.bid * (1 - settings.kraken_fee) - binance.ask * (1 + settings.binance_fee))
-        / binance.ask
-        * 100
-    )
-    rows.append(
+    latency_rows = [
         {
-            "symbol": symbol,
-            "binance_bid": binance.bid,
-            "binance_ask": binance.ask,
-            "kraken_bid": kraken.bid,
-            "kraken_ask": kraken.ask,
-            "net_pct_binance_sell": net_binance_sell,
-            "net_pct_kraken_sell": net_kraken_sell,
-            "firsat": "✅"
-            if max(net_binance_sell, net_kraken_sell) >= settings.min_net_pct
-            else "—",
+            "aşama": row.stage,
+            "kaynak": row.source,
+            "adet": row.count,
+            "p50_ms": row.p50_ns / 1e6,
+            "p99_ms": row.p99_ns / 1e6,
+            "max_ms": row.max_ns / 1e6,
         }
-    )
-
-st.subheader("Canlı Arbitraj Tablosu")
-if rows:
-    st.dataframe(pd.DataFrame(rows), use_container_width=True)
-else:
-    st.info("Veri bekleniyor...")
+        for row in live.latency
+    ]
+    if latency_rows:
+        with st.expander("Pipeline gecikmeleri"):
+            st.dataframe(pd.DataFrame(latency_rows), hide_index=True, use_container_width=True)
+            offsets = live.clock_offsets
+            if offsets:
+                st.caption(
+                    "Saat farkı tahmini (min. yerel alış - borsa olay zamanı): "
+                    + " | ".join(f"{ex}: {ns / 1e6:+.1f} ms" for ex, ns in offsets.items())
+                )
 
-st.subheader("Net Spread Trend")
-chart_symbol = st.selectbox("Coin", settings.watchlist)
-minutes = st.slider("Son kaç dakika", 1, 60, 10)
+    st.subheader("Canlı Arbitraj Tablosu")
+    rows = _live_rows(settings, live.prices)
+    if rows:
+        st.dataframe(pd.DataFrame(rows), use_container_width=True)
+    else:
+        st.info("Veri bekleniyor...")
 
-end_ts = datetime.now(timezone.utc)
-start_ts = end_ts - timedelta(minutes=minutes)
-metrics = repository.list_metrics(chart_symbol, start_ts, end_ts)
-if metrics:
-    df = pd.DataFrame(
-        [
+    if live.events:
+        st.subheader("Açık Fırsatlar")
+        event_rows = [
             {
-                "timestamp": metric.timestamp,
-                "direction": metric.direction,
-                "net_pct": metric.net_pct,
+                "symbol": event.symbol_std,
+                "yön": event.direction,
+                "başlangıç": event.start_ts,
+                "max_net_pct": event.max_net_pct,
+                "avg_net_pct": event.avg_net_pct,
+                "örnek": event.samples,
             }
-            for metric in metrics
+            for event in live.events
         ]
-    )
-    fig = px.line(df, x="timestamp", y="net_pct", color="direction")
-    st.plotly_chart(fig, use_container_width=True)
-else:
-    st.info("Grafik için yeterli veri yok.")
-
-components.html(
-    "<script>setTimeout(function(){window.location.reload();}, 1000);</script>",
-    height=0,
+        st.dataframe(pd.DataFrame(event_rows), hide_index=True, use_container_width=True)
+
+
+@st.fragment(run_every=CHART_REFRESH_S)
+def trend_chart(metrics_cache: MetricsCache, symbol: str, minutes: int) -> None:
+    end_ts = datetime.now(timezone.utc)
+    start_ts = end_ts - timedelta(minutes=minutes)
+    df = metrics_cache.window(symbol, start_ts, end_ts)
+    if not df.empty:
+        fig = px.line(df, x="timestamp", y="net_pct", color="direction")
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("Grafik için yeterli veri yok.")
+
+
+st.set_page_config(page_title="Dashboard", layout="wide")
+settings = load_settings()
+service = get_service()
+client = (
+    get_live_client(settings.api_host, settings.api_port)
+    if settings.collector_mode == "daemon"
+    else None
 )
+metrics_cache = get_metrics_cache(settings.db_path)
+
+st.title("Dashboard")
+
+col_watchlist, col_actions = st.columns([2, 1])
+with col_watchlist:
+    st.subheader("Seçili Coinler")
+    st.write(", ".join(settings.watchlist))
+
+with col_actions:
+    st.subheader("Monitoring")
+    if client is not None:
+        st.info(
+            "Collector ayrı bir süreçte çalışıyor (`python -m app.scripts.run_collector`); "
+            f"canlı veri http://{settings.api_host}:{settings.api_port} adresinden okunuyor."
+        )
+    else:
+        if st.button("Start Monitoring", use_container_width=True):
+            service.start()
+            st.success("Monitoring başlatıldı")
+        if st.button("Stop Monitoring", use_container_width=True):
+            service.stop()
+            st.warning("Monitoring durduruldu")
+
+live_panel(service, client, settings)
+
+st.subheader("Net Spread Trend")
+chart_symbol = st.selectbox("Coin", settings.watchlist)
+minutes = st.slider("Son kaç dakika", 1, 60, 10)
+trend_chart(metrics_cache, chart_symbol, minutes)
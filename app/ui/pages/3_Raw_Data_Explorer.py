@@ -1,21 +1,20 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
-from pathlib import Path
 
-import pandas as pd
 import streamlit as st
 
 from app.config import load_settings
 from app.storage.repository import Repository
+from app.ui.export_panel import export_format_select, render_export_jobs
+from app.ui.service_manager import get_export_service
 
-
-EXPORT_DIR = Path("app/exports")
-EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+MAX_POINTS = 5000
 
 st.set_page_config(page_title="Raw Data Explorer", layout="wide")
 settings = load_settings()
-repository = Repository(settings.db_path)
+repository = Repository(settings.db_path, read_only=True)
+export_service = get_export_service(settings.db_path)
 
 st.title("Raw Data Explorer")
 
@@ -29,32 +28,30 @@ with col3:
 with col4:
     exchange = st.selectbox("Exchange", ["All", "binance", "kraken"])
 
+use_rollups = st.checkbox(
+    "Uzun aralıklarda özet veriyi kullan (1dk / 15dk / 1sa)",
+    value=True,
+    help="Aralık çok büyükse ham snapshot yerine dakikalık/saatlik ortalamalar gösterilir.",
+)
+
 start_ts = datetime.combine(start_date, datetime.min.time(), tzinfo=timezone.utc)
 end_ts = datetime.combine(end_date, datetime.max.time(), tzinfo=timezone.utc)
 
-snapshots = repository.list_snapshots(start_ts, end_ts, symbol, exchange)
-if snapshots:
-    df = pd.DataFrame(
-        [
-            {
-                "timestamp": snap.timestamp,
-                "exchange": snap.exchange,
-                "symbol": snap.symbol_std,
-                "bid": snap.bid,
-                "ask": snap.ask,
-                "last": snap.last,
-                "volume_24h": snap.volume_24h,
-                "spread_abs": snap.spread_abs,
-                "spread_pct": snap.spread_pct,
-            }
-            for snap in snapshots
-        ]
-    )
+df = repository.snapshots_frame(
+    start_ts,
+    end_ts,
+    symbol,
+    exchange,
+    max_points=MAX_POINTS if use_rollups else None,
+    fill_gaps=settings.snapshot_storage == "delta",
+).rename(columns={"symbol_std": "symbol"})
+if not df.empty:
     st.dataframe(df, use_container_width=True)
 
-    if st.button("CSV Export"):
-        file_path = EXPORT_DIR / f"snapshots_{int(datetime.now().timestamp())}.csv"
-        df.to_csv(file_path, index=False)
-        st.success(f"CSV kaydedildi: {file_path}")
+    fmt = export_format_select("snapshots_export_format")
+    if st.button("Export"):
+        export_service.export_snapshots(fmt, start_ts, end_ts, symbol, exchange)
+    st.caption("Export her zaman seçilen aralığın ham verisini içerir.")
+    render_export_jobs(export_service, "snapshots")
 else:
     st.info("Snapshot verisi bulunamadı.")
@@ -1,10 +1,19 @@
 from __future__ import annotations
 
 import json
+from dataclasses import replace
 
 import streamlit as st
 
-from app.config import Settings, load_settings, save_settings
+from app.config import (
+    COLLECTOR_MODES,
+    ENGINE_MODES,
+    EVALUATION_MODES,
+    SNAPSHOT_STORAGE_MODES,
+    load_settings,
+    save_settings,
+)
+from app.core.settings_diff import diff_settings
 
 
 st.set_page_config(page_title="Settings", layout="wide")
@@ -12,10 +21,26 @@ settings = load_settings()
 
 st.title("Settings")
 
+watchlist_options = [
+    "BTC/USDT",
+    "ETH/USDT",
+    "SOL/USDT",
+    "XRP/USDT",
+    "ADA/USDT",
+    "ETH/BTC",
+    "SOL/BTC",
+    "XRP/BTC",
+    "ADA/BTC",
+    "BTC/USD",
+    "ETH/USD",
+    "USDT/USD",
+]
 watchlist = st.multiselect(
     "Watchlist",
-    options=["BTC/USDT", "ETH/USDT", "SOL/USDT", "XRP/USDT", "ADA/USDT"],
+    options=watchlist_options
+    + [symbol for symbol in settings.watchlist if symbol not in watchlist_options],
     default=settings.watchlist,
+    help="Çapraz kurlar (ör. ETH/BTC, BTC/USD, USDT/USD) en çok döngü arbitrajında işe yarar.",
 )
 
 col1, col2, col3 = st.columns(3)
@@ -30,8 +55,140 @@ snapshot_interval = st.number_input(
     "Snapshot Interval (s)", min_value=1, value=settings.snapshot_interval_s
 )
 
+evaluation_mode = st.selectbox(
+    "Arbitraj Değerlendirme Modu",
+    options=list(EVALUATION_MODES),
+    index=list(EVALUATION_MODES).index(settings.evaluation_mode)
+    if settings.evaluation_mode in EVALUATION_MODES
+    else 0,
+    help="snapshot: her snapshot aralığında; tick: her fiyat güncellemesinde yalnızca değişen coin.",
+)
+
+engine_mode = st.selectbox(
+    "Arbitraj Motoru",
+    options=list(ENGINE_MODES),
+    index=list(ENGINE_MODES).index(settings.engine_mode)
+    if settings.engine_mode in ENGINE_MODES
+    else 0,
+    help="pairwise: her coin/yön için ayrı hesap; matrix: tüm borsa çiftleri tek NumPy geçişinde.",
+)
+
+graph_cycles = st.checkbox(
+    "Döngü arbitrajı (üçgen / çapraz kur)",
+    value=settings.graph_cycles,
+    help="Her (borsa, parite) fiyatı komisyon dahil bir graf kenarıdır; her fiyat güncellemesinde "
+    "yalnızca değişen kenarlardan başlayan artımlı negatif döngü araması yapılır. En fazla 3 "
+    "işlemlik kârlı döngüler (ör. USDT>ETH>BTC>USDT) doğrudan fırsatların yanında event olarak "
+    "kaydedilir.",
+)
+
+snapshot_storage = st.selectbox(
+    "Snapshot Kayıt Modu",
+    options=list(SNAPSHOT_STORAGE_MODES),
+    index=list(SNAPSHOT_STORAGE_MODES).index(settings.snapshot_storage)
+    if settings.snapshot_storage in SNAPSHOT_STORAGE_MODES
+    else 0,
+    help="full: her aralıkta tüm satırlar; delta: yalnızca değişen fiyatlar (5 dk'da bir tam kayıt).",
+)
+
+col1, col2 = st.columns(2)
+with col1:
+    book_depth = st.number_input(
+        "Emir Defteri Derinliği (seviye, 0 = kapalı)",
+        min_value=0,
+        max_value=1000,
+        value=int(settings.book_depth),
+        help="0'dan büyükse Binance diff depth ve Kraken book akışları da dinlenir; "
+        "her arbitraj satırına yapılabilir miktar ve VWAP net % eklenir.",
+    )
+with col2:
+    depth_notional = st.number_input(
+        "Derinlik Hesabı Tutarı (USDT)",
+        min_value=1.0,
+        value=float(settings.depth_notional),
+        step=100.0,
+    )
+
 db_path = st.text_input("DB Path", value=settings.db_path)
 
+binance_ws_url = st.text_input(
+    "Binance WS URL",
+    value=settings.binance_ws_url,
+    help="Yerel mock için: python -m app.scripts.mock_exchange çıktısındaki adres.",
+)
+binance_connections = st.number_input(
+    "Binance Bağlantı Sayısı",
+    min_value=1,
+    max_value=64,
+    value=int(settings.binance_connections),
+    help="Coinler bu kadar websocket bağlantısına bölünür; bağlantı başına 200 stream "
+    "sınırını aşan listelerde bağlantı sayısı otomatik artırılır.",
+)
+collector_processes = st.number_input(
+    "Collector Süreç Sayısı (borsa başına, 0 = tek süreç)",
+    min_value=0,
+    max_value=32,
+    value=int(settings.collector_processes),
+    help="0'dan büyükse her borsanın coinleri bu kadar ayrı sürece bölünür; süreçler fiyatları "
+    "paylaşılan bellekteki fiyat tahtasına yazar. Bu modda emir defteri derinliği ve ham mesaj "
+    "kaydı kullanılmaz.",
+)
+hot_standby = st.checkbox(
+    "Yedek (hot standby) bağlantılar",
+    value=settings.hot_standby,
+    help="Her Binance bağlantısı ve Kraken için aynı akışlara abone ikinci bir bağlantı açık "
+    "tutulur. Binance mesajları güncelleme id'si / olay zamanı, Kraken mesajları aktif bağlantı "
+    "ve içerik ile tekilleştirilir; bir bağlantı koptuğunda diğeri beklemeden devam eder.",
+)
+collector_mode = st.selectbox(
+    "Collector Çalışma Şekli",
+    options=list(COLLECTOR_MODES),
+    index=list(COLLECTOR_MODES).index(settings.collector_mode)
+    if settings.collector_mode in COLLECTOR_MODES
+    else 0,
+    help="embedded: collector Streamlit süreci içinde çalışır; daemon: collector "
+    "python -m app.scripts.run_collector ile ayrı çalışır, Dashboard canlı veriyi "
+    "yerel API'den okur.",
+)
+col1, col2 = st.columns(2)
+with col1:
+    api_host = st.text_input("Canlı API Adresi", value=settings.api_host)
+with col2:
+    api_port = st.number_input(
+        "Canlı API Portu (0 = kapalı)",
+        min_value=0,
+        max_value=65535,
+        value=int(settings.api_port),
+        help="Collector canlı fiyat, bağlantı durumu, açık event ve son metric'leri bu portta "
+        "HTTP/JSON ve Server-Sent Events (/stream) olarak sunar.",
+    )
+kraken_ws_url = st.text_input("Kraken WS URL", value=settings.kraken_ws_url)
+binance_rest_url = st.text_input(
+    "Binance REST URL",
+    value=settings.binance_rest_url,
+    help="Emir defteri snapshot'ı bu adresten alınır.",
+)
+
+raw_retention_days = st.number_input(
+    "Ham Veri Saklama (gün, 0 = sınırsız)",
+    min_value=0.0,
+    value=float(settings.raw_retention_days),
+    step=1.0,
+    help="Bu süreden eski snapshot/metric satırları, özet (rollup) tablolara işlendikten sonra silinir.",
+)
+
+archive_enabled = st.checkbox(
+    "Kapanan günleri Parquet arşivine taşı",
+    value=settings.archive_enabled,
+    help="Kapanan UTC günlerinin snapshot/metric satırları app/data/archive altına Parquet olarak yazılır ve SQLite'tan silinir.",
+)
+
+record_frames = st.checkbox(
+    "Ham websocket mesajlarını kaydet",
+    value=settings.record_frames,
+    help=f"Binance/Kraken'den gelen her mesaj alınma zamanıyla {settings.recording_dir} altına sıkıştırılmış segment dosyalarına yazılır; python -m app.scripts.replay_session ile tekrar oynatılabilir.",
+)
+
 mapping_text = st.text_area(
     "Mapping Overrides (JSON)", value=json.dumps(settings.mapping_overrides, indent=2), height=200
 )
@@ -42,14 +199,46 @@ if st.button("Save Settings"):
     except json.JSONDecodeError as exc:
         st.error(f"JSON hatası: {exc}")
     else:
-        new_settings = Settings(
+        new_settings = replace(
+            settings,
             watchlist=watchlist or settings.watchlist,
             snapshot_interval_s=int(snapshot_interval),
+            evaluation_mode=evaluation_mode,
+            engine_mode=engine_mode,
+            graph_cycles=bool(graph_cycles),
+            snapshot_storage=snapshot_storage,
             binance_fee=binance_fee / 100,
             kraken_fee=kraken_fee / 100,
             min_net_pct=float(min_net_pct),
             db_path=db_path,
+            binance_ws_url=binance_ws_url.strip() or settings.binance_ws_url,
+            kraken_ws_url=kraken_ws_url.strip() or settings.kraken_ws_url,
+            binance_rest_url=binance_rest_url.strip() or settings.binance_rest_url,
+            binance_connections=int(binance_connections),
+            collector_processes=int(collector_processes),
+            hot_standby=bool(hot_standby),
+            collector_mode=collector_mode,
+            api_host=api_host.strip() or settings.api_host,
+            api_port=int(api_port),
+            book_depth=int(book_depth),
+            depth_notional=float(depth_notional),
+            raw_retention_days=float(raw_retention_days),
+            archive_enabled=bool(archive_enabled),
+            record_frames=bool(record_frames),
             mapping_overrides=overrides,
         )
         save_settings(new_settings)
-        st.success("Ayarlar kaydedildi. İzlemeyi yeniden başlatın.")
+        change = diff_settings(settings, new_settings)
+        restart_fields = list(change.restart_fields)
+        if change.symbols_changed and new_settings.collector_processes > 0:
+            restart_fields.append("watchlist")
+        if restart_fields:
+            st.warning(
+                "Ayarlar kaydedildi. Şu alanlar için izlemeyi yeniden başlatın: "
+                + ", ".join(restart_fields)
+            )
+        else:
+            st.success(
+                "Ayarlar kaydedildi. Watchlist, mapping, komisyon ve eşik değişiklikleri "
+                "çalışan izlemeye yeniden bağlanmadan uygulanır."
+            )
@@ -2,10 +2,29 @@ from __future__ import annotations
 
 import streamlit as st
 
-from app.config import Settings
+from app.config import DEFAULT_SETTINGS_PATH, load_settings
+from app.core.live_api import LiveClient
 from app.core.scheduler import MonitoringService
+from app.storage.export import ExportService
+from app.storage.metrics_cache import MetricsCache
+from app.storage.repository import Repository
 
 
 @st.cache_resource
-def get_service(settings: Settings) -> MonitoringService:
-    return MonitoringService(settings)
+def get_service() -> MonitoringService:
+    return MonitoringService(load_settings(), settings_path=DEFAULT_SETTINGS_PATH)
+
+
+@st.cache_resource
+def get_live_client(host: str, port: int) -> LiveClient:
+    return LiveClient(host, port)
+
+
+@st.cache_resource
+def get_export_service(db_path: str) -> ExportService:
+    return ExportService(Repository(db_path, read_only=True))
+
+
+@st.cache_resource
+def get_metrics_cache(db_path: str) -> MetricsCache:
+    return MetricsCache(Repository(db_path, read_only=True))
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from app.core.arbitrage import ArbitrageEngine
+from datetime import datetime, timezone
+
+from app.core.arbitrage import ArbitrageEngine, depth_fill
 
 
 def test_arbitrage_compute_net_pct() -> None:
@@ -21,3 +23,34 @@ def test_event_lifecycle() -> None:
     result2 = engine.compute("BTC/USDT", "binance", 100.2, "kraken", 100.0)
     action, _ = engine.update_event_state(result2)
     assert action == "close"
+
+
+def test_depth_fill_walks_levels_within_notional() -> None:
+    bids = [(101.0, 1.0), (100.5, 2.0)]
+    asks = [(100.0, 0.5), (100.2, 1.0), (101.0, 5.0)]
+
+    quantity, vwap_net = depth_fill(bids, asks, 0.0, 0.0, 1_000_000.0)
+    assert quantity == 1.5
+    assert abs(vwap_net - (302.0 - 301.7) / 301.7 * 100) < 1e-9
+
+    quantity, vwap_net = depth_fill(bids, asks, 0.0, 0.0, 75.0)
+    assert abs(quantity - (0.5 + 25.0 / 100.2)) < 1e-9
+    assert vwap_net > 0
+    assert depth_fill([], asks, 0.0, 0.0, 75.0) == (0.0, None)
+
+
+def test_event_tracks_depth_maxima() -> None:
+    engine = ArbitrageEngine({"binance": 0.0, "kraken": 0.0}, threshold_pct=0.5)
+    result = engine.compute("BTC/USDT", "binance", 101.0, "kraken", 100.0)
+    engine.compute_depth(result, "binance", [(101.0, 2.0)], "kraken", [(100.0, 1.0)], 1000.0)
+    assert result.exec_qty == 1.0
+    _, state = engine.update_event_state(result)
+
+    result2 = engine.compute("BTC/USDT", "binance", 101.0, "kraken", 100.0)
+    engine.compute_depth(result2, "binance", [(101.0, 3.0)], "kraken", [(100.0, 3.0)], 1000.0)
+    action, _ = engine.update_event_state(result2)
+    assert action == "update"
+    assert state.max_exec_qty == 3.0
+    assert abs(state.max_vwap_net_pct - 1.0) < 1e-9
+    row = engine.to_metric_row(result2, datetime.now(timezone.utc))
+    assert row[-2:] == (3.0, result2.vwap_net_pct)
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+from app.storage import archive
+from app.storage.archive import METRIC_ARCHIVE, SNAPSHOT_ARCHIVE
+from app.storage.db import init_db
+from app.storage.models import ArbitrageMetric, Snapshot
+from app.storage.repository import Repository
+from app.storage.rollup import RollupJob
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+DIRECTION = "binance_sell/kraken_buy"
+
+
+def _seed(tmp_path) -> Repository:
+    db_path = str(tmp_path / "app.db")
+    init_db(db_path)
+    repository = Repository(db_path)
+    timestamps = [START + timedelta(minutes=i) for i in range(3 * 24 * 60)]
+    repository.bulk_insert_metrics(
+        [
+            (ts, symbol, DIRECTION, float(i), float(i % 60))
+            for i, ts in enumerate(timestamps)
+            for symbol in ("BTC/USDT", "ETH/USDT")
+        ]
+    )
+    repository.bulk_insert_snapshots(
+        [(ts, "binance", "BTC/USDT", 100.0, 101.0, 100.5, None, 1.0, 1.0) for ts in timestamps]
+    )
+    return repository
+
+
+def _count(repository: Repository, model) -> int:
+    with repository.session_scope() as session:
+        return session.execute(select(func.count()).select_from(model)).scalar()
+
+
+def test_seal_closed_days_and_read_back(tmp_path) -> None:
+    repository = _seed(tmp_path)
+    end = START + timedelta(days=3)
+    before = [
+        (m.timestamp, m.direction, m.net_pct)
+        for m in repository.list_metrics("BTC/USDT", START, end)
+    ]
+
+    RollupJob(repository, lag_s=0).run_once(now=START + timedelta(days=2, hours=12))
+    sealed = repository.archive.seal_closed_days(repository, today=date(2024, 1, 10))
+    assert sealed == {"snapshots": 2 * 24 * 60, "arbitrage_metrics": 2 * 2 * 24 * 60}
+    assert repository.archive.sealed_days(METRIC_ARCHIVE) == [date(2024, 1, 1), date(2024, 1, 2)]
+    assert _count(repository, ArbitrageMetric) == 2 * 24 * 60
+    assert _count(repository, Snapshot) == 24 * 60
+
+    after = [
+        (m.timestamp, m.direction, m.net_pct)
+        for m in repository.list_metrics("BTC/USDT", START, end)
+    ]
+    assert after == before
+    window = repository.list_snapshots(
+        START + timedelta(hours=23), START + timedelta(days=1, hours=1), "BTC/USDT", "binance"
+    )
+    assert len(window) == 121
+    assert repository.list_snapshots(START, end, "ETH/USDT", "binance") == []
+
+    assert repository.archive.seal_closed_days(repository, today=date(2024, 1, 10)) == {
+        "snapshots": 0,
+        "arbitrage_metrics": 0,
+    }
+    assert repository.archive.prune(START + timedelta(days=1)) == 2
+    assert repository.archive.sealed_days(SNAPSHOT_ARCHIVE) == [date(2024, 1, 2)]
+
+
+def test_seal_day_keeps_rows_written_after_the_read(tmp_path, monkeypatch) -> None:
+    repository = _seed(tmp_path)
+    repository.archive.delete_batch_size = 500
+    arrow_chunk = archive._arrow_chunk
+    late = (START + timedelta(hours=5), "binance", "BTC/USDT", 1.0, 2.0, 1.5, None, 1.0, 1.0)
+
+    def insert_while_reading(*args):
+        if _count(repository, Snapshot) == 3 * 24 * 60:
+            repository.bulk_insert_snapshots([late])
+        return arrow_chunk(*args)
+
+    monkeypatch.setattr(archive, "_arrow_chunk", insert_while_reading)
+    monkeypatch.setattr(archive, "ROW_GROUP_ROWS", 500)
+    assert repository.archive.seal_day(repository, SNAPSHOT_ARCHIVE, START.date()) == 24 * 60
+    (part,) = repository.archive.partition_dir(SNAPSHOT_ARCHIVE, START.date()).iterdir()
+    assert archive.pq.ParquetFile(part).metadata.num_row_groups == 3
+    monkeypatch.setattr(archive, "_arrow_chunk", arrow_chunk)
+    assert _count(repository, Snapshot) == 2 * 24 * 60 + 1
+
+    assert repository.archive.seal_day(repository, SNAPSHOT_ARCHIVE, START.date()) == 1
+    assert _count(repository, Snapshot) == 2 * 24 * 60
+    day = repository.list_snapshots(START, START + timedelta(hours=23), "BTC/USDT", "binance")
+    assert len(day) == 23 * 60 + 2
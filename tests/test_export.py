@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import csv
+import gzip
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from app.storage.db import init_db
+from app.storage.export import ExportJob, ExportService
+from app.storage.repository import Repository
+from app.storage.rollup import RollupJob
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _wait(job: ExportJob, timeout: float = 30.0) -> ExportJob:
+    deadline = time.monotonic() + timeout
+    while job.running and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def _seed(tmp_path) -> Repository:
+    db_path = str(tmp_path / "app.db")
+    init_db(db_path)
+    repository = Repository(db_path)
+    repository.bulk_insert_snapshots(
+        [
+            (START + timedelta(seconds=30 * i), ex, "BTC/USDT", 100.0, 101.0, None, None, 1.0, 1.0)
+            for i in range(2 * 2880)
+            for ex in ("binance", "kraken")
+        ]
+    )
+    for i in range(120):
+        repository.create_event(
+            "BTC/USDT", "binance_sell/kraken_buy", START + timedelta(minutes=i), 0.5, 0.3
+        )
+    RollupJob(repository, lag_s=0).run_once(now=START + timedelta(days=2))
+    repository.archive.seal_closed_days(repository, today=date(2024, 1, 2))
+    return repository
+
+
+def test_streaming_csv_export_spans_archive_and_sqlite(tmp_path) -> None:
+    repository = _seed(tmp_path)
+    service = ExportService(repository, export_dir=tmp_path / "exports", batch_size=700)
+    end = START + timedelta(days=2)
+
+    job = _wait(service.export_snapshots("csv.gz", START, end, "BTC/USDT", "kraken"))
+    assert job.status == "done" and job.progress == 1.0
+    with gzip.open(job.path, "rt", newline="") as handle:
+        rows = list(csv.reader(handle))
+    assert rows[0][:3] == ["timestamp", "exchange", "symbol_std"]
+    assert len(rows) - 1 == job.rows == job.total == 2 * 2880
+    assert {row[1] for row in rows[1:]} == {"kraken"}
+    timestamps = [row[0] for row in rows[1:]]
+    assert len(set(timestamps)) == len(timestamps)
+
+    pdf = _wait(service.export_events("pdf", START, end))
+    assert pdf.status == "done" and pdf.rows == 120
+    assert b"/Count 2" in pdf.path.read_bytes()
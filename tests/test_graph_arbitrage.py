@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+from app.config import Settings
+from app.core.graph_arbitrage import GraphArbitrageEngine
+from app.core.scheduler import MonitoringService
+from app.core.state import PriceData, SharedState
+from app.core.symbol_mapping import SymbolMapping
+from app.storage.models import ArbitrageEvent
+
+FEES = {"binance": 0.001, "kraken": 0.0026}
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+MIDS = {"BTC/USDT": 60000.0, "ETH/USDT": 3000.0, "ETH/BTC": 0.05, "BTC/USD": 60000.0}
+MIDS["USDT/USD"] = 1.0
+KRAKEN_ONLY = {"BTC/USD", "USDT/USD"}
+
+
+def _quote(mid: float) -> tuple[float, float]:
+    return mid * 0.99995, mid * 1.00005
+
+
+def _listed() -> list[tuple[str, str, float]]:
+    return [
+        (exchange, symbol, mid)
+        for exchange in FEES
+        for symbol, mid in MIDS.items()
+        if exchange == "kraken" or symbol not in KRAKEN_ONLY
+    ]
+
+
+def _calm_engine() -> GraphArbitrageEngine:
+    engine = GraphArbitrageEngine(list(MIDS), FEES, threshold_pct=0.1)
+    for exchange, symbol, mid in _listed():
+        engine.update_quote(symbol, exchange, *_quote(mid))
+    assert engine.step(NOW) == []
+    return engine
+
+
+def _started(transitions) -> set[tuple[str, str]]:
+    return {(item.symbol_std, item.direction) for item in transitions if item.action == "start"}
+
+
+def test_graph_engine_reports_triangles_and_cross_quote_cycles() -> None:
+    engine = _calm_engine()
+
+    engine.update_quote("ETH/BTC", "binance", *_quote(0.0505))
+    assert _started(engine.step(NOW)) == {("USDT>ETH>BTC>USDT", "binance>binance>binance")}
+    assert engine.open_events()[("USDT>ETH>BTC>USDT", "binance>binance>binance")].max_net_pct > 0.5
+    engine.update_quote("ETH/BTC", "binance", *_quote(0.05))
+    transitions = engine.step(NOW)
+    assert [item.action for item in transitions] == ["close"] and not engine.events
+
+    engine.update_quote("BTC/USD", "kraken", *_quote(61000.0))
+    assert _started(engine.step(NOW)) == {
+        ("USDT>BTC>USD>USDT", "kraken>kraken>kraken"),
+        ("USDT>BTC>USD>USDT", "binance>kraken>kraken"),
+    }
+    engine.update_quote("BTC/USD", "kraken", *_quote(60000.0))
+    engine.step(NOW)
+    assert not engine.events
+
+    engine.update_quote("ETH/USDT", "kraken", *_quote(3030.0))
+    started = _started(engine.step(NOW))
+    assert started and all(len(direction.split(">")) == 3 for _, direction in started)
+
+
+def test_graph_engine_stays_quiet_on_noise_and_tracks_fee_changes() -> None:
+    engine = _calm_engine()
+    rng = random.Random(3)
+    for _ in range(2000):
+        exchange, symbol, mid = rng.choice(_listed())
+        engine.update_quote(symbol, exchange, *_quote(mid * (1 + rng.gauss(0, 2e-4))))
+        assert engine.step(NOW) == []
+
+    engine.update_quote("ETH/BTC", "binance", *_quote(0.0502))
+    key = ("USDT>ETH>BTC>USDT", "binance>binance>binance")
+    assert key in _started(engine.step(NOW))
+    engine.reconfigure(list(MIDS), {"binance": 0.002, "kraken": 0.0026}, 0.1)
+    assert key in engine.events
+    assert [item.action for item in engine.step(NOW) if item.symbol_std == key[0]] == ["close"]
+    engine.reconfigure(list(MIDS), FEES, 0.1)
+    engine.step(NOW)
+    assert key in engine.events
+    assert engine.drop_events(["ETH/BTC"]) and key not in engine.events
+
+
+def test_graph_engine_closes_cycles_that_can_no_longer_be_priced() -> None:
+    engine = _calm_engine()
+    key = ("USDT>ETH>BTC>USDT", "binance>binance>binance")
+    engine.update_quote("ETH/BTC", "binance", *_quote(0.0505))
+    assert key in _started(engine.step(NOW))
+    state = engine.events[key]
+    engine.update_quote("ETH/BTC", "binance", math.nan, math.nan)
+    (close,) = engine.step(NOW)
+    assert close.action == "close" and close.state is state and state.samples == 1
+    assert math.isfinite(state.sum_net_pct) and math.isfinite(state.max_net_pct)
+
+    engine.update_quote("ETH/BTC", "binance", *_quote(0.0505))
+    assert key in _started(engine.step(NOW))
+    state = engine.events[key]
+    symbols = [symbol for symbol in MIDS if symbol != "ETH/BTC"]
+    assert engine.reconfigure(symbols, FEES, 0.1) == [state] and not engine.events
+    assert len(key[0]) <= ArbitrageEvent.__table__.c.symbol_std.type.length
+
+
+class RecordingWriter:
+    def __init__(self) -> None:
+        self.calls: list[tuple] = []
+
+    def create_event(self, ref, **kwargs) -> None:
+        self.calls.append(("create", kwargs["symbol_std"], kwargs["direction"]))
+        ref.event_id = len(self.calls)
+
+    def close_event(self, ref, *args) -> None:
+        self.calls.append(("close", ref.event_id))
+
+
+def test_service_records_cycle_events_next_to_direct_ones() -> None:
+    settings = Settings(watchlist=list(MIDS), min_net_pct=0.1, graph_cycles=True)
+    state = SharedState()
+    for exchange, symbol, mid in _listed():
+        state.update_price(exchange, symbol, PriceData(*_quote(mid)))
+    service = MonitoringService(settings, state, latency=None)
+    engine = service._build_engine()
+    service.graph = service._build_graph()
+    writer = RecordingWriter()
+    service._process_arbitrage(NOW, state.get_prices(), engine, writer)
+    assert writer.calls == []
+
+    state.update_price("kraken", "BTC/USDT", PriceData(*_quote(60600.0)))
+    later = NOW + timedelta(seconds=1)
+    service._process_arbitrage(later, state.get_prices(), engine, writer, symbols=["BTC/USDT"])
+    created = {(call[1], call[2]) for call in writer.calls if call[0] == "create"}
+    assert ("BTC/USDT", "kraken_sell/binance_buy") in created
+    assert ("USDT>ETH>BTC>USDT", "kraken>kraken>kraken") in created
+    assert SymbolMapping({}).to_kraken("ETH/BTC") == "ETH/XBT"
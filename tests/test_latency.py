@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+import random
+import time
+
+import numpy as np
+
+from app.collectors.binance import BinanceCollector
+from app.core.latency import LatencyHistogram, PipelineLatency
+from app.core.state import SharedState
+
+
+def test_histogram_percentiles_within_bucket_resolution() -> None:
+    rng = random.Random(7)
+    values = np.array([int(rng.lognormvariate(11, 1.5)) for _ in range(20_000)], dtype=np.int64)
+    histogram = LatencyHistogram()
+    histogram.record_many(values[:10_000])
+    for value in values[10_000:10_020]:
+        histogram.record(int(value))
+    histogram.record_many(values[10_020:])
+
+    assert histogram.count == len(values)
+    assert histogram.max == values.max()
+    for quantile in (0.5, 0.9, 0.99):
+        exact = np.quantile(values, quantile, method="inverted_cdf")
+        assert exact <= histogram.percentile(quantile) <= exact * 1.125 + 1
+
+
+def test_collector_stages_and_prometheus_export(tmp_path) -> None:
+    latency = PipelineLatency()
+    collector = BinanceCollector({"BTC/USDT": "BTCUSDT"}, SharedState(), latency=latency)
+    event_ms = time.time_ns() // 1_000_000 - 250
+    for bid in (100.0, 101.0):
+        data = {"e": "bookTicker", "s": "BTCUSDT", "b": str(bid), "a": str(bid + 1)}
+        collector._handle_message(json.dumps({"data": data}))
+    mini = {"e": "24hrMiniTicker", "E": event_ms, "s": "BTCUSDT", "c": "101", "v": "5"}
+    collector._handle_message(json.dumps({"data": mini}))
+    latency.observe("commit", "writer", 2_000_000)
+
+    rows = {(row.stage, row.source): row for row in latency.summary()}
+    assert rows[("parse", "binance")].count == 3
+    assert rows[("state", "binance")].count == 3
+    assert rows[("commit", "writer")].p99_ns == 2_000_000
+    assert 250_000_000 <= latency.clock_offsets()["binance"] < 1_250_000_000
+
+    path = tmp_path / "metrics.prom"
+    latency.write_textfile(path)
+    text = path.read_text(encoding="utf-8")
+    assert "# TYPE arbitrage_stage_latency_seconds summary" in text
+    assert 'arbitrage_stage_latency_seconds_count{stage="parse",source="binance"} 3' in text
+    assert 'arbitrage_clock_offset_seconds{source="binance"}' in text
+
+    latency.reset()
+    assert all(row.count == 0 for row in latency.summary())
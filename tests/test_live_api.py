@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from contextlib import suppress
+from datetime import datetime, timezone
+
+import pytest
+
+from app.config import Settings
+from app.core.arbitrage import ArbitrageEngine
+from app.core.live_api import LiveApiServer, LiveClient
+from app.core.scheduler import MonitoringService
+from app.core.state import PriceData, SharedState
+
+
+@pytest.fixture
+def live_service():
+    state = SharedState()
+    service = MonitoringService(Settings(watchlist=["BTC/USDT"]), state, latency=None)
+    loop = asyncio.new_event_loop()
+    server = LiveApiServer(service, "127.0.0.1", 0)
+    task = loop.create_task(server.run())
+
+    def serve() -> None:
+        with suppress(asyncio.CancelledError):
+            loop.run_until_complete(task)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while server.port == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    yield service, LiveClient("127.0.0.1", server.port)
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join(5)
+    loop.close()
+
+
+def test_snapshot_serves_quotes_events_and_metrics(live_service) -> None:
+    service, client = live_service
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    service.state.update_price("binance", "BTC/USDT", PriceData(100.0, 100.1, 100.05, 12.0))
+    service.state.update_price("kraken", "BTC/USDT", PriceData(101.0, 101.1))
+    engine = service.engine = ArbitrageEngine({"binance": 0.0, "kraken": 0.0}, 0.1)
+    result = engine.compute("BTC/USDT", "kraken", 101.0, "binance", 100.1)
+    engine.update_event_state(result, now)
+    service._remember_metrics([engine.to_metric_row(result, now)])
+
+    live = client.snapshot()
+
+    assert live.version == 2
+    assert live.prices["binance"]["BTC/USDT"] == PriceData(100.0, 100.1, 100.05, 12.0)
+    assert live.prices["kraken"]["BTC/USDT"].last is None
+    assert [(event.symbol_std, event.direction) for event in live.events] == [
+        ("BTC/USDT", result.direction)
+    ]
+    assert live.events[0].start_ts == now
+    assert live.metrics == [engine.to_metric_row(result, now)]
+    assert client.get("/metrics?limit=0")["metrics"] == []
+    with pytest.raises(ValueError):
+        client.get("/missing")
+    assert client.quotes()[0] == 2
+
+
+def test_stream_pushes_only_changed_quotes(live_service) -> None:
+    service, client = live_service
+    service.state.update_price("binance", "BTC/USDT", PriceData(100.0, 100.1))
+    service.state.update_price("binance", "ETH/USDT", PriceData(10.0, 10.1))
+    stream = client.stream()
+
+    event, payload = next(stream)
+    assert event == "snapshot"
+    assert set(payload["quotes"]["binance"]) == {"BTC/USDT", "ETH/USDT"}
+
+    service.state.update_price("binance", "ETH/USDT", PriceData(10.2, 10.3))
+    event, payload = next(stream)
+    while event != "quotes":
+        event, payload = next(stream)
+    assert payload["version"] == 3
+    assert payload["quotes"] == {"binance": {"ETH/USDT": [10.2, 10.3, None, None]}}
+    stream.close()
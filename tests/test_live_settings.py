@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.collectors.binance import BinanceCollector
+from app.collectors.kraken import KrakenCollector
+from app.collectors.mock_exchange import MockExchangeServer
+from app.config import Settings
+from app.core.arbitrage import ArbitrageEngine
+from app.core.scheduler import MonitoringService
+from app.core.settings_diff import diff_settings
+from app.core.state import PriceData, SharedState
+
+
+class RecordingWriter:
+    def __init__(self) -> None:
+        self.calls: list[tuple] = []
+
+    def create_event(self, ref, **kwargs) -> None:
+        self.calls.append(("create", kwargs["symbol_std"], kwargs["direction"]))
+        ref.event_id = len(self.calls)
+
+    def close_event(self, ref, *args) -> None:
+        self.calls.append(("close", ref.event_id))
+
+
+@pytest.mark.parametrize("engine_mode", ["pairwise", "matrix"])
+def test_apply_settings_closes_removed_events_and_swaps_fees(engine_mode: str) -> None:
+    settings = Settings(
+        watchlist=["BTC/USDT", "ETH/USDT"],
+        engine_mode=engine_mode,
+        binance_fee=0.0,
+        kraken_fee=0.0,
+        min_net_pct=0.1,
+    )
+    state = SharedState()
+    for symbol in settings.watchlist:
+        state.update_price("binance", symbol, PriceData(100.0, 100.1))
+        state.update_price("kraken", symbol, PriceData(101.0, 101.1))
+    service = MonitoringService(settings, state, latency=None)
+    engine = service.engine = service._build_engine()
+    writer = service.writer = RecordingWriter()
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    service._process_arbitrage(now, state.get_prices(), engine, writer)
+    assert [call[0] for call in writer.calls] == ["create", "create"]
+
+    updated = replace(
+        settings, watchlist=["ETH/USDT", "SOL/USDT"], kraken_fee=0.002, snapshot_interval_s=5
+    )
+    change = asyncio.run(service._apply_settings(updated))
+
+    assert change.removed["binance"] == {"BTC/USDT": "BTCUSDT"}
+    assert change.added["kraken"] == {"SOL/USDT": "SOL/USDT"}
+    assert change.engine_changed and change.restart_fields == ["snapshot_interval_s"]
+    closed = [call for call in writer.calls if call[0] == "close"]
+    assert len(closed) == 1 and writer.calls[closed[0][1] - 1][1] == "BTC/USDT"
+    assert service.settings.watchlist == ["ETH/USDT", "SOL/USDT"]
+    assert service.settings.snapshot_interval_s == 1
+    assert set(engine.open_events()) == {("ETH/USDT", writer.calls[1][2])}
+
+    later = now + timedelta(seconds=1)
+    metrics = service._process_arbitrage(later, state.get_prices(), engine, writer)
+    assert {row[1] for row in metrics} == {"ETH/USDT"}
+    reference = ArbitrageEngine({"binance": 0.0, "kraken": 0.002}, 0.1)
+    expected = {
+        result.direction: result.net_pct
+        for result in (
+            reference.compute("ETH/USDT", "kraken", 101.0, "binance", 100.1),
+            reference.compute("ETH/USDT", "binance", 100.0, "kraken", 101.1),
+        )
+    }
+    assert {row[2]: row[4] for row in metrics} == pytest.approx(expected)
+    assert [call[0] for call in writer.calls[2:]] == ["close"]
+    assert diff_settings(service.settings, service.settings).empty
+
+
+def test_collectors_resubscribe_live_without_reconnecting() -> None:
+    async def scenario() -> tuple[SharedState, list, MockExchangeServer]:
+        server = MockExchangeServer(rate=1000)
+        await server.start()
+        state = SharedState()
+        stop_event = threading.Event()
+        collectors = [
+            BinanceCollector({"BTC/USDT": "BTCUSDT"}, state, stop_event, url=server.binance_url),
+            KrakenCollector({"BTC/USDT": "XBT/USDT"}, state, stop_event, url=server.kraken_url),
+        ]
+        tasks = [asyncio.create_task(collector.run()) for collector in collectors]
+        await asyncio.sleep(0.5)
+        assert set(state.get_prices()["kraken"]) == {"BTC/USDT"}
+        await collectors[0].update_symbols({"ETH/USDT": "ETHUSDT"})
+        await collectors[1].update_symbols({"ETH/USDT": "ETH/USDT"})
+        await asyncio.sleep(0.5)
+        stop_event.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await server.stop()
+        return state, collectors, server
+
+    state, collectors, server = asyncio.run(scenario())
+
+    assert server.stats.connections == 2
+    prices = state.get_prices()
+    for collector in collectors:
+        assert set(prices[collector.exchange]) == {"ETH/USDT"}
+        assert all(stats.reconnects == 0 for stats in collector.stats.values())
+    assert collectors[0].shards == [["ETHUSDT"]]
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from app.storage.db import init_db
+from app.storage.metrics_cache import MetricsCache
+from app.storage.repository import Repository
+
+DIRECTIONS = ("binance_sell/kraken_buy", "kraken_sell/binance_buy")
+
+
+def _insert(repository: Repository, start: datetime, seconds: range) -> None:
+    repository.bulk_insert_metrics(
+        [
+            (start + timedelta(seconds=i), symbol, direction, 1.0, float(i))
+            for i in seconds
+            for symbol in ("BTC/USDT", "ETH/USDT")
+            for direction in DIRECTIONS
+        ]
+    )
+
+
+def test_incremental_window_fetches_only_new_rows(tmp_path) -> None:
+    db_path = str(tmp_path / "app.db")
+    init_db(db_path)
+    repository = Repository(db_path)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    start = now - timedelta(minutes=30)
+    _insert(repository, start, range(0, 600))
+    cache = MetricsCache(
+        Repository(db_path, read_only=True), max_window_s=900, min_refresh_s=0, evict_slack_s=0
+    )
+
+    window = cache.window("BTC/USDT", start, start + timedelta(seconds=600))
+    assert len(window) == 1200
+    assert cache.stats().rows_fetched == 1200
+
+    _insert(repository, start, range(600, 660))
+    end = start + timedelta(seconds=660)
+    window = cache.window("BTC/USDT", start + timedelta(seconds=60), end)
+    stats = cache.stats()
+    assert stats.full_loads == 1 and stats.refreshes == 1
+    assert stats.rows_fetched == 1200 + 120
+    expected = repository.metrics_frame("BTC/USDT", start + timedelta(seconds=60), end)
+    assert window["net_pct"].tolist() == expected["net_pct"].tolist()
+    assert window["timestamp"].tolist() == expected["timestamp"].tolist()
+
+    assert cache.window("BTC/USDT", start - timedelta(minutes=5), end)["net_pct"].min() == 0.0
+    assert cache.stats().backfills == 1
+
+    late = (start + timedelta(seconds=300), "BTC/USDT", DIRECTIONS[0], 1.0, -1.0)
+    repository.bulk_insert_metrics([late])
+    assert cache.window("BTC/USDT", start, end)["net_pct"].min() == -1.0
+
+    _insert(repository, start, range(1200, 1500))
+    later = start + timedelta(seconds=1500)
+    window = cache.window("BTC/USDT", later - timedelta(minutes=5), later)
+    assert window["net_pct"].min() == 1200.0
+    cached = cache._windows["BTC/USDT"].frame
+    assert cached["timestamp"].min() >= later - timedelta(seconds=900)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from app.collectors import binance
+from app.collectors.binance import BinanceCollector
+from app.collectors.kraken import KrakenCollector
+from app.collectors.mock_exchange import MockExchangeServer
+from app.core.state import SharedState
+
+WATCHLIST = {"BTC/USDT": ("BTCUSDT", "XBT/USDT"), "ETH/USDT": ("ETHUSDT", "ETH/USDT")}
+
+
+def test_collectors_stream_from_mock_exchange() -> None:
+    async def scenario() -> tuple[SharedState, MockExchangeServer]:
+        server = MockExchangeServer(rate=2000, disconnect_every_s=0.3)
+        await server.start()
+        state = SharedState()
+        stop_event = threading.Event()
+        collectors = [
+            BinanceCollector(
+                {symbol: pair[0] for symbol, pair in WATCHLIST.items()},
+                state,
+                stop_event,
+                url=server.binance_url,
+            ),
+            KrakenCollector(
+                {symbol: pair[1] for symbol, pair in WATCHLIST.items()},
+                state,
+                stop_event,
+                url=server.kraken_url,
+            ),
+        ]
+        tasks = [asyncio.create_task(collector.run()) for collector in collectors]
+        await asyncio.sleep(0.5)
+        stop_event.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await server.stop()
+        return state, server
+
+    state, server = asyncio.run(scenario())
+
+    prices = state.get_prices()
+    for exchange in ("binance", "kraken"):
+        assert set(prices[exchange]) == set(WATCHLIST)
+        for quote in prices[exchange].values():
+            assert 0 < quote.bid < quote.ask
+    assert prices["kraken"]["BTC/USDT"].volume_24h is not None
+    assert server.stats.binance_sent > 100
+    assert server.stats.kraken_sent > 100
+    assert server.stats.disconnects >= 2
+
+
+def test_binance_collector_shards_symbols_across_connections(monkeypatch) -> None:
+    monkeypatch.setattr(binance, "STATS_INTERVAL_S", 0.1)
+    symbols = {f"S{index}/USDT": f"S{index}USDT" for index in range(6)}
+
+    async def scenario() -> tuple[SharedState, BinanceCollector]:
+        server = MockExchangeServer(rate=500)
+        await server.start()
+        state = SharedState()
+        stop_event = threading.Event()
+        collector = BinanceCollector(symbols, state, stop_event, url=server.binance_url, connections=3)
+        task = asyncio.create_task(collector.run())
+        await asyncio.sleep(0.5)
+        stop_event.set()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await server.stop()
+        return state, collector
+
+    state, collector = asyncio.run(scenario())
+
+    assert sorted(len(shard) for shard in collector.shards) == [2, 2, 2]
+    assert "s0usdt@bookticker" not in collector._build_stream_url(collector.shards[1]).lower()
+    assert set(state.get_prices()["binance"]) == set(symbols)
+    streams = state.get_stream_stats()
+    assert sorted(streams) == ["binance#0", "binance#1", "binance#2"]
+    for stream in streams.values():
+        assert stream.streams == 4 and stream.messages > 0 and stream.rate > 0
+
+    wide = BinanceCollector({f"S{i}/USDT": f"S{i}USDT" for i in range(150)}, SharedState())
+    assert len(wide.shards) == 2
+    limit = binance.MAX_STREAMS_PER_CONNECTION
+    assert all(len(wide._streams(shard)) <= limit for shard in wide.shards)
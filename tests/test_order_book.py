@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+import zlib
+
+from app.collectors.binance import BinanceCollector
+from app.collectors.kraken import KrakenCollector, subscription_depth
+from app.core.order_book import OrderBook
+from app.core.state import SharedState
+
+
+def test_order_book_levels_and_kraken_checksum() -> None:
+    book = OrderBook(depth=2)
+    book.apply_many(book.bids, [["100.1", "1.5"], ["100.3", "0.25"], ["99.9", "3"]])
+    book.apply_many(book.asks, [["100.5", "0.1"], ["100.4", "2.00"], ["101.0", "4"]])
+    book.apply(book.asks, "100.4", "0.00000000")
+    book.truncate()
+
+    assert book.best_bid() == (100.3, 0.25)
+    assert book.best_ask() == (100.5, 0.1)
+    assert list(book.walk(book.bids)) == [(100.3, 0.25), (100.1, 1.5)]
+    assert list(book.walk(book.asks, 1)) == [(100.5, 0.1)]
+    assert zlib.crc32(b"10051" b"10104" b"100325" b"100115") == book.kraken_checksum()
+
+
+def test_binance_depth_buffers_until_snapshot_and_resyncs_on_gap() -> None:
+    state = SharedState()
+    collector = BinanceCollector({"BTC/USDT": "BTCUSDT"}, state, book_depth=5)
+    book = state.books[("binance", "BTC/USDT")]
+
+    def depth(first: int, last: int, bids, asks) -> None:
+        data = {"e": "depthUpdate", "s": "BTCUSDT", "U": first, "u": last, "b": bids, "a": asks}
+        collector._handle_message(json.dumps({"data": data}))
+
+    depth(1, 5, [["99", "9"]], [])
+    depth(8, 12, [["100", "2"]], [["101", "0"]])
+    depth(13, 14, [], [["102", "1"]])
+    assert not book.ready and collector._pending == {"BTCUSDT"}
+
+    snapshot = {"lastUpdateId": 10, "bids": [["100", "1"]], "asks": [["101", "1"]]}
+    assert collector._apply_snapshot("BTCUSDT", snapshot)
+    assert book.ready and book.update_id == 14
+    assert book.best_bid() == (100.0, 2.0)
+    assert book.best_ask() == (102.0, 1.0)
+
+    depth(15, 16, [["100.5", "1"]], [])
+    assert book.best_bid() == (100.5, 1.0)
+    depth(20, 21, [["100.7", "1"]], [])
+    assert not book.ready and not book.bids
+    assert collector._buffers["BTCUSDT"][0]["U"] == 20
+
+
+def test_kraken_book_checksum_mismatch_triggers_resubscribe() -> None:
+    state = SharedState()
+    collector = KrakenCollector({"BTC/USDT": "XBT/USDT"}, state, book_depth=10)
+    book = state.books[("kraken", "BTC/USDT")]
+    assert collector.book_depth == subscription_depth(10) == 10
+
+    snapshot = {"as": [["101.0", "1.0", "1"]], "bs": [["100.0", "2.0", "1"]]}
+    collector._handle_message(json.dumps([7, snapshot, "book-10", "XBT/USDT"]))
+    book.apply(book.asks, "100.5", "3.0")
+    checksum = book.kraken_checksum()
+    book.apply(book.asks, "100.5", "0")
+    update = [7, {"a": [["100.5", "3.0", "2"]]}, {"b": [], "c": str(checksum)}]
+    collector._handle_message(json.dumps([*update, "book-10", "XBT/USDT"]))
+    assert book.ready and book.best_ask() == (100.5, 3.0)
+    assert not collector._resubscribe
+
+    update = [7, {"b": [["100.2", "1.0", "3"]], "c": "1"}, "book-10", "XBT/USDT"]
+    collector._handle_message(json.dumps(update))
+    assert not book.ready
+    assert collector._resubscribe == {"XBT/USDT"}
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event, inspect
+
+from app.storage.db import get_engine, init_db
+from app.storage.repository import Repository
+from app.storage.rollup import RollupJob
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+SYMBOLS = [f"S{i}/USDT" for i in range(20)]
+EXCHANGES = ("binance", "kraken")
+DIRECTIONS = ("binance_sell/kraken_buy", "kraken_sell/binance_buy")
+SECONDS = 1500
+# One row per (source, tier): a scan is the cheapest plan and stays bounded.
+SMALL_TABLES = ("rollup_watermarks",)
+LEGACY_SCHEMA = """
+CREATE TABLE snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp DATETIME, exchange VARCHAR(20),
+    symbol_std VARCHAR(20), bid FLOAT, ask FLOAT, last FLOAT, volume_24h FLOAT,
+    spread_abs FLOAT, spread_pct FLOAT
+);
+CREATE INDEX ix_snapshots_timestamp ON snapshots (timestamp);
+CREATE INDEX ix_snapshots_exchange ON snapshots (exchange);
+CREATE INDEX ix_snapshots_symbol_std ON snapshots (symbol_std);
+"""
+
+
+@pytest.fixture(scope="module")
+def seeded(tmp_path_factory) -> tuple[str, Repository]:
+    db_path = str(tmp_path_factory.mktemp("plans") / "app.db")
+    with get_engine(db_path).begin() as connection:
+        for statement in LEGACY_SCHEMA.split(";"):
+            if statement.strip():
+                connection.exec_driver_sql(statement)
+    init_db(db_path)
+    init_db(db_path)
+    repository = Repository(db_path)
+    rng = random.Random(1)
+    for offset in range(0, SECONDS, 300):
+        snapshots, metrics = [], []
+        for second in range(offset, offset + 300):
+            ts = START + timedelta(seconds=second)
+            for symbol in SYMBOLS:
+                for exchange in EXCHANGES:
+                    bid = 100 + rng.random()
+                    snapshots.append((ts, exchange, symbol, bid, bid + 0.1, bid, 1.0, 0.1, 0.1))
+                for direction in DIRECTIONS:
+                    metrics.append((ts, symbol, direction, rng.random(), rng.random()))
+        repository.bulk_insert_snapshots(snapshots)
+        repository.bulk_insert_metrics(metrics)
+    for i in range(500):
+        repository.create_event(
+            symbol_std=SYMBOLS[i % len(SYMBOLS)],
+            direction=DIRECTIONS[i % 2],
+            start_ts=START + timedelta(seconds=i),
+            max_net_pct=0.5,
+            avg_net_pct=0.3,
+        )
+    RollupJob(repository, lag_s=0).run_once(now=START + timedelta(seconds=SECONDS))
+    with get_engine(db_path).begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+    return db_path, repository
+
+
+def test_migration_adds_composite_indexes(seeded) -> None:
+    db_path, _ = seeded
+    indexes = {index["name"] for index in inspect(get_engine(db_path)).get_indexes("snapshots")}
+    assert {"ix_snapshots_symbol_ts", "ix_snapshots_exchange_symbol_ts"} <= indexes
+    assert "ix_snapshots_symbol_std" not in indexes
+
+
+def test_repository_queries_never_scan_tables(seeded) -> None:
+    db_path, repository = seeded
+    engine = get_engine(db_path)
+    captured: list[tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany) -> None:
+        if statement.lstrip().upper().startswith(("SELECT", "DELETE")) and not executemany:
+            captured.append((statement, parameters))
+
+    end = START + timedelta(seconds=SECONDS)
+    window = (START + timedelta(minutes=5), START + timedelta(minutes=10))
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        repository.list_events(START, end)
+        repository.list_events(START, end, SYMBOLS[0])
+        repository.list_events(START, end, SYMBOLS[0], DIRECTIONS[0], 0.2)
+        repository.list_snapshots(*window)
+        repository.list_snapshots(*window, SYMBOLS[3])
+        repository.list_snapshots(*window, exchange="kraken")
+        repository.list_snapshots(*window, SYMBOLS[3], "kraken")
+        repository.list_snapshots(START, end, SYMBOLS[3], "kraken", max_points=100)
+        repository.list_metrics(SYMBOLS[5], *window)
+        repository.list_metrics(SYMBOLS[5], START, end, max_points=10)
+        repository.metrics_since(SYMBOLS[5], window[1] - timedelta(seconds=5), 1000)
+        repository.metrics_since(SYMBOLS[5], None, 1000)
+        repository.count_events(START, end, SYMBOLS[0])
+        list(repository.iter_events(START, end, SYMBOLS[0], batch_size=10))
+        repository.count_snapshots(*window, SYMBOLS[3])
+        list(repository.iter_snapshots(*window, batch_size=2000))
+        list(repository.iter_snapshots(*window, SYMBOLS[3], batch_size=100))
+        list(repository.iter_snapshots(*window, SYMBOLS[3], "kraken", batch_size=100))
+        RollupJob(repository, raw_retention_days=1, lag_s=0).run_once(
+            now=end + timedelta(days=1)
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert captured
+    with engine.connect() as connection:
+        for statement, parameters in captured:
+            plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            details = [row[-1] for row in plan]
+            scans = [
+                d
+                for d in details
+                if d.startswith("SCAN")
+                and "CONSTANT ROW" not in d
+                and not d.startswith(tuple(f"SCAN {t}" for t in SMALL_TABLES))
+            ]
+            assert not scans, f"{statement}\n{details}"
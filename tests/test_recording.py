@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+from app.collectors.binance import BinanceCollector
+from app.collectors.kraken import KrakenCollector
+from app.collectors.recording import FrameRecorder, FrameReplayer, list_segments, read_frames
+from app.core.state import SharedState
+
+BASE_NS = 1_700_000_000_000_000_000
+
+
+def _binance_book(bid: float) -> str:
+    data = {"e": "bookTicker", "s": "BTCUSDT", "b": str(bid), "a": str(bid + 1)}
+    return json.dumps({"stream": "btcusdt@bookTicker", "data": data})
+
+
+def _kraken_ticker(bid: float) -> str:
+    data = {
+        "b": [str(bid), 1, "1.0"],
+        "a": [str(bid + 1), 1, "1.0"],
+        "c": [str(bid), "0.1"],
+        "v": ["1", "2"],
+    }
+    return json.dumps([42, data, "ticker", "XBT/USDT"])
+
+
+def _record_session(tmp_path) -> list[tuple[int, str, str]]:
+    frames = []
+    for i in range(200):
+        frames.append((BASE_NS + i * 5_000_000, "binance", _binance_book(100.0 + i)))
+        frames.append((BASE_NS + i * 5_000_000 + 1, "kraken", _kraken_ticker(200.0 + i)))
+    frames.append((BASE_NS + 2_000_000_000, "kraken", '{"event":"heartbeat"}'))
+    recorder = FrameRecorder(tmp_path, segment_bytes=8_000)
+    for recv_ns, exchange, frame in frames:
+        recorder.record(exchange, frame, recv_ns)
+    recorder.close()
+    return frames
+
+
+def test_recorder_rotates_segments_and_preserves_order(tmp_path) -> None:
+    frames = _record_session(tmp_path)
+
+    segments = list_segments(tmp_path)
+    assert len(segments) > 1
+    assert list(read_frames(segments)) == frames
+
+
+def test_replay_feeds_collectors_at_max_and_scaled_speed(tmp_path) -> None:
+    _record_session(tmp_path)
+
+    def replay(speed: float | None):
+        state = SharedState()
+        collectors = [
+            BinanceCollector({"BTC/USDT": "BTCUSDT"}, state),
+            KrakenCollector({"BTC/USDT": "XBT/USDT"}, state),
+        ]
+        handlers = {c.exchange: c._handle_message for c in collectors}
+        replayer = FrameReplayer.from_directory(tmp_path, speed=speed)
+        return state, asyncio.run(replayer.run(handlers))
+
+    state, stats = replay(None)
+    assert stats.frames == 401
+    assert stats.skipped == stats.failed == 0
+    assert stats.recorded_span_s == 2.0
+    prices = state.get_prices()
+    assert prices["binance"]["BTC/USDT"].bid == 299.0
+    assert prices["kraken"]["BTC/USDT"].ask == 400.0
+
+    _, paced = replay(20.0)
+    assert paced.frames == 401
+    assert 0.1 <= paced.elapsed_s < 1.0
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from app.storage.db import get_engine, init_db
+from app.storage.repository import SNAPSHOT_KEYFRAME_S, Repository
+from app.storage.rollup import RollupJob
+
+
+def _repository(tmp_path) -> Repository:
+    db_path = str(tmp_path / "app.db")
+    init_db(db_path)
+    return Repository(db_path)
+
+
+def test_bulk_insert_accepts_tuples_and_columns(tmp_path) -> None:
+    repository = _repository(tmp_path)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    inserted = repository.bulk_insert_metrics(
+        [(start, "BTC/USDT", "binance_sell/kraken_buy", 1.0, 0.3)]
+    )
+    inserted += repository.bulk_insert_metrics(
+        {
+            "timestamp": [start + timedelta(seconds=1), start + timedelta(seconds=2)],
+            "symbol_std": ["BTC/USDT", "BTC/USDT"],
+            "direction": ["binance_sell/kraken_buy", "kraken_sell/binance_buy"],
+            "raw_spread": [1.5, -2.0],
+            "net_pct": [0.4, -0.5],
+        }
+    )
+    assert inserted == 3
+    metrics = repository.list_metrics("BTC/USDT", start, start + timedelta(minutes=1))
+    assert sorted(metric.net_pct for metric in metrics) == [-0.5, 0.3, 0.4]
+
+
+def test_engine_registry_and_concurrent_read_write(tmp_path) -> None:
+    db_path = str(tmp_path / "app.db")
+    assert init_db(db_path) is get_engine(db_path)
+    writer = Repository(db_path)
+    reader = Repository(db_path, read_only=True)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    writer.bulk_insert_metrics([(start, "BTC/USDT", "binance_sell/kraken_buy", 1.0, 0.3)])
+
+    with get_engine(db_path).connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+
+    with reader.session_scope() as session:
+        cursor = session.execute(text("SELECT id FROM arbitrage_metrics"))
+        assert cursor.fetchone() is not None
+        writer.bulk_insert_metrics(
+            [(start + timedelta(seconds=1), "BTC/USDT", "binance_sell/kraken_buy", 1.0, 0.3)]
+        )
+        cursor.close()
+
+    assert len(reader.list_metrics("BTC/USDT", start, start + timedelta(minutes=1))) == 2
+
+
+def test_frames_match_orm_reads_across_archive_rollups_and_raw(tmp_path) -> None:
+    repository = _repository(tmp_path)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    timestamps = [start + timedelta(minutes=i) for i in range(3 * 1440)]
+    repository.bulk_insert_snapshots(
+        [
+            (ts, "kraken", "BTC/USDT", 100.0 + i, 101.0 + i, None, None, 1.0, 1.0)
+            for i, ts in enumerate(timestamps)
+        ]
+    )
+    repository.bulk_insert_metrics(
+        [
+            (ts, "BTC/USDT", "kraken_sell/binance_buy", 1.0, float(i))
+            for i, ts in enumerate(timestamps)
+        ]
+    )
+    repository.create_event("BTC/USDT", "kraken_sell/binance_buy", start, 0.5, 0.3)
+    RollupJob(repository, lag_s=0).run_once(now=start + timedelta(days=2, hours=12))
+    repository.archive.seal_closed_days(repository, today=date(2024, 1, 10))
+    end = start + timedelta(days=3)
+
+    for max_points in (None, 100):
+        frame = repository.snapshots_frame(start, end, "BTC/USDT", "kraken", max_points=max_points)
+        snapshots = repository.list_snapshots(start, end, "BTC/USDT", "kraken", max_points)
+        assert str(frame["timestamp"].dtype) == "datetime64[us, UTC]"
+        assert frame["last"].dtype == "float64"
+        assert frame["bid"].tolist() == [snap.bid for snap in snapshots]
+        assert [ts.to_pydatetime() for ts in frame["timestamp"]] == [
+            snap.timestamp.replace(tzinfo=timezone.utc) for snap in snapshots
+        ]
+
+        metrics = repository.metrics_frame("BTC/USDT", start, end, max_points=max_points)
+        assert metrics["net_pct"].tolist() == [
+            m.net_pct for m in repository.list_metrics("BTC/USDT", start, end, max_points)
+        ]
+
+    events = repository.events_frame(start, end)
+    assert events[["id", "duration_s"]].dtypes.tolist() == ["int64", "int64"]
+    assert events["end_ts"].isna().all()
+    assert repository.metrics_frame("ETH/USDT", start, end).empty
+
+
+def test_fill_gaps_forward_fills_delta_snapshots(tmp_path) -> None:
+    repository = _repository(tmp_path)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    repository.bulk_insert_snapshots(
+        [
+            (start, "binance", "BTC/USDT", 100.0, 100.1, None, None, 0.1, 0.1),
+            (start, "kraken", "BTC/USDT", 100.2, 100.3, 100.25, 5.0, 0.1, 0.1),
+            (start + timedelta(seconds=2), "binance", "BTC/USDT", 101.0, 101.1, None, None, 0, 0),
+            (start + timedelta(seconds=3), "kraken", "BTC/USDT", 102.0, 102.1, None, None, 0, 0),
+        ]
+    )
+    window = (start + timedelta(seconds=1), start + timedelta(seconds=5))
+
+    assert len(repository.list_snapshots(*window)) == 2
+    snapshots = repository.list_snapshots(*window, fill_gaps=True)
+    expected = [
+        (2, "binance", 101.0),
+        (2, "kraken", 100.2),
+        (3, "binance", 101.0),
+        (3, "kraken", 102.0),
+    ]
+    assert [
+        (snap.timestamp.second, snap.exchange, snap.bid)
+        for snap in sorted(snapshots, key=lambda snap: (snap.timestamp, snap.exchange))
+    ] == expected
+    assert [snap.last for snap in snapshots if snap.exchange == "kraken"].count(100.25) == 1
+
+    frame = repository.snapshots_frame(*window, fill_gaps=True, columns=("timestamp", "bid"))
+    assert list(frame.columns) == ["timestamp", "bid"]
+    assert frame["bid"].tolist() == [bid for _, _, bid in expected]
+    kraken = repository.snapshots_frame(*window, exchange="kraken", fill_gaps=True)
+    assert kraken["bid"].tolist() == [102.0]
+
+
+def test_fill_gaps_stops_at_the_keyframe_that_drops_a_pair(tmp_path) -> None:
+    repository = _repository(tmp_path)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = [
+        (0, "binance", 100.0),
+        (0, "kraken", 200.0),
+        (10, "binance", 101.0),
+        (SNAPSHOT_KEYFRAME_S, "binance", 102.0),
+        (SNAPSHOT_KEYFRAME_S + 10, "binance", 103.0),
+    ]
+    repository.bulk_insert_snapshots(
+        [
+            (start + timedelta(seconds=second), exchange, "BTC/USDT", bid, bid, None, None, 0, 0)
+            for second, exchange, bid in rows
+        ]
+    )
+    window = (start + timedelta(seconds=5), start + timedelta(seconds=SNAPSHOT_KEYFRAME_S + 20))
+    snapshots = repository.list_snapshots(*window, fill_gaps=True)
+    assert [snap.timestamp.second for snap in snapshots if snap.exchange == "kraken"] == [10]
+    frame = repository.snapshots_frame(*window, fill_gaps=True)
+    assert frame["exchange"].tolist() == ["binance", "kraken", "binance", "binance"]
+    assert frame["bid"].tolist() == [101.0, 200.0, 102.0, 103.0]
+
+
+def test_init_db_adds_missing_nullable_columns(tmp_path) -> None:
+    db_path = str(tmp_path / "old.db")
+    with get_engine(db_path).begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE arbitrage_metrics (id INTEGER PRIMARY KEY, timestamp DATETIME, "
+                "symbol_std VARCHAR(20), direction VARCHAR(40), raw_spread FLOAT, net_pct FLOAT)"
+            )
+        )
+    init_db(db_path)
+    repository = Repository(db_path)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    repository.bulk_insert_metrics([(start, "BTC/USDT", "binance_sell/kraken_buy", 1.0, 0.3)])
+    repository.bulk_insert_metrics(
+        [(start, "BTC/USDT", "kraken_sell/binance_buy", 1.0, 0.3, 0.25, 0.1)]
+    )
+    frame = repository.metrics_frame(
+        "BTC/USDT", start, start + timedelta(minutes=1), columns=("direction", "exec_qty")
+    )
+    assert sorted(frame["exec_qty"].fillna(0).tolist()) == [0.0, 0.25]
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from app.storage.db import init_db
+from app.storage.repository import Repository
+from app.storage.rollup import RollupJob
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+DIRECTION = "binance_sell/kraken_buy"
+
+
+def _seed(tmp_path, seconds: int) -> Repository:
+    db_path = str(tmp_path / "app.db")
+    init_db(db_path)
+    repository = Repository(db_path)
+    repository.bulk_insert_metrics(
+        [
+            (START + timedelta(seconds=i), "BTC/USDT", DIRECTION, float(i), float(i % 60))
+            for i in range(seconds)
+        ]
+    )
+    return repository
+
+
+def test_rollup_tiers_and_tiered_reads(tmp_path) -> None:
+    repository = _seed(tmp_path, 2 * 3600)
+    job = RollupJob(repository, lag_s=0)
+    stats = job.run_once(now=START + timedelta(hours=2, seconds=30))
+    assert stats.buckets["metrics:60"] == 120
+    assert stats.buckets["metrics:900"] == 8
+    assert stats.buckets["metrics:3600"] == 2
+    assert job.run_once(now=START + timedelta(hours=2, seconds=30)).buckets["metrics:60"] == 0
+
+    end = START + timedelta(hours=2)
+    minute = repository.list_metrics("BTC/USDT", START, end, max_points=200)
+    assert len(minute) == 120
+    assert minute[0].timestamp.replace(tzinfo=timezone.utc) == START
+    assert minute[0].net_pct == 29.5
+    hourly = repository.list_metrics("BTC/USDT", START, end, max_points=4)
+    assert [m.net_pct for m in hourly] == [29.5, 29.5]
+    assert len(repository.list_metrics("BTC/USDT", START, end)) == 2 * 3600
+
+
+def test_retention_only_removes_rolled_up_rows(tmp_path) -> None:
+    repository = _seed(tmp_path, 3600)
+    job = RollupJob(repository, raw_retention_days=1, lag_s=0, delete_batch_size=500)
+    stats = job.run_once(now=START + timedelta(days=1, minutes=30))
+    assert stats.deleted["metrics"] == 1800
+    remaining = repository.list_metrics("BTC/USDT", START, START + timedelta(hours=1))
+    assert len(remaining) == 30 + 1800
+    assert [m.net_pct for m in remaining[:30]] == [29.5] * 30
+    rolled = repository.list_metrics("BTC/USDT", START, START + timedelta(hours=1), max_points=100)
+    assert len(rolled) == 60
+
+    short = (START + timedelta(minutes=5), START + timedelta(minutes=10))
+    assert len(repository.list_metrics("BTC/USDT", *short)) == 5
+    assert len(repository.metrics_frame("BTC/USDT", *short)) == 5
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.config import Settings
+from app.core import scheduler
+from app.core.arbitrage import ArbitrageEngine
+from app.core.scheduler import MonitoringService
+from app.core.state import PriceData, SharedState
+
+
+class RecordingWriter:
+    def __init__(self) -> None:
+        self.snapshots: list[list[tuple]] = []
+        self.metrics: list[list[tuple]] = []
+
+    def add_snapshots(self, rows: list[tuple]) -> None:
+        self.snapshots.append(rows)
+
+    def add_metrics(self, rows: list[tuple]) -> None:
+        self.metrics.append(rows)
+
+
+def test_delta_snapshot_loop_only_processes_changed_quotes(monkeypatch) -> None:
+    monkeypatch.setattr(scheduler, "SNAPSHOT_KEYFRAME_S", 10**9)
+    watchlist = ["BTC/USDT", "ETH/USDT"]
+    state = SharedState()
+    for exchange in ("binance", "kraken"):
+        for symbol in watchlist:
+            state.update_price(exchange, symbol, PriceData(bid=100.0, ask=100.1))
+    service = MonitoringService(
+        Settings(watchlist=watchlist, snapshot_storage="delta"), state, latency=None
+    )
+    writer = RecordingWriter()
+    engine = ArbitrageEngine({"binance": 0.001, "kraken": 0.0026}, threshold_pct=5.0)
+
+    async def scenario() -> None:
+        loop = asyncio.create_task(service._snapshot_loop(writer, engine))
+        await asyncio.sleep(0.1)
+        state.update_price("kraken", "ETH/USDT", PriceData(bid=100.0, ask=100.1))
+        state.update_price("binance", "ETH/USDT", PriceData(bid=100.5, ask=100.6))
+        await asyncio.sleep(1.0)
+        service.stop_event.set()
+        loop.cancel()
+        await asyncio.gather(loop, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+    assert len(writer.snapshots[0]) == 4
+    assert [(row[1], row[2], row[3]) for row in writer.snapshots[1]] == [
+        ("binance", "ETH/USDT", 100.5)
+    ]
+    assert {row[1] for row in writer.metrics[0]} == set(watchlist)
+    assert {row[1] for row in writer.metrics[1]} == {"ETH/USDT"}
+    assert service.metrics_total == sum(len(rows) for rows in writer.metrics)
+
+
+def test_full_snapshot_loop_evaluates_every_symbol_each_interval() -> None:
+    watchlist = ["BTC/USDT", "ETH/USDT"]
+    state = SharedState()
+    for exchange in ("binance", "kraken"):
+        for symbol in watchlist:
+            state.update_price(exchange, symbol, PriceData(bid=100.0, ask=100.1))
+    service = MonitoringService(Settings(watchlist=watchlist), state, latency=None)
+    writer = RecordingWriter()
+    engine = ArbitrageEngine({"binance": 0.001, "kraken": 0.0026}, threshold_pct=5.0)
+
+    async def scenario() -> None:
+        loop = asyncio.create_task(service._snapshot_loop(writer, engine))
+        await asyncio.sleep(1.5)
+        service.stop_event.set()
+        loop.cancel()
+        await asyncio.gather(loop, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+    assert len(writer.metrics) == 2
+    assert all({row[1] for row in rows} == set(watchlist) for rows in writer.metrics)
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+
+import numpy as np
+
+from app.collectors.mock_exchange import MockExchangeServer
+from app.collectors.processes import CollectorPool, split_specs
+from app.core.shared_board import SEQ, SLOT_FIELDS, SharedPriceBoard
+from app.core.state import SharedState
+
+SYMBOLS = {f"S{index}/USDT": f"S{index}USDT" for index in range(4)}
+
+
+def test_shared_board_publishes_only_stable_changed_slots() -> None:
+    board = SharedPriceBoard.create([("binance", "BTC/USDT"), ("kraken", "BTC/USDT")])
+    reader = SharedPriceBoard.attach(board.name, board.keys)
+    try:
+        seen = np.zeros(len(board.keys), dtype=np.int64)
+        reader.write_book(0, 100.0, 100.5)
+        reader.write_ticker(1, 99.0, 5.0)
+        slots, values = board.changes(seen)
+        assert slots.tolist() == [0, 1]
+        assert values[0].tolist()[:2] == [100.0, 100.5]
+        assert math.isnan(values[1][0]) and values[1][2] == 99.0
+        assert not len(board.changes(seen)[0])
+
+        reader.ints[SLOT_FIELDS + SEQ] += 1
+        reader.floats[SLOT_FIELDS + 1] = 98.0
+        assert not len(board.changes(seen)[0])
+        reader.ints[SLOT_FIELDS + SEQ] += 1
+        slots, values = board.changes(seen)
+        assert slots.tolist() == [1] and values[0][0] == 98.0
+        assert board.writes() == 3
+    finally:
+        reader.close()
+        board.close()
+
+
+def test_collector_processes_feed_shared_state() -> None:
+    async def scenario() -> tuple[SharedState, CollectorPool]:
+        server = MockExchangeServer(rate=1000)
+        await server.start()
+        state = SharedState()
+        specs = split_specs("binance", SYMBOLS, 2, server.binance_url)
+        specs += split_specs("kraken", {symbol: symbol for symbol in SYMBOLS}, 1, server.kraken_url)
+        pool = CollectorPool(specs, state)
+        pool.start()
+        task = asyncio.create_task(pool.run())
+        deadline = time.monotonic() + 15
+        try:
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.1)
+                prices = state.get_prices()
+                if all(len(prices.get(exchange, {})) == 4 for exchange in ("binance", "kraken")):
+                    break
+        finally:
+            task.cancel()
+            await asyncio.to_thread(pool.stop)
+            await server.stop()
+        return state, pool
+
+    state, pool = asyncio.run(scenario())
+
+    assert [len(spec.symbols_map) for spec in pool.specs] == [2, 2, 4]
+    prices = state.get_prices()
+    for exchange in ("binance", "kraken"):
+        assert set(prices[exchange]) == set(SYMBOLS)
+        assert all(0 < quote.bid < quote.ask for quote in prices[exchange].values())
+    assert state.get_status()["binance"].connected
+    assert all(not process.is_alive() for process in pool.processes)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.config import Settings
+from app.core.scheduler import MonitoringService
+from app.core.spread_matrix import SpreadMatrixEngine
+from app.core.state import PriceData, SharedState
+
+
+class RecordingWriter:
+    def __init__(self) -> None:
+        self.calls: list[tuple] = []
+
+    def create_event(self, ref, **kwargs) -> None:
+        self.calls.append(("create", tuple(sorted(kwargs.items()))))
+        ref.event_id = len(self.calls)
+
+    def close_event(self, ref, *args) -> None:
+        self.calls.append(("close", (ref.event_id, *args)))
+
+
+def _run(engine_mode: str, ticks: list[dict]) -> tuple[list, list]:
+    settings = Settings(watchlist=["BTC/USDT", "ETH/USDT"], engine_mode=engine_mode, min_net_pct=0.1)
+    service = MonitoringService(settings, SharedState())
+    engine = service._build_engine()
+    writer = RecordingWriter()
+    metrics = []
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for i, prices in enumerate(ticks):
+        now = start + timedelta(seconds=i)
+        metrics.extend(service._process_arbitrage(now, prices, engine, writer))
+    return metrics, writer.calls
+
+
+def test_matrix_engine_matches_pairwise_engine() -> None:
+    rng = random.Random(7)
+    ticks = []
+    for _ in range(300):
+        prices: dict[str, dict[str, PriceData]] = {"binance": {}, "kraken": {}}
+        for exchange in prices:
+            for symbol, base in (("BTC/USDT", 100.0), ("ETH/USDT", 10.0)):
+                if rng.random() < 0.05:
+                    continue
+                bid = base * (1 + rng.uniform(-0.004, 0.004))
+                prices[exchange][symbol] = PriceData(bid=bid, ask=bid * 1.0001)
+        ticks.append(prices)
+
+    pairwise_metrics, pairwise_calls = _run("pairwise", ticks)
+    matrix_metrics, matrix_calls = _run("matrix", ticks)
+    assert any(call[0] == "close" for call in pairwise_calls)
+    assert matrix_metrics == pairwise_metrics
+    assert matrix_calls == pairwise_calls
+
+
+def test_matrix_engine_covers_every_exchange_pair() -> None:
+    engine = SpreadMatrixEngine(
+        ["BTC/USDT"], {"binance": 0.0, "kraken": 0.0, "coinbase": 0.0}, threshold_pct=0.5
+    )
+    engine.update_quote("BTC/USDT", "binance", 100.0, 100.1)
+    engine.update_quote("BTC/USDT", "kraken", 99.0, 99.1)
+    engine.update_quote("BTC/USDT", "coinbase", 101.0, 101.1)
+    step = engine.step(datetime.now(timezone.utc))
+    assert step.net_pct.shape == (1, 3, 3)
+    assert np.isnan(np.diagonal(step.net_pct[0])).all()
+    started = {t.direction for t in step.transitions if t.action == "start"}
+    assert started == {"binance_sell/kraken_buy", "coinbase_sell/binance_buy", "coinbase_sell/kraken_buy"}
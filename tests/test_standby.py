@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+
+from app.collectors.binance import BinanceCollector
+from app.collectors.kraken import KrakenCollector
+from app.collectors.mock_exchange import MockExchangeServer
+from app.core.latency import PipelineLatency
+from app.core.state import SharedState
+
+WATCHLIST = {"BTC/USDT": ("BTCUSDT", "XBT/USDT"), "ETH/USDT": ("ETHUSDT", "ETH/USDT")}
+
+
+def _book_ticker(update_id: int, bid: float) -> str:
+    data = {"e": "bookTicker", "u": update_id, "s": "BTCUSDT", "b": str(bid), "a": str(bid + 1)}
+    return json.dumps({"data": data})
+
+
+def test_standby_dedups_by_sequence_and_follows_one_kraken_leader() -> None:
+    state = SharedState()
+    binance = BinanceCollector({"BTC/USDT": "BTCUSDT"}, state, standby=True)
+    for update_id, bid in [(5, 100.0), (5, 100.0), (4, 99.0), (6, 101.0)]:
+        binance._handle_message(_book_ticker(update_id, bid))
+    assert binance.duplicates == 2
+    assert state.get_prices()["binance"]["BTC/USDT"].bid == 101.0
+    assert [name for name, _ in binance.connections] == ["binance#0", "binance#0b"]
+
+    kraken = KrakenCollector({"BTC/USDT": "XBT/USDT"}, state, standby=True)
+    kraken._set_connected("kraken#0", True, "connected")
+    kraken._set_connected("kraken#0b", True, "connected")
+    kraken._last_seen["kraken#0"] = time.monotonic()
+    assert kraken._accept("kraken#0") and not kraken._accept("kraken#0b")
+    ticker = [1, {"a": ["101", 0, "1"], "b": ["100", 0, "1"], "c": ["100", "1"]}, "ticker"]
+    kraken._handle_message(json.dumps([*ticker, "XBT/USDT"]))
+    kraken._handle_message(json.dumps([*ticker, "XBT/USDT"]))
+    assert kraken.duplicates == 1
+
+    kraken._set_connected("kraken#0", False, "closed")
+    assert kraken._accept("kraken#0b")
+    assert kraken.stats["kraken#0"].failovers == 1
+    kraken._last_seen["kraken#0b"] = time.monotonic() - 60
+    kraken._set_connected("kraken#0", True, "connected")
+    assert kraken._accept("kraken#0")
+    assert kraken.stats["kraken#0b"].failovers == 1
+
+
+def test_hot_standby_survives_random_connection_kills() -> None:
+    async def scenario() -> tuple[list, MockExchangeServer, PipelineLatency]:
+        server = MockExchangeServer(
+            rate=2000, disconnect_every_s=0.3, random_disconnects=True, seed=5
+        )
+        await server.start()
+        state = SharedState()
+        stop_event = threading.Event()
+        latency = PipelineLatency()
+        collectors = [
+            BinanceCollector(
+                {symbol: pair[0] for symbol, pair in WATCHLIST.items()},
+                state,
+                stop_event,
+                url=server.binance_url,
+                latency=latency,
+                standby=True,
+            ),
+            KrakenCollector(
+                {symbol: pair[1] for symbol, pair in WATCHLIST.items()},
+                state,
+                stop_event,
+                url=server.kraken_url,
+                latency=latency,
+                standby=True,
+            ),
+        ]
+        tasks = [asyncio.create_task(collector.run()) for collector in collectors]
+        await asyncio.sleep(2.0)
+        stop_event.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await server.stop()
+        return collectors, server, latency
+
+    collectors, server, latency = asyncio.run(scenario())
+
+    assert server.stats.disconnects >= 6
+    gaps = {row.source: row for row in latency.summary() if row.stage == "gap"}
+    for collector in collectors:
+        stats = list(collector.stats.values())
+        assert len(stats) == 2
+        assert sum(item.duplicates for item in stats) > 100
+        assert sum(item.failovers for item in stats) >= 1
+        assert sum(item.gap_ms for item in stats) < 1000
+        ended = gaps.get(collector.exchange)
+        assert (ended.count if ended else 0) <= sum(item.gaps for item in stats)
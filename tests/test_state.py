@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.core import price_board
+from app.core.price_board import ExchangeBoard
+from app.core.state import PriceData, SharedState, TickSubscription
+
+
+def test_tick_subscription_coalesces_changed_symbols() -> None:
+    async def scenario() -> set[str]:
+        state = SharedState()
+        subscription = TickSubscription()
+        state.subscribe(subscription)
+        state.update_price("binance", "BTC/USDT", PriceData(bid=100.0, ask=100.1))
+        state.update_price("kraken", "BTC/USDT", PriceData(bid=100.0, ask=100.1))
+        state.update_price("kraken", "ETH/USDT", PriceData(bid=10.0, ask=10.1))
+        changed = await asyncio.wait_for(subscription.wait(), timeout=1)
+        state.unsubscribe(subscription)
+        state.update_price("binance", "SOL/USDT", PriceData(bid=1.0, ask=1.1))
+        assert not subscription._pending
+        return changed
+
+    assert asyncio.run(scenario()) == {"BTC/USDT", "ETH/USDT"}
+
+
+def test_price_views_are_versioned_and_shared_until_next_write() -> None:
+    state = SharedState()
+    state.update_price("binance", "BTC/USDT", PriceData(bid=100.0, ask=100.1))
+    state.update_price("kraken", "BTC/USDT", PriceData(bid=100.2, ask=100.3))
+    first = state.snapshot()
+    assert first.version == state.version == 2
+    assert state.snapshot() is first
+
+    state.update_price("kraken", "ETH/USDT", PriceData(bid=10.0, ask=10.1))
+    second = state.snapshot()
+    assert second.version == 3
+    assert second.prices["binance"] is first.prices["binance"]
+    assert "ETH/USDT" not in first.prices["kraken"]
+    assert second.prices["kraken"]["ETH/USDT"].bid == 10.0
+    assert state.changed_since(first.version) == {("kraken", "ETH/USDT")}
+    assert state.changed_since(0) == {
+        ("binance", "BTC/USDT"),
+        ("kraken", "BTC/USDT"),
+        ("kraken", "ETH/USDT"),
+    }
+    assert state.board("binance").changed_since(first.version) == []
+    assert state.board("kraken").changed_since(first.version) == ["ETH/USDT"]
+
+
+def test_price_board_updates_rows_in_place() -> None:
+    state = SharedState()
+    board = state.board("binance")
+    rows = [state.slot("binance", f"S{index}/USDT") for index in range(100)]
+    assert rows == list(range(100)) and board.capacity >= 100
+    assert state.slot("binance", "S7/USDT") == 7
+
+    state.update_ticker(board, rows[0], 100.5, 10.0)
+    assert state.version == 0 and "S0/USDT" not in state.get_prices().get("binance", {})
+    state.update_book(board, rows[0], 100.0, 100.1)
+    before = state.get_prices()["binance"]
+    assert before["S0/USDT"] == PriceData(100.0, 100.1, 100.5, 10.0)
+    assert list(before) == ["S0/USDT"] and len(before) == 1
+
+    state.update_book(board, rows[99], 5.0, 5.1)
+    state.update_ticker(board, rows[0], 101.0, 11.0)
+    after = state.get_prices()["binance"]
+    assert before["S0/USDT"].last == 100.5 and "S99/USDT" not in before
+    assert after["S0/USDT"].last == 101.0
+    assert after["S99/USDT"] == PriceData(5.0, 5.1)
+    assert after.versions[rows[0]] == state.version == 3
+
+
+def test_exchange_board_view_retries_while_a_write_is_in_progress(monkeypatch) -> None:
+    board = ExchangeBoard("kraken", capacity=2)
+    row = board.slot("BTC/USDT")
+    board.set_book(row, 100.0, 100.1, 1)
+    board.sequence += 1
+    board.bid[row] = 200.0
+
+    def finish_write(_: float) -> None:
+        board.ask[row] = 200.1
+        board.sequence += 1
+
+    monkeypatch.setattr(price_board.time, "sleep", finish_write)
+    assert board.view().get("BTC/USDT") == PriceData(200.0, 200.1)
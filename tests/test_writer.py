@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from app.core.arbitrage import EventState
+from app.storage.db import init_db
+from app.storage.models import SnapshotRow
+from app.storage.repository import Repository
+from app.storage.writer import PersistenceWriter
+
+
+def _repository(tmp_path) -> Repository:
+    db_path = str(tmp_path / "app.db")
+    init_db(db_path)
+    return Repository(db_path)
+
+
+def _snapshot(ts: datetime) -> SnapshotRow:
+    return (ts, "binance", "BTC/USDT", 100.0, 100.1, None, None, 0.1, 0.1)
+
+
+def test_writer_batches_and_drains_on_stop(tmp_path) -> None:
+    repository = _repository(tmp_path)
+    writer = PersistenceWriter(repository, flush_size=1000, flush_interval_s=5)
+    writer.start()
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    state = EventState(event_id=None, start_ts=start, max_net_pct=0.5, sum_net_pct=0.5, samples=1)
+    writer.add_snapshots([_snapshot(start + timedelta(seconds=i)) for i in range(10)])
+    writer.create_event(state, "BTC/USDT", "binance_sell/kraken_buy", start, 0.5, 0.5)
+    writer.close_event(state, start + timedelta(seconds=3), 0.7, 0.6, 3)
+    writer.stop(timeout=5)
+
+    stats = writer.stats()
+    assert stats.written == 12
+    assert stats.batches == 1
+    assert state.event_id is not None
+    end = start + timedelta(days=1)
+    assert len(repository.list_snapshots(start, end)) == 10
+    (event,) = repository.list_events(start, end)
+    assert event.id == state.event_id
+    assert event.status == "closed"
+    assert event.duration_s == 3
+
+
+def test_writer_drops_droppable_rows_when_full(tmp_path) -> None:
+    writer = PersistenceWriter(_repository(tmp_path), max_queue=1)
+    now = datetime.now(timezone.utc)
+    state = EventState(event_id=None, start_ts=now, max_net_pct=0.5, sum_net_pct=0.5, samples=1)
+    writer.add_snapshots([_snapshot(now)])
+    writer.add_snapshots([_snapshot(now), _snapshot(now)])
+    writer.create_event(state, "BTC/USDT", "binance_sell/kraken_buy", now, 0.5, 0.5)
+    stats = writer.stats()
+    assert stats.enqueued == 2
+    assert stats.dropped == 2
+    assert stats.queue_depth == 2
+
+
+def test_writer_keeps_event_records_when_a_batch_fails(tmp_path) -> None:
+    repository = _repository(tmp_path)
+    writer = PersistenceWriter(repository, flush_size=1000, flush_interval_s=5)
+    writer.start()
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    state = EventState(event_id=None, start_ts=start, max_net_pct=0.5, sum_net_pct=0.5, samples=1)
+    writer.create_event(state, "BTC/USDT", "binance_sell/kraken_buy", start, 0.5, 0.5)
+    writer.add_snapshots([_snapshot(start), (None, *_snapshot(start)[1:])])
+    writer.close_event(state, start + timedelta(seconds=3), 0.7, 0.6, 3)
+    writer.stop(timeout=5)
+
+    stats = writer.stats()
+    assert stats.failed == 2
+    assert stats.written == 2
+    (event,) = repository.list_events(start, start + timedelta(days=1))
+    assert event.id == state.event_id
+    assert event.status == "closed"